@@ -0,0 +1,70 @@
+"""冷启动导入耗时对比：拆分后的录入页 / 看板 vs. 拆分前 main.py 一次性导入的绘图与机器学习库。
+
+每组模块在全新的 Python 进程里导入，重复多次取中位数：
+    python benchmarks/import_time.py --repeat 5
+"""
+import argparse
+import ast
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 拆分前的 main.py 在顶层导入的第三方库 (plotly 与 sklearn 一起在启动时加载；sklearn 当时就是可选的)
+PRE_SPLIT = ["streamlit", "pandas", "gspread", "google.oauth2.service_account", "plotly.express", "plotly.graph_objects",
+             "sklearn.linear_model", "sklearn.preprocessing", "sklearn.compose", "sklearn.pipeline"]
+
+
+def main_imports(path=os.path.join(ROOT, "main.py")):
+    """main.py 顶层 (页面渲染前) 导入的模块；页面函数里的延迟导入不算。"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import): names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0: names = [node.module]
+        else: continue
+        modules += [m for m in names if m not in modules]
+    return modules
+
+
+def installed(modules):
+    return [m for m in modules if importlib.util.find_spec(m.split(".")[0]) is not None]
+
+
+CORE = main_imports()
+GROUPS = {
+    "录入页 (main + page_entry)": CORE + ["page_entry"],
+    "看板 (main + page_dashboard)": CORE + ["page_dashboard"],
+    "拆分前 (原 main.py 顶层导入)": installed(PRE_SPLIT),
+}
+
+def time_imports(modules):
+    code = ("import time; t = time.perf_counter()\n"
+            + "".join(f"import {m}\n" for m in modules)
+            + "print(time.perf_counter() - t)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    missing = sorted(set(PRE_SPLIT) - set(GROUPS["拆分前 (原 main.py 顶层导入)"]))
+    if missing: print(f"未安装，拆分前一组不含：{', '.join(missing)}")
+    results = {}
+    for name, modules in GROUPS.items():
+        runs = [time_imports(modules) for _ in range(args.repeat)]
+        results[name] = statistics.median(runs)
+        print(f"{name:<32} 中位数 {results[name]:.3f} s  (最快 {min(runs):.3f} s)")
+    baseline = results["拆分前 (原 main.py 顶层导入)"]
+    entry = results["录入页 (main + page_entry)"]
+    print(f"录入页冷启动节省 {baseline - entry:.3f} s ({(baseline - entry) / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""合成数据压测：按真实目录生成 1k / 10k / 100k / 1M 条记录，离线测量加载、录入页和看板各步骤的耗时。
+
+不连接 Google 表格、不启动 Streamlit，直接调用各模块；每步重复多次取中位数。
+    python benchmarks/synthetic.py --sizes 1000 10000 --repeat 3
+    python benchmarks/synthetic.py --save benchmarks/baseline.json
+    python benchmarks/synthetic.py --compare benchmarks/baseline.json --tolerance 0.2
+1M 条记录的宽表需要数 GB 内存。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import catalog  # noqa: E402
+from cube import GapCube  # noqa: E402
+from gap_model import GapModel  # noqa: E402
+from indexes import ComboIndex, KeywordIndex  # noqa: E402
+from measurements import prepare_records  # noqa: E402
+from ordering import category_order, natural_sort_key  # noqa: E402
+from schema import ALL_HEADERS, MAX_DATA_COLS, fill_blank_category  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SEARCH_QUERIES = ["WO1234", "Z5", "PAG 3", "M12"]
+LIMIT_LOOKUPS = 1000
+
+
+def generate(n, seed=0, cat=None):
+    """生成与表格同结构的原始宽表 (与镜像读出的一致：数值列为数字，空单元格为 NaN)。
+    扇叶从目录随机抽取，盘型号/配置从该扇叶允许的盘库中抽取，测量值个数等于盘型号的间隙数。"""
+    cat = cat or catalog.current()
+    rng = np.random.default_rng(seed)
+    fans = list(cat.fan_part)
+    # 每个扇叶可选的 (盘型号, 配置) 展平成一张表，按偏移量随机取
+    pairs, offsets, counts = [], [], []
+    for fan in fans:
+        options = [(d, c) for d, configs in cat.discs_for_fan(fan).items() for c in configs]
+        offsets.append(len(pairs)); counts.append(len(options)); pairs.extend(options)
+    fan_idx = rng.integers(0, len(fans), n)
+    pick = np.asarray(offsets)[fan_idx] + (rng.random(n) * np.asarray(counts)[fan_idx]).astype(np.int64)
+    pair_disc = np.array([d for d, _ in pairs], dtype=object)
+    pair_config = np.array([c for _, c in pairs], dtype=object)
+    gaps = np.array([cat.gap_count(d) for d, _ in pairs], dtype=np.int64)[pick]
+
+    fan_names = np.array(fans, dtype=object)[fan_idx]
+    # 间隙随角度略有变化，按扇叶加一个固定偏移，回归有可学的结构
+    angles = np.asarray(cat.angles, dtype=np.float64)[rng.integers(0, len(cat.angles), n)]
+    fan_bias = rng.normal(0, 0.05, len(fans))[fan_idx]
+    wide = 0.2 + fan_bias[:, None] + 0.002 * (angles[:, None] - 30) + rng.normal(0, 0.05, (n, MAX_DATA_COLS))
+    wide = np.round(np.where(np.arange(MAX_DATA_COLS) < gaps[:, None], wide, np.nan), 2)
+    with np.errstate(all="ignore"):
+        v_max, v_min, v_avg = np.nanmax(wide, axis=1), np.nanmin(wide, axis=1), np.round(np.nanmean(wide, axis=1), 3)
+
+    start = pd.Timestamp("2024-01-01")
+    entered = (start + pd.to_timedelta(np.sort(rng.integers(0, 3 * 365 * 86400, n)), unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+    base = {
+        "录入时间": np.asarray(entered, dtype=object),
+        "测量时间": np.asarray(entered.str[:10], dtype=object),
+        "工单号": np.char.add("WO", rng.integers(1000, 9999, n).astype(str)).astype(object),
+        "扇叶型号": fan_names,
+        "扇叶料号": np.array([cat.fan_part[f] for f in fans], dtype=object)[fan_idx],
+        "盘型号": pair_disc[pick],
+        "详细配置/料号": pair_config[pick],
+        "角度": angles,
+        "叶片模具号": np.char.add("M", rng.integers(1, 40, n).astype(str)).astype(object),
+        "盘模具号": np.char.add("P", rng.integers(1, 40, n).astype(str)).astype(object),
+        "Hub模具号": np.full(n, "", dtype=object),
+        "起始位置": np.where(rng.random(n) < 0.5, "有刻字", "无刻字").astype(object),
+        "扇叶是否混模": np.where(rng.random(n) < 0.1, "是", "否").astype(object),
+        "温度(°C)": np.round(rng.uniform(15, 35, n), 1),
+        "湿度(%)": rng.integers(30, 80, n).astype(np.float64),
+        "数据量": gaps.astype(np.float64),
+        "最大值": v_max, "最小值": v_min, "平均值": v_avg,
+    }
+    df = pd.DataFrame(base)
+    data = pd.DataFrame(wide, columns=ALL_HEADERS[len(base):])
+    return pd.concat([df, data], axis=1)
+
+
+def dashboard_frame(df):
+    out = df.copy()
+    out["盘型号"] = fill_blank_category(out["盘型号"], "未知盘")
+    out["扇叶型号"] = fill_blank_category(out["扇叶型号"], "未知扇叶")
+    return out
+
+
+def steps(raw, cat):
+    """返回 [(步骤名, 函数)]；后面的步骤依赖前面步骤的结果 (通过闭包共享)。"""
+    state = {}
+
+    def clean():
+        # 与 main.load_data 相同的加载步骤
+        state["df"], state["measurements"] = prepare_records(raw, cat.gap_count)
+
+    def limit_index():
+        state["combo"] = ComboIndex()
+        state["combo"].reset(state["df"])
+
+    def limit_lookup():
+        keys = list(state["combo"].counts)[:LIMIT_LOOKUPS]
+        for fan, disc, config, angle in keys: state["combo"].count(fan, disc, config, angle)
+        state["combo"].at_limit()
+
+    def keyword_index():
+        state["keywords"] = KeywordIndex(state["df"])
+
+    def keyword_search():
+        for q in SEARCH_QUERIES: state["keywords"].search(q)
+
+    def history_sort():
+        state["df"].sort_values("扇叶型号", kind="stable", key=natural_sort_key)
+
+    def build_cube():
+        state["plot"] = dashboard_frame(state["df"])
+        state["cube"] = GapCube(state["plot"])
+
+    def orders():
+        category_order(state["plot"]["盘型号"]); category_order(state["plot"]["扇叶型号"])
+
+    def treemap():
+        state["cube"].marginal(["盘型号", "扇叶型号", "角度"])
+
+    def boxes():
+        for dim in ["盘型号", "扇叶型号", "角度"]: state["cube"].box(dim)
+
+    def heatmaps():
+        cube = state["cube"]
+        cube.pivot("扇叶型号", "盘型号"); cube.pivot("盘型号", "角度"); cube.pivot("扇叶型号", "角度")
+
+    def temperature():
+        state["cube"].marginal(["温度_bin"])
+
+    def profile():
+        disc = state["plot"]["盘型号"].astype(str)
+        state["measurements"].position_profile(state["plot"].index[disc == disc.iloc[0]])
+
+    def model_fit():
+        state["model"] = GapModel.from_frame(state["df"])
+        state["model"].solve()
+
+    def model_grid():
+        state["model"].predict_grid(category_order(state["plot"]["盘型号"]), category_order(state["plot"]["扇叶型号"]), cat.angles)
+
+    return [
+        ("加载: 清洗 + 测量值压缩", clean),
+        ("录入: 上限索引构建", limit_index),
+        (f"录入: 上限查询 x{LIMIT_LOOKUPS}", limit_lookup),
+        ("录入: 关键词索引构建", keyword_index),
+        (f"录入: 关键词搜索 x{len(SEARCH_QUERIES)}", keyword_search),
+        ("录入: 历史表自然排序", history_sort),
+        ("看板: 聚合立方体", build_cube),
+        ("看板: 类别自然排序", orders),
+        ("看板: 树图汇总", treemap),
+        ("看板: 箱线图统计 x3", boxes),
+        ("看板: 热力图 x3", heatmaps),
+        ("看板: 温度趋势", temperature),
+        ("看板: 位置剖面", profile),
+        ("模型: 回归拟合", model_fit),
+        ("模型: 全组合预测", model_grid),
+    ]
+
+
+def run_size(n, repeat, seed):
+    cat = catalog.current()
+    raw = generate(n, seed, cat)
+    results = {}
+    for _ in range(repeat):
+        # 每轮重新走一遍完整流程，后面的步骤拿到的是本轮前面步骤的结果
+        for name, fn in steps(raw, cat):
+            started = time.perf_counter()
+            fn()
+            results.setdefault(name, []).append(time.perf_counter() - started)
+    return {name: statistics.median(runs) for name, runs in results.items()}
+
+
+def compare(current, baseline, tolerance):
+    """逐项对比，返回变慢超过容差的 [(规模, 步骤, 基线秒, 当前秒)]。"""
+    regressions = []
+    for size, timings in current.items():
+        for name, seconds in timings.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None: continue
+            ratio = seconds / base if base > 0 else float("inf")
+            flag = "  ⚠️ 变慢" if ratio > 1 + tolerance else ""
+            print(f"{size:>9} {name:<28} {base * 1000:10.2f} ms → {seconds * 1000:10.2f} ms  x{ratio:5.2f}{flag}")
+            if flag: regressions.append((size, name, base, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="把结果保存为基线 (JSON)")
+    parser.add_argument("--compare", help="与已保存的基线对比")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的变慢比例，超过即视为性能回退")
+    args = parser.parse_args()
+
+    results = {}
+    for n in args.sizes:
+        print(f"== {n:,} 条记录")
+        results[str(n)] = run_size(n, args.repeat, args.seed)
+        for name, seconds in results[str(n)].items(): print(f"   {name:<28} {seconds * 1000:10.2f} ms")
+
+    if args.save:
+        meta = {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                "machine": platform.machine(), "repeat": args.repeat, "seed": args.seed, "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存到 {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: baseline = json.load(f)["results"]
+        print(f"== 与基线 {args.compare} 对比 (容差 {args.tolerance:.0%})")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"共 {len(regressions)} 项变慢超过容差")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
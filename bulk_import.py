@@ -0,0 +1,166 @@
+import io
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from indexes import COMBO_LIMIT, combo_key
+from measurements import data_col_name
+from schema import MAX_DATA_COLS
+
+# ==========================================
+# 批量导入：一次读入整张 CSV / Excel，向量化校验后整批写入队列
+# ==========================================
+# 导入文件需要的列 (录入时间、扇叶料号、数据量、最大/最小/平均值由系统生成)
+IMPORT_COLS = [
+    "测量时间", "工单号", "扇叶型号", "盘型号", "详细配置/料号", "角度",
+    "叶片模具号", "盘模具号", "Hub模具号", "起始位置", "扇叶是否混模", "温度(°C)", "湿度(%)",
+]
+REQUIRED_COLS = ["扇叶型号", "盘型号", "详细配置/料号", "角度"]
+DATA_COLS = [data_col_name(i) for i in range(1, MAX_DATA_COLS + 1)]
+# 与单条录入表单的取值范围一致
+VALUE_RANGES = {"温度(°C)": (-50.0, 100.0), "湿度(%)": (0.0, 100.0)}
+# 表单里按整数录入的列：小数不截断，直接报错
+INTEGER_COLS = ["湿度(%)"]
+CHOICES = {"起始位置": ["有刻字", "无刻字"], "扇叶是否混模": ["否", "是"]}
+# 行号从表头下一行开始计 (与 Excel 显示一致)
+FIRST_ROW_NO = 2
+
+
+def template_bytes():
+    # 导入模板：只有表头的 CSV (带 BOM，Excel 可直接打开)
+    cols = IMPORT_COLS + DATA_COLS
+    return b"\xef\xbb\xbf" + pd.DataFrame(columns=cols).to_csv(index=False).encode("utf-8")
+
+
+def read_table(name, data):
+    """按扩展名读取上传的 CSV / XLSX，所有列先按文本读入，数值列在校验时再转换。"""
+    buf = io.BytesIO(data)
+    if name.lower().endswith((".xlsx", ".xlsm")): df = pd.read_excel(buf, dtype=str)
+    else: df = pd.read_csv(buf, dtype=str, encoding="utf-8-sig")
+    df.columns = [str(c).strip() for c in df.columns]
+    return df.dropna(how="all").reset_index(drop=True)
+
+
+def _text(df, col):
+    if col not in df.columns: return pd.Series("", index=df.index)
+    return df[col].fillna("").astype(str).str.strip().replace(["nan", "None", "<NA>", "NaN"], "")
+
+
+def _number(df, col):
+    if col not in df.columns: return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(_text(df, col).replace("", np.nan), errors="coerce")
+
+
+class ImportBatch:
+    """一次上传的校验结果：rows 为可直接入队的整行数据，problems 为 (行号, 问题) 明细。"""
+
+    def __init__(self, rows, problems, n_total):
+        self.rows = rows
+        self.problems = problems
+        self.n_total = n_total
+
+    @property
+    def n_valid(self):
+        return len(self.rows)
+
+
+def validate(df, cat, existing_count, pending_rows=(), entered_at="", limit=COMBO_LIMIT):
+    """校验整批记录。existing_count(key) 返回表格中该组合已有的次数，pending_rows 为写入队列里尚未落表的整行数据。"""
+    n = len(df)
+    issues = []     # [(行位置数组, 问题说明)]
+
+    def flag(mask, message):
+        hit = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if len(hit): issues.append((hit, message))
+
+    missing_cols = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing_cols:
+        problems = pd.DataFrame({"行号": ["-"], "问题": [f"缺少必需的列: {', '.join(missing_cols)}"]})
+        return ImportBatch([], problems, n)
+
+    fan, disc, config = _text(df, "扇叶型号"), _text(df, "盘型号"), _text(df, "详细配置/料号")
+    # 只填了扇叶料号时，通过料号反查唯一对应的扇叶型号
+    part = _text(df, "扇叶料号")
+    by_part = part.map(lambda p: cat.part_models.get(p, [])) if part.ne("").any() else pd.Series([[]] * n, index=df.index)
+    fill = fan.eq("") & by_part.map(len).eq(1)
+    fan = fan.mask(fill, by_part.str[0])
+    flag(fan.eq("") & by_part.map(len).gt(1), "扇叶料号对应多个扇叶型号，请填写扇叶型号")
+
+    # --- 目录校验：扇叶 -> 盘库，(盘库, 盘型号, 配置) 必须存在 ---
+    library = fan.map(cat.fan_library)
+    flag(library.isna(), "扇叶型号不在目录中")
+    allowed = pd.MultiIndex.from_tuples(
+        [(lib, d, c) for lib, discs in cat.disc_libraries.items() for d, configs in discs.items() for c in configs])
+    allowed_disc = allowed.droplevel(2).unique()
+    has_disc = pd.MultiIndex.from_arrays([library.fillna(""), disc]).isin(allowed_disc)
+    flag(library.notna() & ~has_disc, "盘型号与扇叶型号不匹配")
+    flag(library.notna() & has_disc & ~pd.MultiIndex.from_arrays([library.fillna(""), disc, config]).isin(allowed), "详细配置/料号与盘型号不匹配")
+
+    angle = _number(df, "角度")
+    flag(~angle.isin(cat.angles), "角度不在可选范围内")
+    for col, (lo, hi) in VALUE_RANGES.items():
+        value = _number(df, col)
+        flag(value.notna() & ((value < lo) | (value > hi)), f"{col} 超出范围 {lo:g}~{hi:g}")
+        flag(_text(df, col).ne("") & value.isna(), f"{col} 不是数字")
+        if col in INTEGER_COLS: flag(value.notna() & (value % 1 != 0), f"{col} 必须是整数")
+    for col, choices in CHOICES.items():
+        flag(_text(df, col).ne("") & ~_text(df, col).isin(choices), f"{col} 只能填写 {'/'.join(choices)}")
+
+    # --- 测量值：个数必须等于盘型号的间隙数，且连续填在 数据_1..数据_N ---
+    data_cols = [c for c in DATA_COLS if c in df.columns]
+    raw = df[data_cols].fillna("").astype(str).apply(lambda s: s.str.strip()) if data_cols else pd.DataFrame(index=df.index)
+    wide = np.full((n, MAX_DATA_COLS), np.nan)
+    for j, col in enumerate(DATA_COLS):
+        if col in raw.columns: wide[:, j] = pd.to_numeric(raw[col].replace("", np.nan), errors="coerce").to_numpy()
+    if data_cols: flag((raw.ne("").to_numpy() & np.isnan(wide[:, [DATA_COLS.index(c) for c in data_cols]])).any(axis=1), "测量值不是数字")
+    flag((wide < 0).any(axis=1), "测量值不能为负数")
+    expected = disc.map({d: cat.gap_count(d) for d in disc.unique()}).to_numpy(dtype=np.int64)
+    in_range = np.arange(MAX_DATA_COLS) < expected[:, None]
+    present = ~np.isnan(wide)
+    flag((present & ~in_range).any(axis=1), "测量值个数超过该盘型号的间隙数")
+    flag((~present & in_range).any(axis=1), "测量值个数少于该盘型号的间隙数")
+
+    # --- 文件内完全相同的行只保留第一条 (入队按整行内容去重) ---
+    content = pd.concat([df.drop(columns=data_cols, errors="ignore").fillna(""), pd.DataFrame(wide, index=df.index)], axis=1)
+    flag(content.duplicated(keep="first").to_numpy(), "与文件中前面的行完全相同")
+
+    # --- 3 次上限：表格已有 + 队列中 + 本批中排在前面的有效行 ---
+    bad = np.zeros(n, dtype=bool)
+    for hit, _ in issues: bad[hit] = True
+    keys = pd.Series([combo_key(f, d, c, a) for f, d, c, a in zip(fan, disc, config, angle)], index=df.index)
+    pending = Counter(combo_key(p[3], p[5], p[6], p[7]) for p in pending_rows if len(p) > 7)
+    base = keys.map({k: existing_count(k) + pending.get(k, 0) for k in keys[~bad].unique()})
+    order_in_batch = keys[~bad].groupby(keys[~bad]).cumcount()
+    over = pd.Series(False, index=df.index)
+    over[~bad] = (base[~bad] + order_in_batch + 1 > limit).to_numpy()
+    flag(over, f"该组合已达 {limit} 次上限")
+    bad |= over.to_numpy()
+
+    # --- 统计值一次算完 ---
+    v_max = np.where(present, wide, -np.inf).max(axis=1)
+    v_min = np.where(present, wide, np.inf).min(axis=1)
+    v_avg = np.round(np.where(present, wide, 0.0).sum(axis=1) / np.maximum(present.sum(axis=1), 1), 3)
+
+    rows = []
+    has_hub = config.map(cat.has_hub)
+    fan_part = fan.map(cat.fan_part)
+    text = {col: _text(df, col) for col in ["测量时间", "工单号", "叶片模具号", "盘模具号", "Hub模具号", "起始位置", "扇叶是否混模"]}
+    numbers = {col: _number(df, col) for col in VALUE_RANGES}
+    for i in np.flatnonzero(~bad):
+        count = int(expected[i])
+        values = [float(v) for v in wide[i, :count]]
+        row = [
+            entered_at, text["测量时间"].iat[i], text["工单号"].iat[i], fan.iat[i], fan_part.iat[i], disc.iat[i], config.iat[i], float(angle.iat[i]),
+            text["叶片模具号"].iat[i], text["盘模具号"].iat[i], text["Hub模具号"].iat[i] if has_hub.iat[i] else None,
+            text["起始位置"].iat[i] or "有刻字", text["扇叶是否混模"].iat[i] or "否",
+            None if np.isnan(numbers["温度(°C)"].iat[i]) else float(numbers["温度(°C)"].iat[i]),
+            None if np.isnan(numbers["湿度(%)"].iat[i]) else int(numbers["湿度(%)"].iat[i]),
+            count, float(v_max[i]), float(v_min[i]), float(v_avg[i]),
+        ]
+        rows.append(row + values + [""] * (MAX_DATA_COLS - count))
+
+    problems = pd.DataFrame(
+        [(int(i) + FIRST_ROW_NO, message) for hit, message in issues for i in hit], columns=["行号", "问题"])
+    problems = problems.sort_values("行号", kind="stable").reset_index(drop=True)
+    return ImportBatch(rows, problems, n)
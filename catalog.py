@@ -0,0 +1,127 @@
+import json
+import os
+import re
+import threading
+
+# ==========================================
+# 扇叶 / 盘型号目录：从 catalog.json 加载一次，预先建好各种查找表
+# ==========================================
+CATALOG_PATH = os.environ.get("GAP_CATALOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json"))
+CATALOG_FORMAT = 1
+
+
+class CatalogError(ValueError):
+    """目录文件格式或内容不合法。"""
+
+
+def calculate_gap_count(disc_type_str):
+    # 由盘型号推算间隙数；目录里没有的历史盘型号也按这个规则处理
+    numbers = re.findall(r'\d+', disc_type_str)
+    if not numbers: return 0
+    num = int(numbers[0])
+    if "Z" in disc_type_str:
+        if num == 12: return 12
+        elif num == 16: return 16
+        else: return num * 2
+    else:
+        return num * 2
+
+
+class Catalog:
+    """目录的只读视图。构建时完成校验，之后所有查询都是字典查找。"""
+
+    def __init__(self, data, source=None, mtime=None):
+        self.source = source
+        self.mtime = mtime
+        errors = []
+        if data.get("format") != CATALOG_FORMAT:
+            raise CatalogError(f"不支持的目录格式版本: {data.get('format')!r} (需要 {CATALOG_FORMAT})")
+        self.revision = str(data.get("revision", ""))
+
+        angles = data.get("angles") or []
+        if not all(isinstance(a, (int, float)) and a > 0 for a in angles): errors.append("angles 必须是正数列表")
+        if len(set(angles)) != len(angles): errors.append("angles 存在重复值")
+        self.angles = list(angles)
+
+        # 盘库: 库名 -> {盘型号: [具体组合, ...]}；同时得到 盘型号 -> 间隙数、组合 -> 是否带 Hub
+        self.disc_libraries, self.disc_gaps, self.config_has_hub = {}, {}, {}
+        for lib_name, discs in (data.get("disc_libraries") or {}).items():
+            self.disc_libraries[lib_name] = {}
+            for disc, spec in discs.items():
+                configs, gaps = spec.get("configs") or [], spec.get("gaps")
+                if not configs: errors.append(f"{lib_name}/{disc}: 没有可选组合")
+                if not isinstance(gaps, int) or gaps <= 0: errors.append(f"{lib_name}/{disc}: 间隙数 {gaps!r} 不合法")
+                elif self.disc_gaps.setdefault(disc, gaps) != gaps: errors.append(f"{disc}: 不同盘库里的间隙数不一致")
+                self.disc_libraries[lib_name][disc] = list(configs)
+                for config in configs: self.config_has_hub[config] = "hub" in config.lower()
+
+        # 系列 -> 排好序的扇叶型号；扇叶型号 -> 料号 / 盘库 / 提示文字；料号 -> 扇叶型号 (反向索引)
+        self.series, self.series_fans = [], {}
+        self.fan_part, self.fan_library, self.fan_hint, self.fan_series = {}, {}, {}, {}
+        self.part_models = {}
+        for series in data.get("series") or []:
+            name = series.get("name")
+            self.series.append(name)
+            fans = []
+            for group in series.get("groups") or []:
+                lib_name = group.get("discs")
+                if lib_name not in self.disc_libraries: errors.append(f"{name}: 引用了不存在的盘库 {lib_name!r}")
+                for fan, part in (group.get("fans") or {}).items():
+                    if fan in self.fan_part: errors.append(f"扇叶型号重复: {fan}")
+                    if not (isinstance(part, str) and part.isdigit()): errors.append(f"{fan}: 料号 {part!r} 不合法")
+                    self.fan_part[fan], self.fan_library[fan] = part, lib_name
+                    self.fan_hint[fan], self.fan_series[fan] = group.get("hint", name), name
+                    self.part_models.setdefault(part, []).append(fan)
+                    fans.append(fan)
+            if not fans: errors.append(f"{name}: 没有扇叶型号")
+            self.series_fans[name] = sorted(fans)
+        if not self.series: errors.append("没有任何系列")
+        if errors: raise CatalogError("；".join(errors))
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        mtime = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as f:
+            try: data = json.load(f)
+            except json.JSONDecodeError as e: raise CatalogError(f"目录文件不是合法的 JSON: {e}") from e
+        return cls(data, source=path, mtime=mtime)
+
+    # --- 查询 ---
+    def discs_for_fan(self, fan):
+        return self.disc_libraries[self.fan_library[fan]]
+
+    def gap_count(self, disc):
+        return self.disc_gaps.get(disc) or calculate_gap_count(disc)
+
+    def has_hub(self, config):
+        hit = self.config_has_hub.get(config)
+        return hit if hit is not None else "hub" in str(config).lower()
+
+    def models_for_part(self, part):
+        return list(self.part_models.get(str(part).strip(), []))
+
+
+# --- 热加载：文件修改时间变了就重新加载；新文件校验不通过时继续使用旧目录 ---
+_lock = threading.Lock()
+_current = None
+_last_error = None
+
+
+def current(path=CATALOG_PATH):
+    global _current, _last_error
+    try: mtime = os.path.getmtime(path)
+    except OSError as e: mtime = None; err = e
+    with _lock:
+        if _current is not None and (_current.mtime == mtime or mtime is None):
+            if mtime is None: _last_error = f"目录文件无法读取: {err}"
+            return _current
+        try:
+            _current, _last_error = Catalog.load(path), None
+        except (OSError, CatalogError) as e:
+            if _current is None: raise
+            _last_error = str(e)
+        return _current
+
+
+def last_error():
+    return _last_error
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 看板聚合立方体：按 (盘型号, 扇叶型号, 角度, 温度) 预聚合一次，各图表从中汇总
+# ==========================================
+CUBE_DIMS = ["盘型号", "扇叶型号", "角度", "温度_bin"]
+VALUE_COL = "平均值"
+WEIGHT_COL = "数据量"
+TEMP_COL = "温度(°C)"
+BOX_QUANTILES = (0.25, 0.5, 0.75)
+WHISKER_IQR = 1.5
+
+
+class GapCube:
+    """只扫描一次原始记录，得到每个最细粒度单元的 记录数/总和/平方和/最值；
+    任意维度组合的统计都由单元汇总得到，分位数由按单元排好序的取值计算。结果按维度组合缓存。"""
+
+    def __init__(self, df):
+        src = df[df[VALUE_COL].notna()] if VALUE_COL in df.columns else df.iloc[:0]
+        keys = pd.DataFrame({
+            "盘型号": src["盘型号"] if "盘型号" in src.columns else "",
+            "扇叶型号": src["扇叶型号"] if "扇叶型号" in src.columns else "",
+            "角度": src["角度"] if "角度" in src.columns else np.nan,
+            "温度_bin": src[TEMP_COL].astype("float64").round() if TEMP_COL in src.columns else np.nan,
+        }, index=src.index)
+        values = src[VALUE_COL].to_numpy(dtype=np.float64) if len(src) else np.empty(0)
+        weights = src[WEIGHT_COL].to_numpy(dtype=np.float64, na_value=0.0) if WEIGHT_COL in src.columns and len(src) else np.zeros(len(src))
+
+        groups = keys.groupby(CUBE_DIMS, observed=True, dropna=False, sort=False)
+        cell = groups.ngroup().to_numpy()
+        n_cells = int(cell.max()) + 1 if len(cell) else 0
+        self.cells = groups.size().reset_index(name="n").drop(columns="n")
+        self.cells["n"] = np.bincount(cell, minlength=n_cells)
+        self.cells["sum"] = np.bincount(cell, weights=values, minlength=n_cells)
+        self.cells["sumsq"] = np.bincount(cell, weights=values * values, minlength=n_cells)
+        self.cells["weight"] = np.bincount(cell, weights=weights, minlength=n_cells)
+        vmin = np.full(n_cells, np.inf); np.minimum.at(vmin, cell, values)
+        vmax = np.full(n_cells, -np.inf); np.maximum.at(vmax, cell, values)
+        self.cells["min"], self.cells["max"] = vmin, vmax
+
+        # 原始取值按 (单元, 值) 排序保存，分位数只需要这一列
+        order = np.lexsort((values, cell))
+        self.cell_of_value = cell[order]
+        self.values = values[order]
+        self.labels = src.index.to_numpy()[order]
+        self.n_records = len(values)
+        self._memo = {}
+
+    def _group_codes(self, dims, dropna):
+        grouped = self.cells.groupby(dims, observed=True, dropna=dropna, sort=False)
+        # dropna=True 时维度为空的单元 ngroup 为 NaN，统一记为 -1 (不属于任何组)
+        return grouped, grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+
+    def marginal(self, dims, dropna=True):
+        """按 dims 汇总：记录数、平均值、标准差、最小值、最大值、数据量。"""
+        key = ("marginal", tuple(dims), dropna)
+        if key in self._memo: return self._memo[key]
+        if self.cells.empty:
+            out = pd.DataFrame(columns=list(dims) + ["记录数", "平均值", "标准差", "最小值", "最大值", "数据量"])
+        else:
+            grouped, _ = self._group_codes(list(dims), dropna)
+            agg = grouped.agg(n=("n", "sum"), total=("sum", "sum"), total_sq=("sumsq", "sum"),
+                              vmin=("min", "min"), vmax=("max", "max"), weight=("weight", "sum")).reset_index()
+            mean = agg["total"] / agg["n"]
+            out = agg[list(dims)].copy()
+            for col in dims:
+                if isinstance(out[col].dtype, pd.CategoricalDtype): out[col] = out[col].astype(str)
+            out["记录数"] = agg["n"].astype(int)
+            out["平均值"] = mean
+            out["标准差"] = np.sqrt(np.maximum(agg["total_sq"] / agg["n"] - mean * mean, 0))
+            out["最小值"], out["最大值"], out["数据量"] = agg["vmin"], agg["vmax"], agg["weight"]
+        self._memo[key] = out
+        return out
+
+    def _sorted_groups(self, dims, dropna):
+        # 取值按 (组, 值) 排序，返回 组号/取值/行标签 以及每组的起点和记录数
+        key = ("groups", tuple(dims), dropna)
+        if key in self._memo: return self._memo[key]
+        _, group_of_cell = self._group_codes(list(dims), dropna)
+        n_groups = int(group_of_cell.max()) + 1 if len(group_of_cell) else 0
+        grp = group_of_cell[self.cell_of_value]
+        keep = grp >= 0
+        grp, vals, labels = grp[keep], self.values[keep], self.labels[keep]
+        order = np.lexsort((vals, grp))
+        grp, vals, labels = grp[order], vals[order], labels[order]
+        counts = np.bincount(grp, minlength=n_groups)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        self._memo[key] = (grp, vals, labels, counts, starts)
+        return self._memo[key]
+
+    def quantiles(self, dims, qs=BOX_QUANTILES, dropna=True):
+        """按 dims 计算分位数 (线性插值，与 pandas/numpy 默认一致)，行顺序与 marginal 相同。"""
+        key = ("quantiles", tuple(dims), tuple(qs), dropna)
+        if key in self._memo: return self._memo[key]
+        cols = [f"q{int(q * 100)}" for q in qs]
+        if self.cells.empty:
+            out = pd.DataFrame(columns=cols)
+        else:
+            _, vals, _, counts, starts = self._sorted_groups(dims, dropna)
+            out = {}
+            for col, q in zip(cols, qs):
+                pos = (counts - 1) * q
+                lo = np.floor(pos).astype(np.int64)
+                hi = np.minimum(lo + 1, counts - 1)
+                frac = pos - lo
+                out[col] = vals[starts + lo] * (1 - frac) + vals[starts + hi] * frac
+            out = pd.DataFrame(out)
+        self._memo[key] = out
+        return out
+
+    def box(self, dim):
+        """箱线图所需的统计 (四分位数、须线、均值) 和须线以外的离群点 (含行标签，用于取悬停信息)。"""
+        key = ("box", dim)
+        if key in self._memo: return self._memo[key]
+        stats = self.summary([dim])
+        if stats.empty:
+            outliers = pd.DataFrame(columns=[dim, VALUE_COL, "label"])
+        else:
+            stats = stats.copy()
+            grp, vals, labels, _, _ = self._sorted_groups([dim], True)
+            iqr = (stats["q75"] - stats["q25"]).to_numpy()
+            lo_lim = stats["q25"].to_numpy() - WHISKER_IQR * iqr
+            hi_lim = stats["q75"].to_numpy() + WHISKER_IQR * iqr
+            inside = (vals >= lo_lim[grp]) & (vals <= hi_lim[grp])
+            # 须线取落在 1.5 倍四分位距以内的最远数据点 (与 Plotly 客户端算法一致)
+            lower = np.full(len(stats), np.inf); np.minimum.at(lower, grp[inside], vals[inside])
+            upper = np.full(len(stats), -np.inf); np.maximum.at(upper, grp[inside], vals[inside])
+            stats["lowerfence"], stats["upperfence"] = lower, upper
+            outliers = pd.DataFrame({dim: stats[dim].to_numpy()[grp[~inside]], VALUE_COL: vals[~inside], "label": labels[~inside]})
+        self._memo[key] = (stats, outliers)
+        return self._memo[key]
+
+    def summary(self, dims, dropna=True):
+        # 统计值 + 四分位数，供箱线图等需要分布信息的图表使用
+        key = ("summary", tuple(dims), dropna)
+        if key not in self._memo:
+            self._memo[key] = pd.concat([self.marginal(dims, dropna), self.quantiles(dims, dropna=dropna)], axis=1)
+        return self._memo[key]
+
+    def pivot(self, index, columns, value="平均值"):
+        return self.marginal([index, columns]).pivot(index=index, columns=columns, values=value)
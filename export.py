@@ -0,0 +1,84 @@
+import io
+from importlib.util import find_spec
+
+import pandas as pd
+
+# ==========================================
+# 数据导出：点击下载时才生成。测量值按块展开 (同一时刻只有一块宽表)，
+# 但下载按钮需要完整的文件内容，所以输出先写进内存缓冲区再整体返回
+# ==========================================
+EXPORT_CHUNK_ROWS = 5000
+# 显示名 -> (扩展名, MIME 类型, 依赖的模块)
+EXPORT_FORMATS = {
+    "CSV (Excel 可直接打开)": ("csv", "text/csv", None),
+    "Excel (XLSX)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", "pyarrow"),
+}
+
+
+def available_formats():
+    return [name for name, (_, _, module) in EXPORT_FORMATS.items() if module is None or find_spec(module)]
+
+
+def _export_frame(chunk):
+    # 与历史表显示一致：类别转文本，float32 转 float64 并去掉精度尾数
+    out = {}
+    for col in chunk.columns:
+        series = chunk[col]
+        if isinstance(series.dtype, pd.CategoricalDtype): series = series.astype(str)
+        elif series.dtype == "float32": series = series.astype("float64").round(6)
+        out[col] = series
+    return pd.DataFrame(out, index=chunk.index)
+
+
+def iter_chunks(df, measurements, cols, chunk_rows=EXPORT_CHUNK_ROWS):
+    """按块产出宽表 (基础列 + 数据_1..N)，任何时刻只展开一块的测量值。"""
+    width = measurements.filled_width(df.index)
+    cols = [c for c in cols if c in df.columns]
+    for start in range(0, len(df), chunk_rows):
+        part = df.iloc[start:start + chunk_rows]
+        yield _export_frame(pd.concat([part[cols], measurements.to_wide(part.index, width=width)], axis=1))
+
+
+def _write_csv(chunks, buf):
+    buf.write(b"\xef\xbb\xbf")  # UTF-8 BOM，Excel 才能正确识别中文
+    for i, chunk in enumerate(chunks):
+        buf.write(chunk.to_csv(index=False, header=i == 0).encode("utf-8"))
+
+
+def _write_xlsx(chunks, buf):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("间隙数据")
+    for i, chunk in enumerate(chunks):
+        if i == 0: ws.append(list(chunk.columns))
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None): ws.append(row)
+    wb.save(buf)
+
+
+def _write_parquet(chunks, buf):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None: writer = pq.ParquetWriter(buf, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None: writer.close()
+
+
+WRITERS = {"csv": _write_csv, "xlsx": _write_xlsx, "parquet": _write_parquet}
+
+
+def export_bytes(df, measurements, cols, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    ext = EXPORT_FORMATS[fmt][0]
+    buf = io.BytesIO()
+    chunks = iter_chunks(df, measurements, cols, chunk_rows)
+    if df.empty:
+        # 没有数据时也输出表头
+        chunks = iter([_export_frame(df[[c for c in cols if c in df.columns]].iloc[:0])])
+    WRITERS[ext](chunks, buf)
+    return buf.getvalue()
@@ -0,0 +1,169 @@
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 间隙预测模型：平均值 ~ 常数 + 盘型号(独热) + 扇叶型号(独热) + 角度
+# 只保存最小二乘的充分统计量 XᵀX / Xᵀy / yᵀy，新增或删除记录时增量更新
+# ==========================================
+TARGET_COL = "平均值"
+CATEGORY_FEATURES = {"盘型号": "未知盘", "扇叶型号": "未知扇叶"}
+ANGLE_COL = "角度"
+MIN_TRAIN_ROWS = 10
+# 预测间隙不大于该值 (含负值，即干涉) 视为风险组合
+LOW_GAP_THRESHOLD = 0.05
+# 独热编码与常数项线性相关，协方差矩阵奇异；小于该相对阈值的特征值视为 0
+PINV_RCOND = 1e-10
+
+
+def _labels(series, blank):
+    text = series.astype(object).where(series.notna(), "").astype(str).str.strip()
+    return text.replace(["nan", "None", "<NA>", "NaN", ""], blank)
+
+
+def training_frame(df):
+    """取出建模用的四列：类别空值显示为占位名称，角度或平均值缺失的记录不参与训练。"""
+    cols = list(CATEGORY_FEATURES) + [ANGLE_COL, TARGET_COL]
+    if df.empty or any(c not in df.columns for c in cols): return pd.DataFrame(columns=cols)
+    out = pd.DataFrame({col: _labels(df[col], blank) for col, blank in CATEGORY_FEATURES.items()})
+    out[ANGLE_COL] = pd.to_numeric(df[ANGLE_COL], errors="coerce").astype("float64")
+    out[TARGET_COL] = pd.to_numeric(df[TARGET_COL], errors="coerce").astype("float64")
+    return out.dropna(subset=[ANGLE_COL, TARGET_COL])
+
+
+class GapModel:
+    """增量更新的线性回归，结果与 OneHotEncoder + LinearRegression 一致。
+    特征列顺序: [常数, 角度, 类别特征 (按首次出现的顺序追加)]。同时作为本地镜像的观察者使用。"""
+
+    def __init__(self):
+        self.features = []          # [(列名, 取值), ...]
+        self._feature_pos = {}
+        self.xtx = np.zeros((2, 2))
+        self.xty = np.zeros(2)
+        self.yty = 0.0
+        self.version = 0
+        # 实例标识：不同筛选条件各建一个模型，版本号都从 0 开始，缓存键需要区分实例
+        self.uid = uuid.uuid4().hex
+        self._solution = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df):
+        model = cls()
+        model.added(df)
+        return model
+
+    # --- 镜像观察者接口 ---
+    def reset(self, df):
+        with self._lock:
+            self.features, self._feature_pos = [], {}
+            self.xtx, self.xty, self.yty = np.zeros((2, 2)), np.zeros(2), 0.0
+            self.version += 1
+            self._solution = None
+        self._update(df, 1.0)
+
+    def added(self, df):
+        self._update(df, 1.0)
+
+    def removed(self, df):
+        self._update(df, -1.0)
+
+    def _positions(self, col, values):
+        for value in pd.unique(values):
+            if (col, value) not in self._feature_pos:
+                self._feature_pos[(col, value)] = 2 + len(self.features)
+                self.features.append((col, value))
+        return values.map({v: pos for (c, v), pos in self._feature_pos.items() if c == col}).to_numpy(dtype=np.int64)
+
+    def _update(self, df, sign):
+        frame = training_frame(df)
+        if frame.empty: return
+        with self._lock:
+            n = len(frame)
+            cols = [np.zeros(n, np.int64), np.ones(n, np.int64)]
+            vals = [np.ones(n), frame[ANGLE_COL].to_numpy()]
+            for col in CATEGORY_FEATURES:
+                cols.append(self._positions(col, frame[col]))
+                vals.append(np.ones(n))
+            k = 2 + len(self.features)
+            if k > len(self.xty):
+                # 出现新的类别：矩阵补零扩展，已有统计量不变
+                grown = np.zeros((k, k)); grown[:len(self.xty), :len(self.xty)] = self.xtx; self.xtx = grown
+                self.xty = np.concatenate([self.xty, np.zeros(k - len(self.xty))])
+            y = frame[TARGET_COL].to_numpy()
+            # 每行只有 4 个非零特征，按 (i, j) 下标用 bincount 累加外积
+            for ci, vi in zip(cols, vals):
+                self.xty += sign * np.bincount(ci, weights=vi * y, minlength=k)
+                for cj, vj in zip(cols, vals):
+                    self.xtx += sign * np.bincount(ci * k + cj, weights=vi * vj, minlength=k * k).reshape(k, k)
+            self.yty += sign * float(y @ y)
+            self.version += 1
+            self._solution = None
+
+    # --- 求解与预测 ---
+    @property
+    def n_rows(self):
+        return int(round(self.xtx[0, 0]))
+
+    @property
+    def fingerprint(self):
+        # 缓存键：实例标识 + 版本号，任何一次增删都会让版本号变化
+        return (self.uid, self.version)
+
+    def solve(self):
+        """返回 {"intercept", "angle", "coef": {(列名, 取值): 系数}, "r2", "n", "version"}；数据不足时返回 None。"""
+        with self._lock:
+            if self._solution is not None: return self._solution
+            n = self.xtx[0, 0]
+            if n < MIN_TRAIN_ROWS: return None
+            # 与 sklearn 相同的做法：先中心化再求最小范数解，截距由均值反推
+            mean_x = self.xtx[0, 1:] / n
+            mean_y = self.xty[0] / n
+            sxx = self.xtx[1:, 1:] - n * np.outer(mean_x, mean_x)
+            sxy = self.xty[1:] - n * mean_x * mean_y
+            coef = np.linalg.pinv(sxx, rcond=PINV_RCOND, hermitian=True) @ sxy
+            intercept = mean_y - mean_x @ coef
+            syy = self.yty - n * mean_y * mean_y
+            sse = max(syy - 2 * coef @ sxy + coef @ sxx @ coef, 0.0)
+            r2 = 1 - sse / syy if syy > 0 else (1.0 if sse == 0 else 0.0)
+            self._solution = {
+                "intercept": float(intercept),
+                "angle": float(coef[0]),
+                "coef": {feature: float(c) for feature, c in zip(self.features, coef[1:])},
+                "r2": float(r2),
+                "n": int(round(n)),
+                "version": self.version,
+            }
+            return self._solution
+
+    def predict(self, disc, fan, angle):
+        sol = self.solve()
+        if sol is None: return None
+        coef = sol["coef"]
+        # 没见过的类别按 0 处理 (等同 handle_unknown="ignore")
+        return sol["intercept"] + coef.get(("盘型号", disc), 0.0) + coef.get(("扇叶型号", fan), 0.0) + sol["angle"] * angle
+
+    def predict_grid(self, discs, fans, angles):
+        """一次算出 盘型号 × 扇叶型号 × 角度 全部组合的预测值 (广播相加)，返回长表。"""
+        sol = self.solve()
+        if sol is None or not len(discs) or not len(fans) or not len(angles): return None
+        coef = sol["coef"]
+        disc_c = np.array([coef.get(("盘型号", d), 0.0) for d in discs])
+        fan_c = np.array([coef.get(("扇叶型号", f), 0.0) for f in fans])
+        angle_v = np.asarray(angles, dtype=np.float64)
+        grid = sol["intercept"] + disc_c[:, None, None] + fan_c[None, :, None] + sol["angle"] * angle_v[None, None, :]
+        shape = grid.shape
+        return pd.DataFrame({
+            "盘型号": np.repeat(np.asarray(discs, dtype=object), shape[1] * shape[2]),
+            "扇叶型号": np.tile(np.repeat(np.asarray(fans, dtype=object), shape[2]), shape[0]),
+            "角度": np.tile(angle_v, shape[0] * shape[1]),
+            "预测间隙": grid.ravel(),
+        })
+
+
+def risk_combinations(grid, threshold=LOW_GAP_THRESHOLD):
+    """全组合预测表中间隙不大于阈值的组合，标注 干涉 / 间隙过小，按预测间隙从小到大排列。"""
+    risk = grid[grid["预测间隙"] <= threshold]
+    return risk.assign(状态=np.where(risk["预测间隙"] < 0, "⚠️ 干涉", "🔴 间隙过小")).sort_values("预测间隙", kind="stable")
@@ -0,0 +1,101 @@
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 内存索引：挂在本地镜像上，随镜像的增删改同步更新
+# ==========================================
+COMBO_LIMIT = 3
+COMBO_COLS = ["扇叶型号", "盘型号", "详细配置/料号", "角度"]
+# 关键词搜索覆盖记录表的所有列，只跳过程序生成的辅助列 (录入时间_dt 与 录入时间 内容重复)
+SEARCH_SKIP_COLS = ("录入时间_dt", "_original_row_index")
+
+
+def combo_key(fan, disc, config, angle):
+    try: angle = round(float(angle), 2)
+    except (TypeError, ValueError): return None
+    if angle != angle: return None
+    return (str(fan).strip(), str(disc).strip(), str(config).strip(), angle)
+
+
+def _combo_keys(df):
+    if df.empty or not all(c in df.columns for c in COMBO_COLS): return []
+    keys = pd.DataFrame({
+        "fan": df["扇叶型号"].astype(str).str.strip(),
+        "disc": df["盘型号"].astype(str).str.strip(),
+        "config": df["详细配置/料号"].astype(str).str.strip(),
+        "angle": pd.to_numeric(df["角度"], errors="coerce").round(2),
+    }).dropna(subset=["angle"])
+    return keys.groupby(["fan", "disc", "config", "angle"]).size().items()
+
+
+class ComboIndex:
+    """(扇叶型号, 盘型号, 配置, 角度) -> 已录入次数，用于 3 次上限检查。
+
+    后台刷新线程通过观察者接口改计数，页面线程同时在查询，读写都在锁内进行。
+    """
+
+    def __init__(self, limit=COMBO_LIMIT):
+        self.limit = limit
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    # --- 镜像观察者接口 ---
+    def reset(self, df):
+        counts = Counter(dict(_combo_keys(df)))
+        with self._lock: self.counts = counts
+
+    def added(self, df):
+        keys = _combo_keys(df)
+        with self._lock:
+            for key, n in keys: self.counts[key] += n
+
+    def removed(self, df):
+        keys = _combo_keys(df)
+        with self._lock:
+            for key, n in keys:
+                self.counts[key] -= n
+                if self.counts[key] <= 0: del self.counts[key]
+
+    # --- 查询 ---
+    def count(self, fan, disc, config, angle):
+        return self.count_key(combo_key(fan, disc, config, angle))
+
+    def count_key(self, key):
+        with self._lock: return self.counts.get(key, 0)
+
+    def at_limit(self):
+        with self._lock: rows = [(*key, n) for key, n in self.counts.items() if n >= self.limit]
+        return pd.DataFrame(rows, columns=["扇叶型号", "盘型号", "详细配置/料号", "角度", "已录入次数"])
+
+
+class KeywordIndex:
+    """历史记录关键词索引：每列只保存不同取值的小写文本和每行对应的取值编号。每个数据版本构建一次。
+
+    查询时在各列的不同取值上做子串匹配，再按编号映射回行，结果与逐行逐列 str.contains 相同，
+    但只需扫描不同取值 (型号、配置、模具号等重复很多)。
+    """
+
+    def __init__(self, df, skip=SEARCH_SKIP_COLS):
+        self.labels = df.index.to_numpy()
+        self.columns = []
+        for col in (c for c in df.columns if c not in skip):
+            codes, uniques = pd.factorize(df[col].astype(str).str.lower())
+            self.columns.append((codes, pd.Series(uniques, dtype=object)))
+
+    def _term_mask(self, term):
+        mask = np.zeros(len(self.labels), dtype=bool)
+        for codes, uniques in self.columns:
+            hit = uniques.str.contains(term, regex=False).to_numpy(dtype=bool)
+            if hit.any(): mask |= hit[codes]
+        return mask
+
+    def search(self, query):
+        # 空格分隔的多个词取交集 (AND)，每个词在任意一列中作为子串出现即可
+        mask = None
+        for term in str(query).lower().split():
+            mask = self._term_mask(term) if mask is None else mask & self._term_mask(term)
+            if not mask.any(): break
+        return self.labels[mask] if mask is not None else np.array([], dtype=np.int64)
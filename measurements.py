@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from schema import frame_memory, is_data_col, normalize_frame
+
+# ==========================================
+# 测量值紧凑存储：一维浮点缓冲区 + 每条记录的偏移量和长度
+# ==========================================
+
+
+def data_col_name(position):
+    return f"数据_{position}"
+
+
+def data_col_position(col):
+    # 数据_N -> N；列名不是这种格式时返回 None
+    try: position = int(str(col).split("_", 1)[1])
+    except (IndexError, ValueError): return None
+    return position if position > 0 else None
+
+
+def data_cols_of(df):
+    cols = [c for c in df.columns if is_data_col(c)]
+    try: cols.sort(key=lambda c: int(str(c).split("_")[1]))
+    except (IndexError, ValueError): pass
+    return cols
+
+
+class RaggedMeasurements:
+    """每条记录只保存实际的 N 个位置 (N 由盘型号决定)，替代宽表里 50 列稀疏的 数据_N。"""
+
+    def __init__(self, values, offsets, lengths, index, width, source_columns=None):
+        self.values = values
+        self.offsets = offsets
+        self.lengths = lengths
+        self.index = index
+        self.width = width
+        # 读入时实际用到的 数据_N 列 (表格里可能不连续)，记录表据此删除原始列
+        self.source_columns = self.columns if source_columns is None else list(source_columns)
+
+    @classmethod
+    def from_wide(cls, df, gap_count=None, disc_col="盘型号"):
+        # 按列名里的 N 定位，缺少的 数据_N 列视为空，不会把后面的列挪到前面
+        cols = [c for c in data_cols_of(df) if data_col_position(c)]
+        positions = np.array([data_col_position(c) for c in cols], dtype=np.int64)
+        width = int(positions.max()) if len(cols) else 0
+        if not width or df.empty:
+            return cls(np.empty(0, np.float32), np.zeros(len(df), np.int64), np.zeros(len(df), np.int32), df.index, width, cols)
+        wide = np.full((len(df), width), np.nan, dtype=np.float32)
+        wide[:, positions - 1] = df[cols].to_numpy(dtype=np.float32, na_value=np.nan)
+        present = ~np.isnan(wide)
+        # 最后一个非空位置；长度取 盘型号 的间隙数与它的较大者，保证能无损还原
+        last = np.where(present.any(axis=1), width - np.argmax(present[:, ::-1], axis=1), 0)
+        lengths = last
+        if gap_count is not None and disc_col in df.columns:
+            discs = df[disc_col].astype(str)
+            counts = {d: gap_count(d) for d in discs.unique()}
+            lengths = np.maximum(discs.map(counts).to_numpy(dtype=np.int64), last)
+        lengths = np.minimum(lengths, width).astype(np.int32)
+        values = wide[np.arange(width) < lengths[:, None]]
+        offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)[:-1]])
+        return cls(values, offsets, lengths, df.index, width, cols)
+
+    @property
+    def columns(self):
+        return [data_col_name(p) for p in range(1, self.width + 1)]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.offsets.nbytes + self.lengths.nbytes
+
+    def record(self, label):
+        i = self.index.get_loc(label)
+        return self.values[self.offsets[i]:self.offsets[i] + self.lengths[i]]
+
+    def _positions(self, labels=None):
+        return np.arange(len(self.index)) if labels is None else self.index.get_indexer(labels)
+
+    def _gather(self, rows, lengths):
+        # 选中记录在一维缓冲区中的下标，以及每个值对应的位置 (从 0 开始)
+        starts = np.repeat(self.offsets[rows], lengths)
+        within = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return starts + within, within
+
+    def to_wide(self, labels=None, width=None):
+        # 还原成表格里的宽表布局 (数据_1..数据_width)
+        width = self.width if width is None else width
+        rows = self._positions(labels)
+        lengths = np.minimum(self.lengths[rows], width).astype(np.int64)
+        out = np.full((len(rows), width), np.nan, dtype=np.float32)
+        flat_idx, _ = self._gather(rows, lengths)
+        out[np.arange(width) < lengths[:, None]] = self.values[flat_idx]
+        return pd.DataFrame(out, columns=[data_col_name(p) for p in range(1, width + 1)], index=self.index[rows])
+
+    def _selected_values(self, labels=None):
+        rows = self._positions(labels)
+        flat_idx, pos = self._gather(rows, self.lengths[rows].astype(np.int64))
+        vals = self.values[flat_idx]
+        has = ~np.isnan(vals)
+        return vals[has].astype(np.float64), pos[has]
+
+    def filled_width(self, labels=None):
+        # 选中记录里最后一个有值的位置，用于决定历史表需要显示几列 数据_N
+        _, pos = self._selected_values(labels)
+        return int(pos.max()) + 1 if len(pos) else 0
+
+    def position_profile(self, labels=None):
+        """按位置 1..N 统计间隙 (记录数/均值/标准差/最小/最大)，全部向量化计算。"""
+        vals, pos = self._selected_values(labels)
+        if not len(vals):
+            return pd.DataFrame(columns=["位置", "记录数", "均值", "标准差", "最小值", "最大值"])
+        n = np.bincount(pos)
+        total = np.bincount(pos, weights=vals)
+        total_sq = np.bincount(pos, weights=vals * vals)
+        mean = total / np.maximum(n, 1)
+        std = np.sqrt(np.maximum(total_sq / np.maximum(n, 1) - mean * mean, 0))
+        vmin = np.full(len(n), np.inf); np.minimum.at(vmin, pos, vals)
+        vmax = np.full(len(n), -np.inf); np.maximum.at(vmax, pos, vals)
+        prof = pd.DataFrame({"位置": np.arange(1, len(n) + 1), "记录数": n, "均值": mean, "标准差": std, "最小值": vmin, "最大值": vmax})
+        return prof[prof["记录数"] > 0].reset_index(drop=True)
+
+
+def prepare_records(raw, gap_count=None):
+    """原始宽表 -> (类型规范化后的记录表, 测量值)。记录表里不再保留 数据_N 稀疏列，attrs["memory"] 记录压缩前后的内存。"""
+    typed = normalize_frame(raw)
+    measurements = RaggedMeasurements.from_wide(typed, gap_count)
+    typed = typed.drop(columns=measurements.source_columns)
+    typed.attrs["memory"] = (frame_memory(raw), frame_memory(typed) + measurements.nbytes)
+    return typed, measurements
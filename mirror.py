@@ -0,0 +1,303 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+import quota
+from storage import update_cells_one_by_one
+
+# ==========================================
+# 本地镜像：SQLite 持久化 + 后台刷新线程
+# ==========================================
+MIRROR_PATH = os.environ.get("GAP_MIRROR_PATH", ".gap_mirror.sqlite")
+REFRESH_INTERVAL = 10
+
+
+def _py(v):
+    if v is None: return None
+    if hasattr(v, "item"): v = v.item()
+    if isinstance(v, float) and v != v: return None
+    return v
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class LocalMirror:
+    """工作表的本地副本：启动时直接从磁盘读取，内存中保留一份 DataFrame。"""
+
+    def __init__(self, path=MIRROR_PATH):
+        self.path = path
+        self.df = pd.DataFrame()
+        self.synced_at = None
+        self.version = 0
+        # 观察者 (例如内存索引) 需实现 reset(df) / added(df) / removed(df)
+        self.observers = []
+        self._lock = threading.RLock()
+        self._load()
+
+    def add_observer(self, observer):
+        with self._lock:
+            observer.reset(self.df)
+            self.observers.append(observer)
+        return observer
+
+    def _notify(self, event, df):
+        for observer in self.observers: getattr(observer, event)(df)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        try:
+            with self._connect() as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+                has_records = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'records'").fetchone()
+                if has_records: self.df = pd.read_sql_query("SELECT * FROM records ORDER BY rowid", conn)
+            self.synced_at = float(meta["synced_at"]) if meta.get("synced_at") else None
+            self.version += 1
+        except Exception:
+            self.df, self.synced_at = pd.DataFrame(), None
+
+    def _write_meta(self, conn):
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('synced_at', ?)", (str(self.synced_at or ""),))
+
+    def _insert(self, conn, df):
+        if df.empty: return
+        cols = ", ".join(_quote(c) for c in self.df.columns)
+        marks = ", ".join("?" for _ in self.df.columns)
+        rows = [[_py(v) for v in r] for r in df.reindex(columns=self.df.columns).itertuples(index=False)]
+        conn.executemany(f"INSERT INTO records ({cols}) VALUES ({marks})", rows)
+
+    def _rowids(self, conn):
+        # 第 i 条记录 (从 0 开始) 对应的 rowid；一次查询取全部，批量修改时按位置直接取
+        return [r[0] for r in conn.execute("SELECT rowid FROM records ORDER BY rowid")]
+
+    def _changed_rows(self, df):
+        # 与当前镜像列相同时，返回 (内容有变化的共同行位置, 共同行数)；列不同返回 None
+        if list(df.columns) != list(self.df.columns): return None
+        n = min(len(df), len(self.df))
+        if not n: return [], 0
+        old = self.df.iloc[:n].astype(object)
+        new = df.iloc[:n].astype(object)
+        old, new = old.where(old.notna(), None).to_numpy(), new.where(new.notna(), None).to_numpy()
+        return [int(p) for p in (old != new).any(axis=1).nonzero()[0]], n
+
+    def _touch(self, synced=False):
+        if synced: self.synced_at = time.time()
+        self.version += 1
+
+    # --- 由后台同步写入 ---
+    def replace(self, df):
+        with self._lock:
+            diff = self._changed_rows(df) if len(self.df.columns) else None
+            old_len = len(self.df)
+            self.df = df.copy()
+            self._touch(synced=True)
+            self._notify("reset", self.df)
+            with self._connect() as conn:
+                if diff is not None:
+                    try: rowids = self._rowids(conn)
+                    except sqlite3.Error: rowids = None
+                    if rowids is None or len(rowids) != old_len: diff = None
+                if diff is not None:
+                    # 列结构没变：只改写内容不同的行，多出的行追加、少了的行删除，不整表重写
+                    changed, n = diff
+                    sets = ", ".join(f"{_quote(c)} = ?" for c in df.columns)
+                    conn.executemany(f"UPDATE records SET {sets} WHERE rowid = ?",
+                                     [[_py(v) for v in df.iloc[p]] + [rowids[p]] for p in changed])
+                    conn.executemany("DELETE FROM records WHERE rowid = ?", [(r,) for r in rowids[n:]])
+                    self._insert(conn, df.iloc[n:])
+                else:
+                    conn.execute("DROP TABLE IF EXISTS records")
+                    if len(df.columns):
+                        # 列不声明类型，保留数字/文本的原始存储形式
+                        conn.execute(f"CREATE TABLE records ({', '.join(_quote(c) for c in df.columns)})")
+                        self._insert(conn, df)
+                self._write_meta(conn)
+
+    def append(self, new_df, synced=True):
+        with self._lock:
+            if self.df.empty:
+                return self.replace(new_df)
+            new_df = new_df.reindex(columns=self.df.columns)
+            self.df = pd.concat([self.df, new_df], ignore_index=True)
+            self._touch(synced=synced)
+            self._notify("added", new_df)
+            with self._connect() as conn:
+                self._insert(conn, new_df)
+                self._write_meta(conn)
+
+    def mark_synced(self):
+        with self._lock:
+            self.synced_at = time.time()
+            with self._connect() as conn: self._write_meta(conn)
+
+    def apply_sync(self, sync):
+        # 镜像与同步器行数一致时只追加新增行，否则(例如本地写入后)整表替换
+        with self._lock:
+            if sync.last_action == "busy": return
+            if sync.last_action == "delta" and len(self.df) == sync.row_count - sync.last_appended:
+                self.append(sync.df.iloc[len(self.df):])
+            elif sync.last_action == "noop" and len(self.df) == sync.row_count:
+                self.mark_synced()
+            else:
+                self.replace(sync.df)
+
+    # --- 由写入路径同步调用 (sheet 坐标：第 1 行为表头) ---
+    def append_row(self, values):
+        with self._lock:
+            if self.df.empty and not len(self.df.columns):
+                self.replace(pd.DataFrame(columns=[str(v) for v in values]))
+                return
+            width = len(self.df.columns)
+            row = (list(values) + [""] * width)[:width]
+            self.append(pd.DataFrame([row], columns=self.df.columns), synced=False)
+
+    def update_cells(self, cells):
+        with self._lock:
+            cells = [(row - 2, col, value) for row, col, value in cells
+                     if 0 <= row - 2 < len(self.df) and 1 <= col <= len(self.df.columns)]
+            if not cells: return
+            positions = sorted(set(pos for pos, _, _ in cells))
+            if self.observers: self._notify("removed", self.df.iloc[positions].copy())
+            # 在副本上修改后整体替换：页面线程手里的旧 DataFrame 不会被改动
+            df = self.df.copy(deep=False)
+            for col_name in set(df.columns[col - 1] for _, col, _ in cells):
+                df[col_name] = self.df[col_name].astype(object)
+            for pos, col, value in cells: df.iat[pos, col - 1] = value
+            with self._connect() as conn:
+                rowids = self._rowids(conn)
+                for pos, col, value in cells:
+                    conn.execute(f"UPDATE records SET {_quote(df.columns[col - 1])} = ? WHERE rowid = ?", (_py(value), rowids[pos]))
+            self.df = df
+            if self.observers: self._notify("added", self.df.iloc[positions].copy())
+            self._touch()
+
+    def update_cell(self, row, col, value):
+        self.update_cells([(row, col, value)])
+
+    def delete_rows(self, start, end=None):
+        with self._lock:
+            end = start if end is None else end
+            positions = [p for p in range(start - 2, end - 1) if 0 <= p < len(self.df)]
+            if not positions: return
+            with self._connect() as conn:
+                rowids = self._rowids(conn)
+                conn.executemany("DELETE FROM records WHERE rowid = ?", [(rowids[p],) for p in positions])
+            if self.observers: self._notify("removed", self.df.iloc[positions])
+            self.df = self.df.drop(self.df.index[positions]).reset_index(drop=True)
+            self._touch()
+
+    def snapshot(self):
+        # 表和版本号在同一把锁下读取；self.df 只整体替换不原地修改，返回的引用不会再变
+        with self._lock:
+            return self.df, self.version
+
+    def age(self):
+        return None if self.synced_at is None else time.time() - self.synced_at
+
+
+class MirroredSheet:
+    """包装存储后端：写操作成功后把改动直接修补到本地镜像和增量同步缓存，其余属性透传。"""
+
+    def __init__(self, sheet, mirror, sync=None):
+        self._sheet = sheet
+        self._mirror = mirror
+        self._sync = sync
+
+    def __getattr__(self, name):
+        return getattr(self._sheet, name)
+
+    def _guard(self):
+        # 写表格与修补缓存放在同一把锁里，避免后台刷新在两者之间把新行又拉一遍
+        return self._sync.lock if self._sync is not None else threading.RLock()
+
+    def append_row(self, values, *args, **kwargs):
+        return self.append_rows([values], *args, **kwargs)
+
+    def append_rows(self, rows, *args, **kwargs):
+        with self._guard():
+            result = self._sheet.append_rows(rows, *args, **kwargs)
+            if isinstance(result, dict) and result.get("resync"):
+                # 新行没有落在表尾 (分区表写入了较早的分区)：就地追加会让之后各行的行号错位，改为立即全量同步
+                if self._sync is not None:
+                    self._sync.invalidate()
+                    self._sync.refresh()
+                    self._mirror.apply_sync(self._sync)
+                return result
+            for values in rows: self._mirror.append_row(values)
+            if self._sync is not None: self._sync.apply_append(rows)
+        return result
+
+    def update_cell(self, row, col, value):
+        return self.batch_update_cells([(row, col, value)])
+
+    def batch_update_cells(self, cells):
+        with self._guard():
+            started = time.perf_counter()
+            try:
+                result = self._sheet.batch_update_cells(cells)
+            except Exception as e:
+                # 批量请求被整体拒绝 (400：某个值或范围无效) 时逐格重写，只把真正写不进去的单元格报告出来；
+                # 逐格调用同样经过配额包装。限流和服务端错误已由配额层重试，仍失败就直接抛出
+                if quota.status_of(e) != 400 or len(cells) < 2: raise
+                result = update_cells_one_by_one(self._sheet, cells)
+                result["api_calls"] += 1
+                result["seconds"] = time.perf_counter() - started
+            failed = set((r, c) for r, c, _ in result["failed"])
+            applied = [cell for cell in cells if (cell[0], cell[1]) not in failed]
+            self._mirror.update_cells(applied)
+            if self._sync is not None: self._sync.apply_cells(applied)
+        return result
+
+    def delete_rows(self, start_index, end_index=None):
+        return self.delete_row_set(range(start_index, (end_index or start_index) + 1))
+
+    def delete_row_set(self, rows):
+        with self._guard():
+            result = self._sheet.delete_row_set(rows)
+            for start, end in result["runs"]:
+                self._mirror.delete_rows(start, end)
+                if self._sync is not None: self._sync.apply_delete(start, end)
+        return result
+
+
+class MirrorRefresher:
+    """守护线程：定期增量同步云端表格并写入本地镜像。"""
+
+    def __init__(self, sync, mirror, interval=REFRESH_INTERVAL):
+        self.sync = sync
+        self.mirror = mirror
+        self.interval = interval
+        self.last_error = None
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gap-mirror-refresher", daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive(): self._thread.start()
+        return self
+
+    def refresh_now(self):
+        try:
+            # 读表格时不持锁 (DeltaSync 内部只在套用结果时短暂加锁)，前台写入不会排在后台读请求后面
+            self.sync.refresh()
+            with self.sync.lock: self.mirror.apply_sync(self.sync)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+
+    def request_refresh(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            # 后台刷新的读请求在读令牌桶里排在写入线程的读和页面读取之后
+            with quota.priority(quota.BACKGROUND): self.refresh_now()
+            self._wake.wait(self.interval)
+            self._wake.clear()
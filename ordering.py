@@ -0,0 +1,48 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 自然排序 (Z5盘 < Z12盘)：每个不同取值只解析一次，排序通过整数编码完成
+# ==========================================
+
+
+@lru_cache(maxsize=8192)
+def natural_key(text):
+    return tuple(int(c) if c.isdigit() else c for c in re.split(r"(\d+)", str(text)))
+
+
+@lru_cache(maxsize=256)
+def natural_order(values):
+    """对一组不同取值 (tuple) 做自然排序，同一取值集合只排一次。"""
+    return tuple(sorted(set(values), key=natural_key))
+
+
+def category_order(series):
+    # 类别列直接用类别表，不必扫描每一行
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.cat.remove_unused_categories().cat.categories
+    else:
+        values = series.dropna().unique()
+    return list(natural_order(tuple(str(v) for v in values)))
+
+
+def rank_codes(series, order):
+    """按给定顺序返回每行的整数名次 (向量化)，不在顺序表里的取值排在最后。"""
+    codes = pd.Categorical(series.astype(str), categories=order).codes.astype(np.int64)
+    return np.where(codes < 0, len(order), codes)
+
+
+def natural_sort_key(series):
+    # 供 DataFrame.sort_values(key=...) 使用：数值列原样比较，文本/类别列按自然顺序的名次比较
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype): return series
+    return pd.Series(rank_codes(series, category_order(series)), index=series.index)
+
+
+def sort_by_orders(df, orders, numeric=()):
+    # orders: {列名: 顺序表}，文本列按名次排；numeric 里的列 (如角度) 直接按数值排
+    ranks = {f"_{col}_rank": rank_codes(df[col], order) for col, order in orders.items()}
+    out = df.assign(**ranks).sort_values(by=[*ranks, *numeric], kind="stable")
+    return out.drop(columns=list(ranks))
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import quota
+
+# ==========================================
+# 写后队列 (Outbox)：提交先落本地，后台批量追加到表格
+# ==========================================
+OUTBOX_PATH = os.environ.get("GAP_OUTBOX_PATH", ".gap_outbox.sqlite")
+FLUSH_BATCH_SIZE = 500
+FLUSH_POLL_INTERVAL = 2
+MAX_BACKOFF = 300
+DONE_RETENTION = 24 * 3600
+
+
+def _norm(v):
+    if v is None: return ""
+    if hasattr(v, "item"): v = v.item()
+    try: return repr(round(float(v), 6))
+    except (TypeError, ValueError): return str(v).strip()
+
+
+def row_key(values):
+    # 幂等键：由整行内容决定，同一秒内重复点击提交只会入队一次
+    return hashlib.sha1("\x1f".join(_norm(v) for v in values).encode("utf-8")).hexdigest()
+
+
+class Outbox:
+    """SQLite 持久化的待写入队列，进程重启后未写入的记录仍会继续发送。"""
+
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE, payload TEXT NOT NULL, "
+                "created REAL, attempts INTEGER DEFAULT 0, next_try REAL DEFAULT 0, "
+                "last_error TEXT, done REAL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def enqueue(self, values):
+        key = row_key(values)
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, payload, created) VALUES (?, ?, ?)",
+                (key, json.dumps(list(values), ensure_ascii=False), time.time()))
+        return key, cur.rowcount == 1
+
+    def enqueue_many(self, rows):
+        # 批量导入：一个事务写入整批，返回新入队的条数 (已在队列中的相同记录会被忽略)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO outbox (key, payload, created) VALUES (?, ?, ?)",
+                [(row_key(values), json.dumps(list(values), ensure_ascii=False), now) for values in rows])
+            return conn.total_changes - before
+
+    def due(self, limit=FLUSH_BATCH_SIZE):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, key, payload, attempts FROM outbox WHERE done IS NULL AND next_try <= ? ORDER BY id LIMIT ?",
+                (time.time(), limit)).fetchall()
+
+    def pending_rows(self):
+        with self._connect() as conn:
+            return [json.loads(r[0]) for r in conn.execute("SELECT payload FROM outbox WHERE done IS NULL ORDER BY id")]
+
+    def pending_count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE done IS NULL").fetchone()[0]
+
+    def last_error(self):
+        with self._connect() as conn:
+            hit = conn.execute("SELECT last_error FROM outbox WHERE done IS NULL AND last_error IS NOT NULL ORDER BY id LIMIT 1").fetchone()
+        return hit[0] if hit else None
+
+    def mark_done(self, ids):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany("UPDATE outbox SET done = ?, last_error = NULL WHERE id = ?", [(now, i) for i in ids])
+            conn.execute("DELETE FROM outbox WHERE done IS NOT NULL AND done < ?", (now - DONE_RETENTION,))
+
+    def mark_failed(self, items, error):
+        # 指数退避 + 抖动，避免多个进程同时重试
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "UPDATE outbox SET attempts = ?, next_try = ?, last_error = ? WHERE id = ?",
+                [(attempts + 1, now + min(MAX_BACKOFF, 2 ** attempts) * random.uniform(0.5, 1.5), str(error), item_id)
+                 for item_id, _, _, attempts in items])
+
+
+class OutboxFlusher:
+    """后台线程：把到期的队列记录用一次 append_rows 批量写入表格。"""
+
+    def __init__(self, outbox, sheet, headers, existing_keys=None, poll_interval=FLUSH_POLL_INTERVAL):
+        self.outbox = outbox
+        self.sheet = sheet
+        self.headers = headers
+        # 重试前用来查询表格里已有记录的幂等键，防止“请求已成功但响应丢失”时重复写入
+        self.existing_keys = existing_keys
+        self.poll_interval = poll_interval
+        self._header_checked = False
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gap-outbox-flusher", daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive(): self._thread.start()
+        return self
+
+    def wake(self):
+        self._wake.set()
+
+    def _ensure_header(self):
+        # 每个进程只检查一次表头
+        if self._header_checked: return
+        if not self.sheet.row_values(1): self.sheet.append_rows([self.headers])
+        self._header_checked = True
+
+    def flush_once(self):
+        items = self.outbox.due()
+        if not items: return 0
+        try:
+            self._ensure_header()
+            if any(attempts > 0 for *_, attempts in items) and self.existing_keys is not None:
+                present = self.existing_keys()
+                already = [i for i in items if i[1] in present]
+                if already: self.outbox.mark_done([i[0] for i in already])
+                items = [i for i in items if i[1] not in present]
+            if items:
+                self.sheet.append_rows([json.loads(payload) for _, _, payload, _ in items])
+                self.outbox.mark_done([i[0] for i in items])
+            return len(items)
+        except Exception as e:
+            self.outbox.mark_failed(items, e)
+            return 0
+
+    def _run(self):
+        while True:
+            # 写入前的表头检查、重试前的去重读取在读令牌桶里排在最前
+            with quota.priority(quota.WRITE):
+                while self.flush_once(): pass
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
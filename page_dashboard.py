@@ -0,0 +1,467 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from schema import fill_blank_category
+from cube import GapCube
+from gap_model import LOW_GAP_THRESHOLD, GapModel, risk_combinations
+from ordering import category_order, sort_by_orders
+from measurements import prepare_records
+from partitions import ARCHIVE, partition_bounds
+import catalog
+import profiling
+
+# ==========================================
+# 模块二：📈 间隙数据分析看板 (绘图库只在打开看板时导入)
+# ==========================================
+# --- 间隙预测模型：挂在镜像上，按新增/删除的记录增量更新 XᵀX / Xᵀy ---
+@st.cache_resource
+def get_gap_model(_mirror):
+    return _mirror.add_observer(GapModel())
+
+@st.cache_resource(max_entries=4)
+def get_filtered_gap_model(_df, version, filter_key):
+    return GapModel.from_frame(_df)
+
+# --- 全组合预测表：按模型指纹缓存，模型不变时不重复计算 ---
+@st.cache_data(max_entries=4)
+def get_prediction_grid(_model, fingerprint, discs, fans, angles):
+    return _model.predict_grid(discs, fans, angles)
+
+# --- 看板聚合立方体：每个数据版本 + 筛选条件构建一次，各图表共用 ---
+@st.cache_resource(max_entries=4)
+def get_gap_cube(_df, version, filter_key):
+    return GapCube(_df)
+
+# --- 归档分区：按所选分区并发加载一次，与镜像里的在线数据合并后再做类型规范化 ---
+@st.cache_resource(ttl=3600, max_entries=4)
+def get_archive_frame(_sheet, keys):
+    return _sheet.read_partitions(keys)
+
+@st.cache_data(max_entries=4)
+def get_archive_records(_sheet, _mirror_df, version, keys):
+    raw = pd.concat([get_archive_frame(_sheet, keys), _mirror_df], ignore_index=True)
+    return prepare_records(raw, catalog.current().gap_count)
+
+# --- 预汇总箱线图：四分位数和须线在服务端算好，只把离群点发给浏览器 ---
+BOX_FULL_POINTS_LIMIT = 2000
+BOX_MAX_OUTLIERS = 2000
+
+def summary_box_figure(cube, df, dim, order, color, hover_cols, to_label=str):
+    stats, outliers = cube.box(dim)
+    fig = go.Figure(go.Box(
+        x=[to_label(v) for v in stats[dim]],
+        q1=stats["q25"], median=stats["q50"], q3=stats["q75"],
+        lowerfence=stats["lowerfence"], upperfence=stats["upperfence"], mean=stats["平均值"],
+        boxpoints=False, marker_color=color, name="平均值"
+    ))
+    if len(outliers) > BOX_MAX_OUTLIERS: outliers = outliers.sample(BOX_MAX_OUTLIERS, random_state=0)
+    if len(outliers):
+        hover = df.loc[outliers["label"], hover_cols].astype(str)
+        fig.add_trace(go.Scatter(
+            x=[to_label(v) for v in outliers[dim]], y=outliers["平均值"], mode="markers",
+            marker=dict(color=color, size=5, opacity=0.6), name="离群点", customdata=hover.to_numpy(),
+            hovertemplate="<br>".join([f"{c}: %{{customdata[{i}]}}" for i, c in enumerate(hover_cols)] + ["平均值: %{y}"]) + "<extra></extra>"
+        ))
+    fig.update_xaxes(categoryorder="array", categoryarray=order)
+    fig.update_layout(showlegend=False, xaxis_title=dim, yaxis_title="平均值")
+    return fig
+
+
+def render(app):
+    df_cloud, data_version = app.df_cloud, app.data_version
+    measurements = app.measurements
+
+    st.title("📈 间隙数据分析看板")
+
+    # 按时间分区时，看板默认只用在线层；需要更早的数据时按日期范围把归档分区并进来
+    archived = getattr(app.sheet, "archived", [])
+    archive_keys = []
+    if archived:
+        with st.expander(f"🗄️ 归档数据 ({len(archived)} 个分区)", expanded=False):
+            first, last = partition_bounds(archived[0])[0], partition_bounds(archived[-1])[1]
+            picked = st.date_input("并入看板的归档日期范围:", value=(), min_value=first, max_value=last)
+            if len(picked) == 2: archive_keys = app.sheet.partitions_for(picked[0], picked[1], ARCHIVE)
+            if archive_keys: st.caption(f"已选 {len(archive_keys)} 个归档分区：{archive_keys[0]} ~ {archive_keys[-1]}")
+    if archive_keys:
+        with profiling.phase("加载归档") as info:
+            df_cloud, measurements = get_archive_records(app.sheet, app.mirror_df, data_version, tuple(archive_keys))
+            info["rows"] = len(df_cloud)
+        data_version = (data_version, tuple(archive_keys))
+    
+    if df_cloud.empty:
+        st.warning("📭 暂无足够的数据生成图表，请先录入数据。")
+    else:
+        df_plot = df_cloud.copy()
+        
+        # 基础数据清洗 (数值/类别类型已在加载时统一)
+        if "盘型号" in df_plot.columns:
+            df_plot["盘型号"] = fill_blank_category(df_plot["盘型号"], "未知盘")
+        if "扇叶型号" in df_plot.columns:
+            df_plot["扇叶型号"] = fill_blank_category(df_plot["扇叶型号"], "未知扇叶")
+
+        # ==========================================
+        # 全局统一自然排序配置
+        # ==========================================
+        sorted_all_discs = category_order(df_plot["盘型号"])
+        sorted_all_fans = category_order(df_plot["扇叶型号"])
+        
+        valid_angles = df_plot["角度"].dropna().unique().tolist()
+        sorted_angles = sorted(valid_angles) 
+        sorted_angle_labels = [f"{a}°" for a in sorted_angles]
+        
+        global_cat_orders = {
+            "盘型号": sorted_all_discs,
+            "扇叶型号": sorted_all_fans,
+            "角度_分类": sorted_angle_labels
+        }
+
+        # --- 顶部全局筛选器 ---
+        with st.expander("⚙️ 图表全局筛选器", expanded=False):
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                filter_discs = st.multiselect("选择【盘型号】:", sorted_all_discs, default=[])
+            with c2:
+                filter_fans = st.multiselect("选择【扇叶型号】:", sorted_all_fans, default=[])
+            with c3:
+                filter_angles = st.multiselect("选择【装配角度】:", sorted_angles, default=[])
+            
+            if filter_discs: df_plot = df_plot[df_plot["盘型号"].isin(filter_discs)]
+            if filter_fans: df_plot = df_plot[df_plot["扇叶型号"].isin(filter_fans)]
+            if filter_angles: df_plot = df_plot[df_plot["角度"].isin(filter_angles)]
+
+        # 树图/热力图/温度图都从同一个立方体汇总，不再各自扫描全表
+        plot_filter_key = (tuple(filter_discs), tuple(filter_fans), tuple(filter_angles))
+        with profiling.phase("聚合立方体", rows=len(df_plot)):
+            cube = get_gap_cube(df_plot, data_version, plot_filter_key)
+
+        # ========================================
+        # 维度一：系统全局视角
+        # ========================================
+        st.write("---")
+        st.subheader("1️⃣ 装配系统全景透视")
+        profiling.mark("图表 1️⃣ 装配系统全景透视")
+        
+        df_tree_agg = cube.marginal(["盘型号", "扇叶型号", "角度"]).copy()
+        if not df_tree_agg.empty:
+            df_tree_agg["角度_分类"] = df_tree_agg["角度"].astype(str) + "°"
+            df_tree_agg["系统"] = "总数据"
+            
+            # 与全局类别顺序一致的整数名次，角度直接按数值排
+            df_tree_agg = sort_by_orders(df_tree_agg, {"盘型号": sorted_all_discs, "扇叶型号": sorted_all_fans}, numeric=["角度"])
+            df_tree_agg["均等面积"] = 1 
+            
+            fig_tree = px.treemap(
+                df_tree_agg, 
+                path=["系统", "盘型号", "扇叶型号", "角度_分类"], 
+                values="均等面积", 
+                color="平均值",
+                color_continuous_scale="RdYlGn", 
+                hover_data={"平均值": ':.2f', "数据量": True, "均等面积": False} 
+            )
+            fig_tree.update_traces(sort=False)
+            
+            fig_tree.update_layout(height=500, margin=dict(t=30, l=10, r=10, b=10))
+            st.plotly_chart(fig_tree, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：矩形树图 (颜色越红代表间隙越小)</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        # ========================================
+        # 维度二：单因子稳定性分析
+        # ========================================
+        st.write("---")
+        st.subheader("2️⃣ 盘型号稳定性分析")
+        profiling.mark("图表 2️⃣ 盘型号稳定性分析")
+
+        # 数据量大时箱线图只发送统计值和离群点；数据少时可切回显示全部数据点
+        box_full_points = st.toggle("箱线图显示全部数据点", value=cube.n_records <= BOX_FULL_POINTS_LIMIT,
+                                    help=f"关闭时箱体由服务端预先计算，只显示离群点 (最多 {BOX_MAX_OUTLIERS} 个)")
+        
+        if not cube.marginal(["盘型号"]).empty:
+            if not box_full_points:
+                fig_disc = summary_box_figure(cube, df_plot, "盘型号", sorted_all_discs, "#3498db", ["扇叶型号", "工单号", "角度"])
+            else:
+                fig_disc = px.box(
+                    df_plot.dropna(subset=["盘型号", "平均值"]), 
+                    x="盘型号", 
+                    y="平均值", 
+                    points="all", 
+                    hover_data=["扇叶型号", "工单号", "角度"],
+                    color_discrete_sequence=["#3498db"],
+                    category_orders=global_cat_orders 
+                )
+            fig_disc.add_hline(y=0, line_dash="dash", line_color="red", line_width=3)
+            fig_disc.update_layout(xaxis_tickangle=-45, height=450)
+            st.plotly_chart(fig_disc, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：箱线图</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        st.write("---")
+        st.subheader("3️⃣ 扇叶型号稳定性分析")
+        profiling.mark("图表 3️⃣ 扇叶型号稳定性分析")
+        
+        if not cube.marginal(["扇叶型号"]).empty:
+            if not box_full_points:
+                fig_fan = summary_box_figure(cube, df_plot, "扇叶型号", sorted_all_fans, "#2ecc71", ["盘型号", "工单号", "角度"])
+            else:
+                fig_fan = px.box(
+                    df_plot.dropna(subset=["扇叶型号", "平均值"]), 
+                    x="扇叶型号", 
+                    y="平均值", 
+                    points="all", 
+                    hover_data=["盘型号", "工单号", "角度"],
+                    color_discrete_sequence=["#2ecc71"],
+                    category_orders=global_cat_orders 
+                )
+            fig_fan.add_hline(y=0, line_dash="dash", line_color="red", line_width=3)
+            fig_fan.update_layout(xaxis_tickangle=-45, height=450)
+            st.plotly_chart(fig_fan, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：箱线图</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        st.write("---")
+        st.subheader("4️⃣ 装配角度稳定性分析")
+        profiling.mark("图表 4️⃣ 装配角度稳定性分析")
+        
+        if not cube.marginal(["角度"]).empty:
+            if not box_full_points:
+                fig_angle_stab = summary_box_figure(cube, df_plot, "角度", sorted_angle_labels, "#9b59b6", ["盘型号", "扇叶型号", "工单号"], to_label=lambda a: f"{a}°")
+            else:
+                df_angle_stab = df_plot.dropna(subset=["角度", "平均值"]).copy()
+                df_angle_stab["角度_分类"] = df_angle_stab["角度"].astype(str) + "°"
+                fig_angle_stab = px.box(
+                    df_angle_stab, 
+                    x="角度_分类", 
+                    y="平均值", 
+                    points="all", 
+                    hover_data=["盘型号", "扇叶型号", "工单号"],
+                    color_discrete_sequence=["#9b59b6"],
+                    category_orders=global_cat_orders 
+                )
+            fig_angle_stab.add_hline(y=0, line_dash="dash", line_color="red", line_width=3)
+            fig_angle_stab.update_layout(xaxis_tickangle=-45, height=450, xaxis_title="装配角度")
+            st.plotly_chart(fig_angle_stab, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：箱线图</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        # ========================================
+        # 维度三：双因子交叉矩阵分析
+        # ========================================
+        st.write("---")
+        st.subheader("5️⃣ 盘型号与扇叶型号交叉分析")
+        profiling.mark("图表 5️⃣ 盘型号与扇叶型号交叉分析")
+        
+        if not cube.marginal(["盘型号", "扇叶型号"]).empty:
+            pivot_fan = cube.pivot("盘型号", "扇叶型号")
+            
+            index_sorted = [d for d in sorted_all_discs if d in pivot_fan.index]
+            cols_sorted = [f for f in sorted_all_fans if f in pivot_fan.columns]
+            pivot_fan = pivot_fan.reindex(index=index_sorted, columns=cols_sorted)
+            
+            fig_heat_fan = px.imshow(
+                pivot_fan, 
+                text_auto=".2f", 
+                aspect="auto", 
+                color_continuous_scale="RdYlGn",
+                labels=dict(x="扇叶型号", y="盘型号", color="平均间隙")
+            )
+            fig_heat_fan.update_layout(height=450)
+            st.plotly_chart(fig_heat_fan, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：热力图 (颜色越红代表间隙越小)</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        st.write("---")
+        st.subheader("6️⃣ 盘型号与装配角度交叉分析")
+        profiling.mark("图表 6️⃣ 盘型号与装配角度交叉分析")
+        
+        if not cube.marginal(["盘型号", "角度"]).empty:
+            pivot_disc_angle = cube.pivot("盘型号", "角度")
+            pivot_disc_angle.columns = [f"{col}°" for col in pivot_disc_angle.columns]
+            
+            index_sorted = [d for d in sorted_all_discs if d in pivot_disc_angle.index]
+            cols_sorted = [a for a in sorted_angle_labels if a in pivot_disc_angle.columns]
+            pivot_disc_angle = pivot_disc_angle.reindex(index=index_sorted, columns=cols_sorted)
+            
+            fig_heat_disc_angle = px.imshow(
+                pivot_disc_angle, 
+                text_auto=".2f", 
+                aspect="auto", 
+                color_continuous_scale="RdYlGn",
+                labels=dict(x="装配角度", y="盘型号", color="平均间隙")
+            )
+            fig_heat_disc_angle.update_layout(height=450)
+            st.plotly_chart(fig_heat_disc_angle, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：热力图 (颜色越红代表间隙越小)</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        st.write("---")
+        st.subheader("7️⃣ 扇叶型号与装配角度交叉分析")
+        profiling.mark("图表 7️⃣ 扇叶型号与装配角度交叉分析")
+        
+        if not cube.marginal(["扇叶型号", "角度"]).empty:
+            pivot_fan_angle = cube.pivot("扇叶型号", "角度")
+            pivot_fan_angle.columns = [f"{col}°" for col in pivot_fan_angle.columns]
+            
+            index_sorted = [f for f in sorted_all_fans if f in pivot_fan_angle.index]
+            cols_sorted = [a for a in sorted_angle_labels if a in pivot_fan_angle.columns]
+            pivot_fan_angle = pivot_fan_angle.reindex(index=index_sorted, columns=cols_sorted)
+            
+            fig_heat_fan_angle = px.imshow(
+                pivot_fan_angle, 
+                text_auto=".2f", 
+                aspect="auto", 
+                color_continuous_scale="RdYlGn",
+                labels=dict(x="装配角度", y="扇叶型号", color="平均间隙")
+            )
+            fig_heat_fan_angle.update_layout(height=450)
+            st.plotly_chart(fig_heat_fan_angle, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：热力图 (颜色越红代表间隙越小)</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        # ========================================
+        # 维度四：环境因子
+        # ========================================
+        st.write("---")
+        st.subheader("8️⃣ 环境温度影响趋势")
+        profiling.mark("图表 8️⃣ 环境温度影响趋势")
+        
+        df_temp_agg = cube.marginal(["温度_bin"]).rename(columns={"温度_bin": "温度_取整"})
+        if not df_temp_agg.empty:
+            df_temp_agg = df_temp_agg.astype({"温度_取整": int}).sort_values("温度_取整")
+            
+            fig_temp = px.bar(
+                df_temp_agg, 
+                x="温度_取整", 
+                y="平均值",
+                text_auto=".2f", 
+                color="平均值",   
+                color_continuous_scale="RdYlGn", 
+                labels={"温度_取整": "环境温度 (°C)", "平均值": "整体平均间隙", "数据量": "测试记录数"},
+                hover_data=["数据量"]
+            )
+            fig_temp.update_xaxes(type='category')
+            fig_temp.update_layout(height=450)
+            st.plotly_chart(fig_temp, use_container_width=True)
+            st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：聚合柱状图 (颜色越红代表间隙越小)</div>", unsafe_allow_html=True)
+        else:
+            st.info("数据不足")
+
+        # ========================================
+        # 维度五：AI 预测引擎 
+        # ========================================
+        st.write("---")
+        st.subheader("9️⃣ 间隙预测")
+        profiling.mark("图表 9️⃣ 间隙预测")
+        
+        # 不筛选时直接使用镜像上增量维护的模型，筛选或并入归档后按 数据版本 + 筛选条件 构建一次
+        if any(plot_filter_key) or archive_keys:
+            gap_model = get_filtered_gap_model(df_plot, data_version, plot_filter_key)
+        else:
+            gap_model = get_gap_model(app.mirror)
+        with profiling.phase("模型求解", rows=gap_model.n_rows):
+            model_solution = gap_model.solve()
+        if model_solution is not None:
+            # 1. UI 交互：用户输入预测条件 (模型已缓存，修改条件不会重新训练)
+            st.markdown("###### 🎯 模拟装配条件")
+            col_p1, col_p2, col_p3 = st.columns(3)
+            with col_p1:
+                pred_disc = st.selectbox("选择模拟【盘型号】:", sorted_all_discs, key="pred_disc")
+            with col_p2:
+                pred_fan = st.selectbox("选择模拟【扇叶型号】:", sorted_all_fans, key="pred_fan")
+            with col_p3:
+                pred_angle = st.number_input("输入模拟【角度】:", min_value=10.0, max_value=60.0, value=30.0, step=0.5, key="pred_angle")
+
+            # 2. 进行预测
+            raw_pred_value = gap_model.predict(pred_disc, pred_fan, pred_angle)
+            
+            # 物理极限制约：间隙不可能为负
+            is_interference = raw_pred_value < 0
+            pred_value = max(0.0, raw_pred_value)
+
+            # 3. 提取公式系数 (没见过的类别修正值为 0)
+            intercept = model_solution["intercept"]
+            angle_coef = model_solution["angle"]
+            disc_coef = model_solution["coef"].get(("盘型号", pred_disc), 0.0)
+            fan_coef = model_solution["coef"].get(("扇叶型号", pred_fan), 0.0)
+            score = model_solution["r2"]
+
+            # 4. 展示结果
+            st.markdown("###### 💡 预测结果与底层公式")
+
+            if is_interference:
+                st.markdown(f"### 预期平均间隙：<span style='color:red'>0.000</span> <span style='font-size:18px; color:red;'>(⚠️ 理论值为 {raw_pred_value:.3f})</span>", unsafe_allow_html=True)
+            else:
+                pred_color = "red" if pred_value <= LOW_GAP_THRESHOLD else "green" 
+                st.markdown(f"### 预期平均间隙：<span style='color:{pred_color}'>{pred_value:.3f}</span>", unsafe_allow_html=True)
+
+            formula_str = (
+                f"**理论公式** = 基础常量 ({intercept:.4f}) "
+                f"<br> &nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; "
+                f"+ {pred_disc} 专属修正值 ({disc_coef:.4f}) "
+                f"<br> &nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; "
+                f"+ {pred_fan} 专属修正值 ({fan_coef:.4f}) "
+                f"<br> &nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; "
+                f"+ 角度影响 ({pred_angle} × {angle_coef:.4f} = {pred_angle * angle_coef:.4f})"
+            )
+            if is_interference:
+                formula_str += "<br><br>*📌 注：数学模型计算的理论间隙为负值，但在实际物理装配中，间隙最小为 0。*"
+                
+            st.info(formula_str)
+
+            st.caption(f"当前模型基于 **{model_solution['n']}** 条历史数据自动训练生成。拟合度 (R² Score): {score:.2f}。系统每录入一条新数据，以上公式参数均会自动微调优化。")
+
+            # 5. 全组合批量预测：所有 盘型号 × 扇叶型号 × 常用角度 一次算完，列出间隙过小或干涉的组合
+            with profiling.phase("全组合预测"):
+                df_grid = get_prediction_grid(gap_model, gap_model.fingerprint, tuple(sorted_all_discs), tuple(sorted_all_fans), tuple(catalog.current().angles))
+            if df_grid is not None:
+                df_risk = risk_combinations(df_grid)
+                with st.expander(f"📋 全组合预测：{len(df_risk)} / {len(df_grid)} 个组合预测间隙 ≤ {LOW_GAP_THRESHOLD} 或干涉", expanded=False):
+                    risk_kw = st.text_input("🔍 搜索盘型号/扇叶型号 (空格分隔多个词)", key="risk_kw")
+                    for term in risk_kw.lower().split():
+                        df_risk = df_risk[(df_risk["盘型号"] + " " + df_risk["扇叶型号"]).str.lower().str.contains(term, regex=False)]
+                    st.dataframe(
+                        df_risk, hide_index=True, use_container_width=True,
+                        column_config={"预测间隙": st.column_config.NumberColumn(format="%.3f"), "角度": st.column_config.NumberColumn(format="%.1f°")}
+                    )
+        else:
+            st.info("⚠️ 历史有效数据量不足 (少于10条)，AI 暂无法推导准确公式。请继续录入数据。")
+
+        # ========================================
+        # 维度六：单盘各位置间隙剖面
+        # ========================================
+        st.write("---")
+        st.subheader("🔟 各位置间隙剖面")
+        profiling.mark("图表 🔟 各位置间隙剖面")
+
+        profile_discs = [d for d in sorted_all_discs if d in set(df_plot["盘型号"].astype(str))]
+        if profile_discs:
+            profile_disc = st.selectbox("选择【盘型号】:", profile_discs, key="profile_disc")
+            profile_labels = df_plot.index[df_plot["盘型号"].astype(str) == profile_disc]
+            df_profile = measurements.position_profile(profile_labels)
+            if not df_profile.empty:
+                fig_profile = px.bar(
+                    df_profile,
+                    x="位置",
+                    y="均值",
+                    error_y="标准差",
+                    color="均值",
+                    color_continuous_scale="RdYlGn",
+                    hover_data={"记录数": True, "最小值": ':.3f', "最大值": ':.3f', "标准差": ':.3f'},
+                    labels={"位置": "间隙位置", "均值": "平均间隙"}
+                )
+                fig_profile.add_hline(y=0, line_dash="dash", line_color="red", line_width=3)
+                fig_profile.update_xaxes(type='category')
+                fig_profile.update_layout(height=450)
+                st.plotly_chart(fig_profile, use_container_width=True)
+                st.markdown("<div style='font-size: 12px; color: #888888; margin-top: -10px;'>图表类型：位置剖面柱状图 (误差线为标准差，颜色越红代表间隙越小)</div>", unsafe_allow_html=True)
+            else:
+                st.info("数据不足")
+        else:
+            st.info("数据不足")
@@ -0,0 +1,399 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from outbox import row_key
+from indexes import KeywordIndex, combo_key
+from ordering import category_order, natural_sort_key
+from export import EXPORT_FORMATS, available_formats, export_bytes
+from schema import MAX_DATA_COLS
+import bulk_import
+import catalog
+import profiling
+
+# ==========================================
+# 模块一：📝 数据录入与管理
+# ==========================================
+# 历史记录表分页：每次只把一页数据发给浏览器
+PAGE_SIZE_OPTIONS = [50, 100, 200, 500]
+DEFAULT_PAGE_SIZE = 100
+
+# --- 关键词倒排索引：每个数据版本构建一次，跨会话共享 ---
+@st.cache_resource(max_entries=2)
+def get_keyword_index(_df, version):
+    return KeywordIndex(_df)
+
+# --- 导出文件：点击下载时才生成，按数据版本 + 筛选条件 + 格式缓存 ---
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_export(_df, _measurements, version, view_key, cols, fmt):
+    return export_bytes(_df, _measurements, list(cols), fmt)
+
+
+# --- 历史表编辑：记住编辑开始时每一行对应的记录，保存/删除时按内容指纹核对，防止后台数据变化后写错行 ---
+def record_fingerprints(df, cols):
+    return [row_key(r) for r in df[cols].itertuples(index=False)]
+
+def resolve_sheet_row(df_cloud, cols, fingerprint, sheet_row, entered_at):
+    """返回记录当前所在的表格行号；记录已被修改或删除时返回 None。"""
+    pos = sheet_row - 2
+    if 0 <= pos < len(df_cloud) and record_fingerprints(df_cloud.iloc[pos:pos + 1], cols)[0] == fingerprint: return sheet_row
+    # 行号变了 (前面有记录被删除/插入)：在同一录入时间的记录里按指纹找，必须唯一
+    candidates = df_cloud[df_cloud["录入时间"].astype(str) == entered_at]
+    hits = [idx for idx, fp in zip(candidates.index, record_fingerprints(candidates, cols)) if fp == fingerprint]
+    return int(candidates.loc[hits[0], "_original_row_index"]) if len(hits) == 1 else None
+
+
+def render(app):
+    sheet, outbox, outbox_flusher, combo_index = app.sheet, app.outbox, app.outbox_flusher, app.combo_index
+    df_cloud, measurements, data_version = app.df_cloud, app.measurements, app.data_version
+
+    st.title("📏 间隙测量数据记录系统")
+
+    # 目录文件有改动时自动重新加载；新文件校验失败则继续用上一版并提示
+    cat = catalog.current()
+    if catalog.last_error(): st.warning(f"⚠️ 扇叶目录更新失败，仍在使用版本 {cat.revision}: {catalog.last_error()}")
+
+    st.markdown("##### 1️⃣ 请选择扇叶大类")
+    category_filter = st.radio("Series Filter", cat.series, horizontal=True, label_visibility="collapsed")
+
+    st.write("---")
+    f1, f2 = st.columns([2, 1])
+    with f1:
+        fan_options = cat.series_fans[category_filter]
+        selected_fan_model = st.selectbox("2️⃣ 选择扇叶型号", fan_options)
+    with f2:
+        fan_pn = cat.fan_part[selected_fan_model]
+        st.text_input("对应扇叶料号", value=fan_pn, disabled=True)
+
+    # 扇叶型号决定可用的盘库 (W 系列专用盘、P 系列按配置匹配 Z/W/PMAX40 盘)
+    current_disc_db = cat.discs_for_fan(selected_fan_model)
+    st.caption(f"当前加载盘库: {cat.fan_hint[selected_fan_model]} · 目录版本 {cat.revision}")
+    c1, c2 = st.columns(2)
+    with c1: selected_disc_type = st.selectbox("3️⃣ 选择盘型号", list(current_disc_db.keys()))
+    with c2: selected_angle = st.selectbox("4️⃣ 选择角度", cat.angles)
+
+    available_configs = current_disc_db[selected_disc_type]
+    st.write("---")
+    selected_config_detail = st.selectbox("5️⃣ 选择具体组合/料号 (完整信息)", available_configs, key=f"combo_{selected_disc_type}")
+
+    # 核心逻辑：云端计数检查 (索引查询 + 写入队列中尚未落表的记录)
+    with profiling.phase("上限检查"):
+        target_key = combo_key(selected_fan_model, selected_disc_type, selected_config_detail, selected_angle)
+        current_count = combo_index.count(selected_fan_model, selected_disc_type, selected_config_detail, selected_angle)
+        current_count += sum(1 for p in outbox.pending_rows() if len(p) > 7 and combo_key(p[3], p[5], p[6], p[7]) == target_key)
+
+    is_limit_reached = current_count >= 3
+    if is_limit_reached: st.error(f"⚠️ **已达上限！** 该组合已录入 **{current_count}/3** 次。")
+    else: st.success(f"✅ **状态正常：** 该组合已录入 **{current_count}/3** 次。")
+    with st.expander("📋 查看所有已达上限的组合", expanded=False):
+        df_full_combos = combo_index.at_limit()
+        if df_full_combos.empty: st.caption("暂无已达上限的组合")
+        else: st.dataframe(df_full_combos, hide_index=True, use_container_width=True)
+
+    has_hub = cat.has_hub(selected_config_detail)
+
+    # 4. 模具与环境信息录入
+    st.write("---")
+
+    utc_now = datetime.now(timezone.utc)
+    beijing_now = utc_now.astimezone(timezone(timedelta(hours=8)))
+    default_measure_date = beijing_now.date()
+
+    t_col1, t_col2 = st.columns(2)
+    with t_col1: 
+        measure_date_obj = st.date_input("📅 测量日期", value=default_measure_date, help="点击选择日历日期")
+        measure_time = measure_date_obj.strftime("%Y-%m-%d")
+    with t_col2: 
+        work_order = st.text_input("📝 工单号", placeholder="输入工单号...")
+
+    st.write("")
+    if has_hub:
+        m_col2, m_col3, m_col4 = st.columns(3)
+        with m_col2: blade_mold = st.text_input("叶片模具号", placeholder="输入模号...")
+        with m_col3: plate_mold_1 = st.text_input("Retaining盘模具号", placeholder="输入模号...")
+        with m_col4: plate_mold_2 = st.text_input("Hub盘模具号", placeholder="输入模号...")
+    else:
+        m_col2, m_col3 = st.columns(2)
+        with m_col2: blade_mold = st.text_input("叶片模具号", placeholder="输入模号...")
+        with m_col3: plate_mold_1 = st.text_input("盘模具号 (共用)", placeholder="输入模号...")
+        plate_mold_2 = None
+
+    st.write("") 
+    e1, e2, e3, e4 = st.columns(4)
+    with e1: start_pos = st.selectbox("起始位置说明", ["有刻字", "无刻字"])
+    with e2: is_mixed_mold = st.selectbox("扇叶是否混模", ["否", "是"])
+    with e3: input_temp = st.number_input("🌡️ 温度 (°C)", min_value=-50.0, max_value=100.0, step=0.1, value=None, placeholder="例如: 26.5")
+    with e4: input_humidity = st.number_input("💧 湿度 (%)", min_value=0, max_value=100, step=1, value=None, placeholder="例如: 55")
+
+    # 5. 数据录入表单
+    st.write("---")
+    data_points_count = cat.gap_count(selected_disc_type)
+    st.subheader(f"📝 录入数据: {selected_disc_type} (需录入 {data_points_count} 组)")
+    with st.form("data_entry_form", clear_on_submit=True):
+        input_values = {}
+        cols_per_row = 4
+        current_cols = None
+        for i in range(1, data_points_count + 1):
+            col_index = (i - 1) % cols_per_row
+            if col_index == 0: current_cols = st.columns(cols_per_row)
+            with current_cols[col_index]:
+                input_values[f"Pos_{i}"] = st.number_input(f"位置 {i}", min_value=0.0, step=0.01, format="%.2f", key=f"val_{selected_disc_type}_{i}", value=None, placeholder="0.00")
+        st.write("")
+        btn_label = "💾 提交并保存到云端" if not is_limit_reached else "⛔️ 次数已满"
+        submitted = st.form_submit_button(btn_label, type="primary", disabled=is_limit_reached)
+
+    # 6. 保存逻辑
+    if submitted:
+        if current_count >= 3: st.error("❌ 提交被拒绝：已达上限。")
+        else:
+            current_sys_time_str = beijing_now.strftime("%Y-%m-%d %H:%M:%S")
+            vals_list = [v for k, v in input_values.items() if v is not None]
+            val_max = max(vals_list) if vals_list else 0
+            val_min = min(vals_list) if vals_list else 0
+            val_avg = round(sum(vals_list) / len(vals_list), 3) if vals_list else 0
+            
+            row_data = [
+                current_sys_time_str, measure_time, work_order, selected_fan_model, fan_pn, selected_disc_type, selected_config_detail, selected_angle, 
+                blade_mold, plate_mold_1, plate_mold_2, start_pos, is_mixed_mold, input_temp, input_humidity, 
+                data_points_count, val_max, val_min, val_avg
+            ]
+            
+            for i in range(1, MAX_DATA_COLS + 1):
+                if i <= data_points_count: row_data.append(input_values.get(f"Pos_{i}", ""))
+                else: row_data.append("") 
+            _, is_new = outbox.enqueue(row_data)
+            outbox_flusher.wake()
+            if is_new: st.session_state["entry_notice"] = f"✅ 已提交，正在后台写入云端 ({current_sys_time_str})"
+            else: st.session_state["entry_notice"] = "ℹ️ 该记录已在提交队列中，无需重复提交"
+            st.rerun()
+
+    if "entry_notice" in st.session_state: st.success(st.session_state.pop("entry_notice"))
+
+    # 6.1 批量导入：整张表一次校验、一次入队
+    with st.expander("📥 批量导入 (CSV / Excel)", expanded=False):
+        st.caption("每行一条记录，测量值填在 数据_1..数据_N (N 为该盘型号的间隙数)；扇叶料号、数据量、最大/最小/平均值由系统计算。")
+        st.download_button("⬇️ 下载导入模板", data=bulk_import.template_bytes(), file_name="间隙数据导入模板.csv", mime="text/csv", on_click="ignore")
+        # 导入完成后换一个 key，清空已上传的文件
+        upload = st.file_uploader("选择文件", type=["csv", "xlsx"], key=f"bulk_import_file_{st.session_state.get('bulk_import_seq', 0)}")
+        if upload is not None:
+            try:
+                df_upload = bulk_import.read_table(upload.name, upload.getvalue())
+            except Exception as e:
+                st.error(f"❌ 文件读取失败: {e}")
+                df_upload = None
+            if df_upload is not None:
+                entered_at = beijing_now.strftime("%Y-%m-%d %H:%M:%S")
+                with profiling.phase("批量导入校验", rows=len(df_upload)):
+                    batch = bulk_import.validate(df_upload, cat, combo_index.count_key, outbox.pending_rows(), entered_at)
+                st.write(f"共 **{batch.n_total}** 行，可导入 **{batch.n_valid}** 行，有问题 **{batch.n_total - batch.n_valid}** 行")
+                if not batch.problems.empty: st.dataframe(batch.problems, hide_index=True, use_container_width=True)
+                if st.button(f"📤 导入 {batch.n_valid} 条有效记录", type="primary", disabled=batch.n_valid == 0):
+                    n_new = outbox.enqueue_many(batch.rows)
+                    outbox_flusher.wake()
+                    st.session_state["entry_notice"] = f"✅ 已导入 {n_new} 条记录，正在后台写入云端 ({entered_at})"
+                    st.session_state["bulk_import_seq"] = st.session_state.get("bulk_import_seq", 0) + 1
+                    st.rerun()
+
+    # 7. 历史记录 & 筛选 & 管理
+    st.divider()
+    st.subheader("📊 云端历史记录管理")
+    
+    if not df_cloud.empty:
+        base_cols = ["录入时间", "测量时间", "工单号", "扇叶型号", "扇叶料号", "盘型号", "详细配置/料号", "角度", "叶片模具号", "盘模具号", "Hub模具号", "起始位置", "扇叶是否混模", "温度(°C)", "湿度(%)", "数据量", "最大值", "最小值", "平均值"]
+        final_cols = [c for c in base_cols if c in df_cloud.columns]
+        
+        df_cloud["_original_row_index"] = df_cloud.index + 2
+        
+        with st.container(border=True):
+            f_col1, f_col2, f_col3 = st.columns(3)
+            with f_col1:
+                if "录入时间_dt" in df_cloud.columns and df_cloud["录入时间_dt"].notna().any():
+                    date_range = st.date_input("📅 按录入日期筛选", [])
+                else:
+                    date_range = []
+                    st.warning("⚠️ 日期格式解析失败")
+            with f_col2:
+                unique_fans = category_order(df_cloud["扇叶型号"])
+                selected_fans = st.multiselect("🌀 按扇叶型号筛选", unique_fans, placeholder="默认显示所有")
+            with f_col3:
+                search_kw = st.text_input("🔍 关键词搜索 (任意内容，空格分隔的多个词需同时出现)", placeholder="例如：333525 或 Z5 PAG")
+
+        df_filtered = df_cloud.copy()
+        if len(date_range) == 2:
+            start_d, end_d = date_range
+            df_filtered = df_filtered[(df_filtered["录入时间_dt"].dt.date >= start_d) & (df_filtered["录入时间_dt"].dt.date <= end_d)]
+        if selected_fans: df_filtered = df_filtered[df_filtered["扇叶型号"].isin(selected_fans)]
+        if search_kw.strip():
+            with profiling.phase("关键词搜索", rows=len(df_cloud)):
+                keyword_hits = get_keyword_index(df_cloud, data_version).search(search_kw)
+            df_filtered = df_filtered[df_filtered.index.isin(keyword_hits)]
+
+        # 排序和分页都在服务端完成，编辑器只收到当前页的数据
+        p_col1, p_col2, p_col3, p_col4 = st.columns([2, 1, 1, 1])
+        with p_col1:
+            sort_col = st.selectbox("↕️ 排序列", ["默认 (最新录入在前)"] + final_cols)
+        with p_col2:
+            sort_desc = st.toggle("降序", value=True, disabled=sort_col not in final_cols)
+        with p_col3:
+            page_size = st.selectbox("每页条数", PAGE_SIZE_OPTIONS, index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE))
+        page_count = max(1, -(-len(df_filtered) // page_size))
+        with p_col4:
+            page_no = st.number_input(f"页码 (共 {page_count} 页)", min_value=1, max_value=page_count, value=1, step=1)
+
+        if sort_col in final_cols:
+            df_view = df_filtered.sort_values(sort_col, ascending=not sort_desc, kind="stable", na_position="last", key=natural_sort_key)
+        else:
+            df_view = df_filtered.iloc[::-1]
+        df_page = df_view.iloc[(page_no - 1) * page_size:page_no * page_size]
+
+        valid_data_cols = measurements.columns[:measurements.filled_width(df_page.index)]
+        df_show = pd.concat([
+            df_page[final_cols],
+            measurements.to_wide(df_page.index, width=len(valid_data_cols)),
+            df_page[["_original_row_index"]],
+        ], axis=1)
+        df_show.insert(0, "删除?", False)
+        
+        # 数值列加载时已是浮点类型，这里只为编辑器转换显示格式
+        for col in df_show.columns:
+            if isinstance(df_show[col].dtype, pd.CategoricalDtype):
+                df_show[col] = df_show[col].astype(str)
+            elif df_show[col].dtype == "float32":
+                df_show[col] = df_show[col].astype("float64").round(6)
+
+        first_row = (page_no - 1) * page_size + 1 if len(df_page) else 0
+        st.caption(f"当前筛选结果：共 **{len(df_view)}** 条，本页显示第 {first_row}-{first_row + len(df_page) - 1 if len(df_page) else 0} 条 | ✏️ **双击表格内容可直接修改，改完请点击下方【保存修改】按钮**")
+
+        my_column_config = {
+            "删除?": st.column_config.CheckboxColumn("删除?", help="勾选后点击下方红色按钮删除", default=False, width="small"),
+            "_original_row_index": None, 
+            "录入时间_dt": None, 
+            "录入时间": st.column_config.TextColumn(disabled=True), 
+            "测量时间": st.column_config.TextColumn(width="medium"),
+            "工单号": st.column_config.TextColumn(width="medium"),
+            "扇叶型号": st.column_config.TextColumn(width="large"),
+            "扇叶料号": st.column_config.TextColumn(),
+            "盘型号": st.column_config.TextColumn(),
+            "详细配置/料号": st.column_config.TextColumn(),
+            "叶片模具号": st.column_config.TextColumn(),
+            "盘模具号": st.column_config.TextColumn(),
+            "Hub模具号": st.column_config.TextColumn(),
+            "起始位置": st.column_config.TextColumn(),
+            "扇叶是否混模": st.column_config.SelectboxColumn("扇叶是否混模", options=["是", "否"]),
+            "温度(°C)": st.column_config.NumberColumn(format="%.1f", step=0.1),
+            "湿度(%)": st.column_config.NumberColumn(format="%d%%", step=1),
+            "角度": st.column_config.NumberColumn(format="%.1f", step=0.1),
+            "数据量": st.column_config.NumberColumn(disabled=True),
+            "最大值": st.column_config.NumberColumn(disabled=True),
+            "最小值": st.column_config.NumberColumn(disabled=True),
+            "平均值": st.column_config.NumberColumn(disabled=True),
+        }
+        for d_col in valid_data_cols:
+            my_column_config[d_col] = st.column_config.NumberColumn(required=False, step=0.01)
+
+        # 编辑状态按“筛选 + 排序 + 页码”区分，翻页后行号不会套到另一页的数据上；
+        # 不含数据版本：后台同步/他人录入不会清掉正在编辑的内容，改为保存时核对
+        editor_key = "history_editor_" + row_key([str(date_range), selected_fans, search_kw, sort_col, sort_desc, page_size, page_no])
+        snapshot = st.session_state.get("history_snapshot")
+        if snapshot is None or snapshot["key"] != editor_key or not st.session_state.get(editor_key, {}).get("edited_rows"):
+            # 还没开始编辑时记下本页每一行 (指纹, 表格行号, 录入时间)，即用户看到的那份数据
+            snapshot = {"key": editor_key, "rows": list(zip(record_fingerprints(df_page, final_cols), df_page["_original_row_index"].astype(int), df_page["录入时间"].astype(str)))}
+            st.session_state["history_snapshot"] = snapshot
+
+        def locate(pos):
+            if pos >= len(snapshot["rows"]): return None
+            return resolve_sheet_row(df_cloud, final_cols, *snapshot["rows"][pos])
+
+        def reset_editor():
+            # 保存/删除之后清掉编辑状态，下次重跑按最新数据重新显示
+            st.session_state.pop(editor_key, None)
+            st.session_state.pop("history_snapshot", None)
+        with profiling.phase("历史表格", rows=len(df_show)):
+            edited_df = st.data_editor(
+                df_show,
+                column_config=my_column_config,
+                hide_index=True,
+                use_container_width=True,
+                key=editor_key
+            )
+
+        has_edits = False
+        if editor_key in st.session_state:
+            edits = st.session_state[editor_key].get("edited_rows", {})
+            if edits: has_edits = True
+
+        col_save, col_del, col_dl = st.columns([1.5, 1.5, 3])
+        with col_save:
+            if has_edits:
+                if st.button("💾 保存修改", type="primary"):
+                    try:
+                        header_list = sheet.row_values(1)
+                        header_map = {name: i+1 for i, name in enumerate(header_list)}
+                        status_msg = st.empty()
+                        status_msg.info("⏳ 正在保存修改...")
+                        
+                        edited_rows = st.session_state[editor_key]["edited_rows"]
+                        pending_cells, stale_rows = [], 0
+                        for row_idx_in_page, changes in edited_rows.items():
+                            real_sheet_row = locate(int(row_idx_in_page))
+                            if real_sheet_row is None:
+                                stale_rows += 1
+                                continue
+                            for col_name, new_value in changes.items():
+                                if col_name in header_map:
+                                    pending_cells.append((real_sheet_row, header_map[col_name], new_value))
+                        save_result = sheet.batch_update_cells(pending_cells)
+                        
+                        save_stats = f"共 {len(pending_cells)} 个单元格，API 调用 {save_result['api_calls'] + 1} 次，耗时 {save_result['seconds']:.2f} 秒"
+                        if stale_rows:
+                            reset_editor()
+                            st.warning(f"⚠️ {stale_rows} 条记录在编辑期间已被修改或删除，这些行的修改未保存，请核对最新数据后重新编辑 ({save_stats})")
+                        elif save_result["failed"]:
+                            st.warning(f"⚠️ 部分修改未保存：{len(save_result['failed'])} 个单元格写入失败，请重试 ({save_stats})")
+                        else:
+                            st.session_state["entry_notice"] = f"✅ 修改已保存！{save_stats}"
+                            reset_editor()
+                            st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ 保存失败: {e}")
+            else:
+                st.button("💾 保存修改", disabled=True)
+
+        with col_del:
+            if st.button("🗑️ 删除选中行"):
+                delete_positions = [i for i, flag in enumerate(edited_df["删除?"].tolist()) if flag == True]
+                sheet_rows = [r for r in map(locate, delete_positions) if r is not None]
+                if not delete_positions:
+                    st.warning("请先勾选需要删除的数据！")
+                elif len(sheet_rows) < len(delete_positions):
+                    reset_editor()
+                    st.warning(f"⚠️ {len(delete_positions) - len(sheet_rows)} 条勾选的记录在编辑期间已被修改或删除，为避免删错行本次未删除，请核对最新数据后重新勾选")
+                else:
+                    try:
+                        status_msg = st.empty()
+                        status_msg.info(f"⏳ 正在删除 {len(sheet_rows)} 条数据...")
+                        delete_result = sheet.delete_row_set(sheet_rows)
+                        st.session_state["entry_notice"] = f"✅ 删除成功！共 {len(sheet_rows)} 行 ({len(delete_result['runs'])} 个连续区间)，API 调用 {delete_result['api_calls']} 次，耗时 {delete_result['seconds']:.2f} 秒"
+                        reset_editor()
+                        st.rerun()
+                    except Exception as e: st.error(f"❌ 删除失败: {e}")
+        
+        with col_dl:
+            e_col1, e_col2 = st.columns(2)
+            with e_col1:
+                export_fmt = st.selectbox("导出格式", available_formats(), label_visibility="collapsed")
+            with e_col2:
+                export_all = st.toggle("导出全部数据", help="不勾选时导出当前筛选和排序后的结果")
+            if export_all:
+                export_src, export_key = df_cloud, "all"
+            else:
+                export_src, export_key = df_view, row_key([str(date_range), selected_fans, search_kw, sort_col, sort_desc])
+            export_ext, export_mime, _ = EXPORT_FORMATS[export_fmt]
+            st.download_button(
+                label=f"📥 导出{'全部' if export_all else '当前'}数据 ({len(export_src)} 条)",
+                data=lambda: build_export(export_src, measurements, data_version, export_key, tuple(final_cols), export_fmt),
+                file_name=f"间隙数据_导出_{datetime.now().strftime('%Y%m%d_%H%M')}.{export_ext}",
+                mime=export_mime,
+                on_click="ignore"
+            )
+    else:
+        st.info("👋 云端暂无数据")
@@ -0,0 +1,402 @@
+import calendar
+import datetime
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gspread
+import pandas as pd
+from gspread.utils import a1_range_to_grid_range, numericise_all, rowcol_to_a1
+
+from mirror import REFRESH_INTERVAL
+from schema import ALL_HEADERS
+from storage import GoogleSheetBackend, MemoryWorksheet, StorageBackend, _as_api_values, _row_runs, _slice_range
+
+# ==========================================
+# 按时间分区：每月 (或每季度) 一张工作表 + 分区清单 + 归档层
+# ==========================================
+# 可选值: none (默认，单表) / month / quarter
+PARTITION_SCHEME = os.environ.get("GAP_PARTITION", "none")
+# 最近 N 个分区为在线层 (镜像、上限检查、看板默认数据)，更早的分区在打开时转入归档层
+HOT_PARTITIONS = int(os.environ.get("GAP_HOT_PARTITIONS", "12"))
+# 看板加载归档分区时的并发数
+PARALLEL_LOADS = 4
+# 与增量同步同样的间隔重读分区清单 (搭在同一次 values:batchGet 里)，其他进程新建的分区和层级变化随之生效
+MANIFEST_REFRESH = REFRESH_INTERVAL
+PARTITION_PREFIX = "Gap_"
+MANIFEST_SHEET = "Gap_manifest"
+MANIFEST_HEADERS = ["分区", "层级", "起始日期", "结束日期"]
+HOT, ARCHIVE = "在线", "归档"
+# 录入时间解析不出年月的记录单独放一个分区，始终在线
+UNDATED = "无日期"
+
+_DATE = re.compile(r"^\s*(\d{4})[-/.年](\d{1,2})")
+_KEY = re.compile(r"^(\d{4})-(?:(\d{2})|Q([1-4]))$")
+
+
+def partition_key(entered_at, scheme=PARTITION_SCHEME):
+    # 由 录入时间 决定记录落在哪个分区："2026-10" (按月) / "2026-Q4" (按季度)
+    hit = _DATE.match("" if entered_at is None else str(entered_at))
+    if not hit or not 1 <= int(hit.group(2)) <= 12: return UNDATED
+    year, month = int(hit.group(1)), int(hit.group(2))
+    return f"{year}-Q{(month - 1) // 3 + 1}" if scheme == "quarter" else f"{year}-{month:02d}"
+
+
+def partition_bounds(key):
+    # 分区覆盖的日期区间 (含首尾)；无日期分区返回 (None, None)
+    hit = _KEY.match(key)
+    if not hit: return None, None
+    year = int(hit.group(1))
+    first, last = (int(hit.group(2)),) * 2 if hit.group(2) else (3 * int(hit.group(3)) - 2, 3 * int(hit.group(3)))
+    return datetime.date(year, first, 1), datetime.date(year, last, calendar.monthrange(year, last)[1])
+
+
+def _order(key):
+    # 无日期分区排最前，其余按起始日期排序 (月/季度分区混用时也按时间先后)
+    start, _ = partition_bounds(key)
+    return (start is not None, start or datetime.date.min, key)
+
+
+def _title(key):
+    return PARTITION_PREFIX + key
+
+
+def _quoted(title, a1):
+    return "'" + title.replace("'", "''") + "'!" + a1
+
+
+def _unquoted(rng):
+    title, _, a1 = rng.rpartition("!")
+    return title[1:-1].replace("''", "'") if title.startswith("'") else title, a1
+
+
+def _pad_row(row, width):
+    row = list(row[:width])
+    return row + [""] * (width - len(row))
+
+
+# --- 工作簿：列出/打开/新建工作表，并支持一次请求读取多张表的多个范围 ---
+class GoogleWorkbook:
+    label = "Google Sheets"
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def names(self):
+        return [ws.title for ws in self.spreadsheet.worksheets()]
+
+    def open(self, name):
+        return GoogleSheetBackend(self.spreadsheet.worksheet(name))
+
+    def create(self, name, header):
+        worksheet = self.spreadsheet.add_worksheet(title=name, rows=100, cols=len(header))
+        worksheet.append_rows([header])
+        return GoogleSheetBackend(worksheet)
+
+    def values_batch_get(self, ranges):
+        # 一次 values:batchGet 读取任意多张工作表的范围，返回与 ranges 一一对应的二维列表
+        if not ranges: return []
+        response = self.spreadsheet.values_batch_get(ranges)
+        return [vr.get("values", []) for vr in response.get("valueRanges", [])]
+
+
+class MemoryWorkbook:
+    label = "内存工作表 (离线)"
+
+    def __init__(self):
+        self.sheets = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        return list(self.sheets)
+
+    def open(self, name):
+        return self.sheets[name]
+
+    def create(self, name, header):
+        with self._lock:
+            return self.sheets.setdefault(name, MemoryWorksheet([header]))
+
+    def values_batch_get(self, ranges):
+        out = []
+        for rng in ranges:
+            title, a1 = _unquoted(rng)
+            out.append(_as_api_values(_slice_range(self.sheets[title].all_values(), a1)))
+        return out
+
+
+def _spreadsheet_of(worksheet):
+    # gspread 6 的 Worksheet 只保存 spreadsheet_id 和底层 HTTPClient，没有 spreadsheet 属性
+    client = worksheet.client
+    if hasattr(client, "open_by_key"): return client.open_by_key(worksheet.spreadsheet_id)
+    return gspread.Spreadsheet(client, {"id": worksheet.spreadsheet_id})
+
+
+def open_workbook(kind, worksheet=None):
+    if kind == "gsheets":
+        return GoogleWorkbook(_spreadsheet_of(worksheet)) if worksheet is not None else None
+    if kind == "memory":
+        return MemoryWorkbook()
+    raise ValueError(f"存储后端 {kind} 不支持按时间分区 (GAP_PARTITION 仅适用于 gsheets / memory)")
+
+
+class Manifest:
+    """分区清单工作表：每个分区一行 (分区, 层级, 起始日期, 结束日期)。
+
+    清单里没有登记、但名字符合分区规则的工作表 (例如手工复制进来的) 打开时自动补登为在线层。
+    """
+
+    def __init__(self, book, wrap=lambda s: s):
+        names = book.names()
+        if MANIFEST_SHEET not in names: book.create(MANIFEST_SHEET, MANIFEST_HEADERS)
+        self.sheet = wrap(book.open(MANIFEST_SHEET))
+        self.entries = {}
+        self.load(self.sheet.get(pad_values=True))
+        found = [n[len(PARTITION_PREFIX):] for n in names if n.startswith(PARTITION_PREFIX) and n != MANIFEST_SHEET]
+        unlisted = [k for k in found if (k == UNDATED or _KEY.match(k)) and k not in self.entries]
+        if unlisted: self.add(unlisted)
+
+    def load(self, values):
+        # 用清单工作表的内容 (含表头行) 重建登记表
+        entries = {}
+        for row_no, row in enumerate(values[1:], start=2):
+            if row and row[0]: entries[row[0]] = {"row": row_no, "tier": row[1] if len(row) > 1 and row[1] else HOT}
+        self.entries = entries
+
+    def keys(self, tier=None):
+        return sorted((k for k, e in self.entries.items() if tier is None or e["tier"] == tier), key=_order)
+
+    def add(self, keys, tier=HOT):
+        keys = [k for k in dict.fromkeys(keys) if k not in self.entries]
+        if not keys: return
+        rows = []
+        for k in keys:
+            start, end = partition_bounds(k)
+            rows.append([k, tier, start.isoformat() if start else "", end.isoformat() if end else ""])
+        next_row = max([e["row"] for e in self.entries.values()], default=1) + 1
+        self.sheet.append_rows(rows)
+        for i, k in enumerate(keys): self.entries[k] = {"row": next_row + i, "tier": tier}
+
+    def set_tier(self, keys, tier):
+        keys = [k for k in keys if k in self.entries and self.entries[k]["tier"] != tier]
+        if not keys: return
+        self.sheet.batch_update_cells([(self.entries[k]["row"], 2, tier) for k in keys])
+        for k in keys: self.entries[k]["tier"] = tier
+
+
+class PartitionedSheet(StorageBackend):
+    """把在线层的各分区拼成一张逻辑工作表：第 1 行为表头，之后按分区先后依次排列各分区的数据行。
+
+    读取时一次 values:batchGet 覆盖所有涉及的分区；写入时先用一次请求确认各分区行数，
+    再把全局行号换算成分区内的行号，只写涉及的分区。归档层不进入逻辑表，看板按日期范围单独并发加载。
+    """
+
+    def __init__(self, book, scheme=PARTITION_SCHEME, hot_partitions=HOT_PARTITIONS, wrap=lambda s: s):
+        if scheme not in ("month", "quarter"): raise ValueError(f"未知的分区方式: {scheme} (可选 none / month / quarter)")
+        self.book = book
+        self.scheme = scheme
+        self.hot_partitions = hot_partitions
+        self._wrap = wrap
+        self._book_api = wrap(book)
+        self._sheets = {}
+        # 保护 hot / _counts / manifest：读取线程和写入线程都会更新它们
+        self._lock = threading.RLock()
+        self.manifest = Manifest(book, wrap)
+        self._apply_manifest()
+        self._counts = {}
+
+    def _apply_manifest(self, values=None):
+        # (重新) 载入清单后把超出在线数量的旧分区降为归档。逻辑表的行号随之变化，
+        # 增量同步比对首列时会发现并全量重载；页面上按旧行号的修改由录入页按记录指纹重新定位
+        with self._lock:
+            if values is not None: self.manifest.load(values)
+            dated = [k for k in self.manifest.keys(HOT) if k != UNDATED]
+            if self.hot_partitions > 0 and len(dated) > self.hot_partitions:
+                self.manifest.set_tier(dated[:-self.hot_partitions], ARCHIVE)
+            self.hot = self.manifest.keys(HOT)
+            self._manifest_read = time.monotonic()
+
+    @property
+    def label(self):
+        unit = "季度" if self.scheme == "quarter" else "月"
+        return f"{self.book.label} · 按{unit}分区 (在线 {len(self.hot)} 个 / 归档 {len(self.archived)} 个)"
+
+    @property
+    def archived(self):
+        return self.manifest.keys(ARCHIVE)
+
+    def _sheet(self, key):
+        with self._lock:
+            if key not in self._sheets: self._sheets[key] = self._wrap(self.book.open(_title(key)))
+            return self._sheets[key]
+
+    # --- 全局行号 <-> (分区, 分区内行号) ---
+    def _refresh_layout(self):
+        # 写入前确认各分区当前行数 (一次请求读取所有在线分区的首列)
+        self._read(["A:A"])
+
+    def _locate(self, row):
+        offset = 1
+        for key in self.hot:
+            count = self._counts.get(key, 0)
+            if row <= offset + count: return key, row - offset + 1
+            offset += count
+        return None, None
+
+    def _plan(self, grid):
+        # 把一个全局范围拆成各分区的局部行区间 [(分区, 局部起始行, 局部结束行)]，结束行为 None 表示读到底
+        r0, r1 = grid.get("startRowIndex", 0) + 1, grid.get("endRowIndex")
+        if r1 is None:
+            # 不限行数：每个分区都从第 1 行读到底，拼好后再按起始行裁剪，顺便得到各分区准确的行数
+            return [(key, 1, None) for key in self.hot]
+        pieces = [(self.hot[0], 1, 1)] if r0 <= 1 and self.hot else []
+        offset = 1
+        for key in self.hot:
+            count = self._counts.get(key, 0)
+            start, end = max(r0, offset + 1), min(r1, offset + count)
+            if start <= end: pieces.append((key, start - offset + 1, end - offset + 1))
+            offset += count
+        return pieces
+
+    def _read(self, ranges):
+        # 所有范围、所有涉及的分区合成一次 values:batchGet；到了间隔就顺带读一次分区清单
+        grids = [a1_range_to_grid_range(r) for r in ranges]
+        with self._lock:
+            hot = list(self.hot)
+            plans = [self._plan(g) for g in grids]
+            check_manifest = time.monotonic() - self._manifest_read >= MANIFEST_REFRESH
+        requests = []
+        for grid, pieces in zip(grids, plans):
+            first = rowcol_to_a1(1, grid.get("startColumnIndex", 0) + 1)[:-1]
+            last = rowcol_to_a1(1, grid.get("endColumnIndex") or len(ALL_HEADERS))[:-1]
+            requests += [_quoted(_title(key), f"{first}{start}:{last}{end or ''}") for key, start, end in pieces]
+        if check_manifest: requests.append(_quoted(MANIFEST_SHEET, "A:D"))
+        response = self._book_api.values_batch_get(requests)
+        with self._lock:
+            if check_manifest: self._apply_manifest(list(response[-1]))
+            relayout = self.hot != hot
+            results = iter(response)
+            out = []
+            for grid, pieces in zip(grids, plans):
+                values = []
+                for key, start, end in pieces:
+                    part = list(next(results))
+                    if end is None:
+                        self._counts[key] = max(len(part) - 1, 0)
+                        values.extend(part if not values else part[1:])
+                    else:
+                        values.extend(part + [[]] * (end - start + 1 - len(part)))
+                if pieces and pieces[0][2] is None: values = values[grid.get("startRowIndex", 0):]
+                out.append(values)
+        # 在线分区变了 (清单更新或另一个线程新建了分区)：按新的分区布局重读一次，很少发生
+        return self._read(ranges) if relayout else out
+
+    # --- 读 ---
+    def all_values(self):
+        return self._read(["A:" + rowcol_to_a1(1, len(ALL_HEADERS))[:-1]])[0]
+
+    def row_values(self, row):
+        if row == 1: return list(ALL_HEADERS) if self.hot else []
+        return super().row_values(row)
+
+    def get(self, range_name=None, pad_values=False, **kwargs):
+        values = self.all_values() if range_name is None else self._read([range_name])[0]
+        return _as_api_values(values, pad_values=pad_values) or [[]]
+
+    def batch_get(self, ranges, **kwargs):
+        return [_as_api_values(v) for v in self._read(list(ranges))]
+
+    # --- 写 ---
+    def append_rows(self, rows, **kwargs):
+        """按 录入时间 写入各自的分区。返回 {"resync": bool}：新行不全在逻辑表末尾时 (例如跨月后重试的旧记录、
+        无日期记录、写进归档分区的记录) 为 True，调用方不能把它们当作追加到表尾来就地修补缓存。"""
+        groups = {}
+        for row in rows:
+            # 表头由分区自己维护，写入方补发的表头行直接跳过
+            if list(row[:len(ALL_HEADERS)]) == ALL_HEADERS: continue
+            groups.setdefault(partition_key(row[0] if row else None, self.scheme), []).append(row)
+        with self._lock:
+            new = [k for k in groups if k not in self.manifest.entries]
+            for key in new:
+                if _title(key) not in self.book.names(): self.book.create(_title(key), ALL_HEADERS)
+            if new:
+                self.manifest.add(new)
+                self.hot = self.manifest.keys(HOT)
+            tail = not groups or (bool(self.hot) and set(groups) == {self.hot[-1]})
+        for key in sorted(groups, key=_order):
+            self._sheet(key).append_rows(groups[key], **kwargs)
+            with self._lock:
+                if key in self._counts: self._counts[key] += len(groups[key])
+        return {"resync": not tail}
+
+    def update_cell(self, row, col, value):
+        result = self.batch_update_cells([(row, col, value)])
+        if result["failed"]: raise IndexError(f"第 {row} 行不在在线分区内")
+
+    def batch_update_cells(self, cells):
+        if not cells: return {"api_calls": 0, "seconds": 0.0, "failed": []}
+        started = time.perf_counter()
+        with self._lock:
+            self._refresh_layout()
+            groups, failed = {}, []
+            for row, col, value in cells:
+                key, local = self._locate(row) if row > 1 else (None, None)
+                if key is None: failed.append((row, col, value))
+                else: groups.setdefault(key, []).append(((row, col, value), (local, col, value)))
+            calls = 1
+            for key, pairs in groups.items():
+                result = self._sheet(key).batch_update_cells([p[1] for p in pairs])
+                calls += result["api_calls"]
+                bad = {(r, c) for r, c, _ in result["failed"]}
+                failed += [g for g, (r, c, _) in pairs if (r, c) in bad]
+        return {"api_calls": calls, "seconds": time.perf_counter() - started, "failed": failed}
+
+    def delete_rows(self, start_index, end_index=None):
+        return self.delete_row_set(range(start_index, (end_index or start_index) + 1))
+
+    def delete_row_set(self, rows):
+        rows = sorted(set(int(r) for r in rows))
+        if not rows: return {"api_calls": 0, "seconds": 0.0, "runs": []}
+        started = time.perf_counter()
+        with self._lock:
+            self._refresh_layout()
+            groups, deleted = {}, []
+            for row in rows:
+                key, local = self._locate(row) if row > 1 else (None, None)
+                if key is None: continue
+                groups.setdefault(key, []).append(local)
+                deleted.append(row)
+            calls = 1
+            for key, local_rows in groups.items():
+                calls += self._sheet(key).delete_row_set(local_rows)["api_calls"]
+                self._counts[key] -= len(local_rows)
+        # 返回全局行号的区间 (从大到小)，镜像按同样的顺序删除
+        return {"api_calls": calls, "seconds": time.perf_counter() - started, "runs": _row_runs(deleted)}
+
+    # --- 归档层 ---
+    def partitions_for(self, start=None, end=None, tier=None):
+        # 与日期区间 [start, end] 有交集的分区；不给区间时返回该层全部分区
+        keys = []
+        for key in self.manifest.keys(tier):
+            first, last = partition_bounds(key)
+            if first is None: continue
+            if (start is None or last >= start) and (end is None or first <= end): keys.append(key)
+        return keys
+
+    def read_partitions(self, keys):
+        """并发读取若干分区，返回与增量同步相同格式的宽表 (数值已转换，按分区先后排列)。"""
+        keys = sorted(keys, key=_order)
+        if not keys: return pd.DataFrame(columns=ALL_HEADERS)
+
+        def load(key):
+            values = self._sheet(key).get(pad_values=True)
+            if not values or values == [[]]: return None
+            header = list(values[0])
+            while header and header[-1] == "": header.pop()
+            return pd.DataFrame([numericise_all(_pad_row(r, len(header))) for r in values[1:]], columns=header)
+
+        with ThreadPoolExecutor(max_workers=min(PARALLEL_LOADS, len(keys))) as pool:
+            frames = [f for f in pool.map(load, keys) if f is not None and not f.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ALL_HEADERS)
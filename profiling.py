@@ -0,0 +1,166 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from logging.handlers import RotatingFileHandler
+
+# ==========================================
+# 性能诊断：每次页面重跑的分阶段耗时 + 表格接口调用次数，写入滚动的 JSON Lines 日志
+# ==========================================
+PROFILE_LOG_PATH = os.environ.get("GAP_PROFILE_LOG", ".gap_profile.jsonl")
+PROFILE_LOG_BYTES = 5 * 1024 * 1024
+PROFILE_LOG_BACKUPS = 3
+# 会被计为一次接口调用的工作表方法 (读 / 写)；配额包装 (quota.py) 也按这两个列表限流
+READ_METHODS = ("row_values", "get", "batch_get", "get_all_records", "get_all_values", "all_values", "values_batch_get")
+WRITE_METHODS = ("append_row", "append_rows", "update_cell", "batch_update", "batch_update_cells", "delete_rows", "delete_row_set")
+
+_local = threading.local()
+_lock = threading.Lock()
+# 进程累计：页面重跑之外 (后台刷新 / 写入线程) 的调用也计在这里
+process_calls = Counter()
+process_seconds = Counter()
+_handler = None
+
+
+def _get_handler():
+    # 直接写文件处理器，不经过 logging 的级别过滤，诊断日志不受应用日志配置影响
+    global _handler
+    if _handler is None:
+        try:
+            _handler = RotatingFileHandler(PROFILE_LOG_PATH, maxBytes=PROFILE_LOG_BYTES, backupCount=PROFILE_LOG_BACKUPS, encoding="utf-8")
+            _handler.setFormatter(logging.Formatter("%(message)s"))
+        except OSError:
+            _handler = logging.NullHandler()
+    return _handler
+
+
+class RunProfile:
+    """一次页面重跑的记录：阶段列表 [(名称, 秒, 行数)] 和按方法统计的接口调用。"""
+
+    def __init__(self, session_id="", page=""):
+        self.session_id = session_id
+        self.page = page
+        self.ts = time.time()
+        self.started = time.perf_counter()
+        self.phases = []
+        self.api_calls = Counter()
+        self.api_seconds = 0.0
+        self.api_errors = 0
+        self.total = None
+        self._section = None
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def phase(self, name, rows=None):
+        # 行数在阶段结束时才知道的，可以在 with 块里给 info["rows"] 赋值
+        info = {"rows": rows}
+        started = time.perf_counter()
+        self._depth += 1
+        try: yield info
+        finally:
+            self._depth -= 1
+            elapsed = time.perf_counter() - started
+            self.phases.append((name, elapsed, info["rows"]))
+            # 外层阶段的耗时从正在计时的分段里扣掉，各阶段互不重叠，加起来不超过总耗时
+            if self._depth == 0 and self._section is not None and self._section[1] <= started:
+                self._section = (self._section[0], self._section[1] + elapsed)
+
+    def mark(self, name):
+        # 分段计时：结束上一段并开始新的一段，适合按页面区块顺序计时 (不用改缩进)
+        now = time.perf_counter()
+        if self._section is not None:
+            self.phases.append((self._section[0], now - self._section[1], None))
+        self._section = (name, now) if name else None
+
+    def api(self, method, seconds, calls=1, ok=True):
+        self.api_calls[method] += calls
+        self.api_seconds += seconds
+        if not ok: self.api_errors += 1
+
+    def finish(self):
+        self.mark(None)
+        self.total = time.perf_counter() - self.started
+        return self
+
+    def to_record(self):
+        return {
+            "ts": round(self.ts, 3), "session": self.session_id, "page": self.page,
+            "total_ms": round((self.total or 0) * 1000, 2),
+            "phases": [{"name": n, "ms": round(s * 1000, 2), "rows": r} for n, s, r in self.phases],
+            "api_calls": dict(self.api_calls), "api_ms": round(self.api_seconds * 1000, 2), "api_errors": self.api_errors,
+        }
+
+
+# --- 当前线程正在执行的重跑 (Streamlit 每个会话的脚本在自己的线程里运行) ---
+def start_run(session_id="", page=""):
+    _local.run = RunProfile(session_id, page)
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def finish_run(stats=None):
+    """结束当前重跑：写一行日志，并累加到会话统计 (stats 为 dict，一般放在 session_state 里)。"""
+    run = current_run()
+    if run is None: return None
+    _local.run = None
+    run.finish()
+    if stats is not None:
+        stats["reruns"] = stats.get("reruns", 0) + 1
+        stats["seconds"] = stats.get("seconds", 0.0) + run.total
+        stats.setdefault("api_calls", Counter()).update(run.api_calls)
+        stats["slowest"] = max(stats.get("slowest", 0.0), run.total)
+    try: _get_handler().handle(logging.makeLogRecord({"msg": json.dumps(run.to_record(), ensure_ascii=False, default=str)}))
+    except Exception: pass
+    return run
+
+
+@contextlib.contextmanager
+def phase(name, rows=None):
+    run = current_run()
+    if run is None:
+        yield {"rows": rows}
+        return
+    with run.phase(name, rows) as info: yield info
+
+
+def mark(name):
+    run = current_run()
+    if run is not None: run.mark(name)
+
+
+def record_api(method, seconds, calls=1, ok=True):
+    with _lock:
+        process_calls[method] += calls
+        process_seconds[method] += seconds
+    run = current_run()
+    if run is not None: run.api(method, seconds, calls, ok)
+
+
+class InstrumentedSheet:
+    """包装存储后端：每次读写接口调用都计时计数，其余属性透传。"""
+
+    def __init__(self, sheet):
+        self._sheet = sheet
+
+    def __getattr__(self, name):
+        attr = getattr(self._sheet, name)
+        if name not in READ_METHODS and name not in WRITE_METHODS or not callable(attr): return attr
+
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                record_api(name, time.perf_counter() - started, ok=False)
+                raise
+            # 批量接口自己报告实际发出的请求数 (失败回退时可能多于 1 次)
+            calls = result.get("api_calls", 1) if isinstance(result, dict) else 1
+            record_api(name, time.perf_counter() - started, calls)
+            return result
+        return call
@@ -0,0 +1,190 @@
+import contextlib
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+from profiling import READ_METHODS, WRITE_METHODS
+
+# ==========================================
+# 接口配额：进程内共享的令牌桶 + 相同读请求合并 + 限流后抖动退避
+# ==========================================
+# Google Sheets 默认配额：每用户每分钟读 60 次、写 60 次
+READ_PER_MINUTE = int(os.environ.get("GAP_READ_PER_MINUTE", "60"))
+WRITE_PER_MINUTE = int(os.environ.get("GAP_WRITE_PER_MINUTE", "60"))
+MAX_RETRIES = 4
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 32.0
+# 读请求遇到这些状态码可以安全重试；写请求只在 429 (请求未执行) 时重试，避免重复写入
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 优先级 (数字越小越先拿到令牌)。读、写配额彼此独立，各用一个令牌桶，优先级只在同一个桶内排队：
+# 读桶里 写入线程发出的读 (表头检查、去重) > 页面上的读取 > 后台刷新；写桶里的请求都是 WRITE，先来先得
+WRITE, FOREGROUND, BACKGROUND = 0, 1, 2
+
+_local = threading.local()
+_buckets = {}
+_buckets_lock = threading.Lock()
+stats = Counter()   # waited (秒)、coalesced、retries、throttled
+_stats_lock = threading.Lock()
+
+
+def _count(key, value=1):
+    with _stats_lock: stats[key] += value
+
+
+@contextlib.contextmanager
+def priority(level):
+    # 在 with 块内发出的读请求使用指定优先级 (例如后台刷新线程用 BACKGROUND)
+    previous = getattr(_local, "level", None)
+    _local.level = level
+    try: yield
+    finally: _local.level = previous
+
+
+def current_priority():
+    level = getattr(_local, "level", None)
+    return FOREGROUND if level is None else level
+
+
+def status_of(error):
+    # gspread.exceptions.APIError 带有 requests 的 response
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+class TokenBucket:
+    """每分钟 per_minute 个令牌的令牌桶；等待者按 (优先级, 先来后到) 排队。"""
+
+    def __init__(self, per_minute, burst=None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or per_minute)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, level=FOREGROUND):
+        """取一个令牌，返回等待的秒数。排在前面的 (优先级更高或更早) 请求先拿。"""
+        ticket = (level, next(self._seq))
+        started = self.clock()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] == ticket and self.tokens >= 1:
+                        self.tokens -= 1
+                        return self.clock() - started
+                    # 轮到自己时只需等令牌补满 1 个；没轮到时等前面的人拿走令牌后唤醒
+                    self._cond.wait((1 - self.tokens) / self.rate if self._waiting[0] == ticket else None)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def pause(self, seconds):
+        # 收到 429 时清空令牌，让所有请求一起等待 seconds 秒
+        with self._cond:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+            self._cond.notify_all()
+
+
+def shared_bucket(kind):
+    # 同一进程里所有包装器 (例如每个分区工作表一个) 共用同一对读/写令牌桶
+    with _buckets_lock:
+        if kind not in _buckets: _buckets[kind] = TokenBucket(READ_PER_MINUTE if kind == "read" else WRITE_PER_MINUTE)
+        return _buckets[kind]
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QuotaSheet:
+    """包装存储后端：读写分别从共享令牌桶取令牌，相同参数的并发读只发一次请求 (不跨越写入合并)，
+    被限流 (429) 或服务端临时错误时抖动退避重试。其余属性透传。"""
+
+    def __init__(self, sheet, read_bucket=None, write_bucket=None, max_retries=MAX_RETRIES, sleep=time.sleep):
+        self._sheet = sheet
+        self._read_bucket = read_bucket or shared_bucket("read")
+        self._write_bucket = write_bucket or shared_bucket("write")
+        self._max_retries = max_retries
+        self._sleep = sleep
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        # 写入开始和结束时各加 1：写入之后到达的读不会拿到写入之前发出的读的结果
+        self._write_epoch = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._sheet, name)
+        if not callable(attr): return attr
+        if name in WRITE_METHODS:
+            return lambda *args, **kwargs: self._write(attr, args, kwargs)
+        if name in READ_METHODS:
+            return lambda *args, **kwargs: self._single_flight((name, repr(args), repr(sorted(kwargs.items()))),
+                                                               lambda: self._call(attr, args, kwargs, write=False))
+        return attr
+
+    def _write(self, fn, args, kwargs):
+        with self._flights_lock: self._write_epoch += 1
+        try: return self._call(fn, args, kwargs, write=True)
+        finally:
+            with self._flights_lock: self._write_epoch += 1
+
+    def _single_flight(self, key, fn):
+        with self._flights_lock:
+            key = (self._write_epoch,) + key
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader: flight = self._flights[key] = _Flight()
+        if not leader:
+            # 同样的请求正在进行中：等它的结果 (结果对象共享，调用方只读不改)
+            _count("coalesced")
+            flight.done.wait()
+            if flight.error is not None: raise flight.error
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock: del self._flights[key]
+            flight.done.set()
+
+    def _call(self, fn, args, kwargs, write):
+        bucket = self._write_bucket if write else self._read_bucket
+        level = WRITE if write else current_priority()
+        for attempt in range(self._max_retries + 1):
+            waited = bucket.acquire(level)
+            if waited: _count("waited", waited)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                status = status_of(e)
+                retry = status == 429 or (not write and status in RETRY_STATUS)
+                if not retry or attempt == self._max_retries: raise
+                delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt) * random.uniform(0.5, 1.5)
+                _count("retries")
+                if status == 429:
+                    # 限流：整个令牌桶暂停，下一次 acquire 会一直等到暂停结束
+                    _count("throttled")
+                    bucket.pause(delay)
+                else:
+                    self._sleep(delay)
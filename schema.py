@@ -0,0 +1,62 @@
+import pandas as pd
+
+# ==========================================
+# 统一的数据类型规范：加载时做一次，两个模块共用
+# ==========================================
+CATEGORY_COLS = ["扇叶型号", "扇叶料号", "盘型号", "详细配置/料号", "起始位置", "扇叶是否混模"]
+# 原始测量值量大 (最多 50 列)，用 float32 存储；统计值和角度保留 float64 以免显示出现精度尾数
+FLOAT32_COLS = ["温度(°C)", "湿度(%)", "数据量"]
+FLOAT64_COLS = ["角度", "最大值", "最小值", "平均值"]
+DATETIME_COLS = {"录入时间": "录入时间_dt"}
+
+# 云端表格列结构
+BASE_HEADERS = [
+    "录入时间", "测量时间", "工单号", "扇叶型号", "扇叶料号", "盘型号", "详细配置/料号", "角度", 
+    "叶片模具号", "盘模具号", "Hub模具号", "起始位置", "扇叶是否混模", "温度(°C)", "湿度(%)", 
+    "数据量", "最大值", "最小值", "平均值"
+]
+MAX_DATA_COLS = 50
+ALL_HEADERS = BASE_HEADERS + [f"数据_{i}" for i in range(1, MAX_DATA_COLS + 1)]
+
+
+def is_data_col(col):
+    return str(col).startswith("数据_")
+
+
+def _clean_text(series):
+    return series.fillna("").astype(str).str.strip().replace(["nan", "None", "<NA>", "NaN"], "")
+
+
+def normalize_frame(df):
+    """返回类型规范化后的新 DataFrame；原始列名和行顺序保持不变。"""
+    if df.empty: return df.copy()
+    typed = {}
+    for col in df.columns:
+        series = df[col]
+        if col in FLOAT64_COLS:
+            typed[col] = pd.to_numeric(series, errors="coerce").astype("float64")
+        elif col in FLOAT32_COLS or is_data_col(col):
+            typed[col] = pd.to_numeric(series, errors="coerce").astype("float32")
+        elif col in CATEGORY_COLS:
+            typed[col] = _clean_text(series).astype("category")
+        else:
+            typed[col] = _clean_text(series)
+    out = pd.DataFrame(typed, index=df.index)
+    for src, dst in DATETIME_COLS.items():
+        if src in out.columns:
+            out[dst] = pd.to_datetime(out[src], errors="coerce", format="mixed")
+    return out
+
+
+def fill_blank_category(series, label):
+    # 把空字符串类别显示为占位名称 (例如 "未知盘")
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if "" not in series.cat.categories: return series
+        if label in series.cat.categories:
+            return series.astype(str).replace("", label).astype("category")
+        return series.cat.rename_categories({"": label})
+    return series.fillna(label).replace("", label)
+
+
+def frame_memory(df):
+    return int(df.memory_usage(deep=True).sum()) if not df.empty else 0
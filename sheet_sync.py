@@ -0,0 +1,186 @@
+import threading
+import time
+
+import pandas as pd
+from gspread.utils import numericise_all, rowcol_to_a1
+
+# ==========================================
+# 增量同步：只拉取新追加的行，检测到编辑/删除时才全量重载
+# ==========================================
+# 外部直接在表格里改单元格无法通过首列比对发现，因此隔一段时间强制全量一次
+FULL_RELOAD_INTERVAL = 300
+# 读取期间被本地写入打断时最多重读几次
+REFRESH_ATTEMPTS = 3
+
+
+def _pad_row(row, width):
+    row = list(row[:width])
+    return row + [""] * (width - len(row))
+
+
+class DeltaSync:
+    """记住上次看到的表头、行数和首列(录入时间)，刷新时只按范围读取新增行。
+
+    本程序自己的写操作通过 apply_* 直接修补缓存，不需要重新下载。
+    """
+
+    def __init__(self, sheet, full_reload_interval=FULL_RELOAD_INTERVAL):
+        self.sheet = sheet
+        self.full_reload_interval = full_reload_interval
+        self.header = []
+        self.row_count = 0
+        self.col_a = []
+        self.df = pd.DataFrame()
+        self.last_full_load = 0.0
+        self.stats = {"full": 0, "delta": 0, "noop": 0, "patch": 0}
+        self.last_action = None
+        self.last_appended = 0
+        self._dirty = True
+        # 缓存每被改动一次 (刷新套用、本地修补、作废) 加 1，刷新据此判断读取期间缓存是否被写入方改过
+        self._generation = 0
+        # 写入方需要在“写表格 + 修补缓存”期间持有此锁，避免与后台刷新交错导致重复追加
+        self.lock = threading.RLock()
+
+    def invalidate(self):
+        # 无法修补时 (例如外部改动) 走这里，下一次刷新直接全量
+        with self.lock:
+            self._dirty = True
+            self._generation += 1
+
+    def _probe(self):
+        # 一次请求同时拿表头和首列，用于判断行数变化和历史行是否被改动
+        header_range, col_a_range = self.sheet.batch_get(["1:1", "A:A"])
+        header = list(header_range[0]) if header_range else []
+        col_a = [r[0] if r else "" for r in col_a_range]
+        return header, col_a
+
+    def _load_full(self, values):
+        if not values or values == [[]]:
+            self.header, self.row_count, self.col_a = [], 0, []
+            self.df = pd.DataFrame()
+        else:
+            header = list(values[0])
+            while header and header[-1] == "": header.pop()
+            rows = [numericise_all(_pad_row(r, len(header))) for r in values[1:]]
+            self.header = header
+            self.row_count = len(rows)
+            self.col_a = [header[0] if header else ""] + [r[0] if r else "" for r in values[1:]]
+            self.df = pd.DataFrame(rows, columns=header)
+        self.last_full_load = time.time()
+        self._dirty = False
+        self.stats["full"] += 1
+        self.last_action = "full"
+
+    def _append_frame(self, rows):
+        new_df = pd.DataFrame(rows, columns=self.header)
+        self.df = new_df if self.df.empty else pd.concat([self.df, new_df], ignore_index=True)
+
+    def _appended_range(self, new_total):
+        return f"A{self.row_count + 2}:{rowcol_to_a1(new_total + 1, len(self.header))}"
+
+    def _load_appended(self, values, new_total):
+        width = len(self.header)
+        rows = [numericise_all(_pad_row(r, width)) for r in values]
+        rows += [[""] * width] * (new_total - self.row_count - len(rows))
+        self._append_frame(rows)
+        self.last_appended = new_total - self.row_count
+        self.row_count = new_total
+        self.stats["delta"] += 1
+        self.last_action = "delta"
+
+    def _fetch(self):
+        # 只读表格，不改缓存 (调用方不持锁)；返回 (动作, 数据, 新行数, 首列)
+        with self.lock:
+            full = self._dirty or time.time() - self.last_full_load > self.full_reload_interval
+            known_header, known_rows, known_col_a = self.header, self.row_count, self.col_a
+        if full: return "full", self.sheet.get(pad_values=True), None, None
+        header, col_a = self._probe()
+        total = max(len(col_a) - 1, 0)
+        if header != known_header or total < known_rows or col_a[:known_rows + 1] != known_col_a:
+            # 表头变化、行数减少或历史行首列不一致 => 发生过编辑/删除
+            return "full", self.sheet.get(pad_values=True), None, None
+        if total > known_rows:
+            with self.lock: appended_range = self._appended_range(total)
+            return "delta", self.sheet.get(appended_range), total, col_a
+        return "noop", None, None, None
+
+    def refresh(self):
+        """增量刷新。网络读取不持锁，只在套用结果时持锁：前台写入不会排在后台刷新的读请求 (可能在等配额) 后面。
+        读取期间若有本地写入修补过缓存 (版本号变化)，读到的结果作废并重新读取。"""
+        for _ in range(REFRESH_ATTEMPTS):
+            with self.lock: generation = self._generation
+            action, values, total, col_a = self._fetch()
+            with self.lock:
+                if generation != self._generation: continue
+                if action == "full":
+                    self._load_full(values)
+                elif action == "delta":
+                    self._load_appended(values, total)
+                    self.col_a = col_a
+                else:
+                    self.stats["noop"] += 1
+                    self.last_action = "noop"
+                self._generation += 1
+                return self.df
+        with self.lock:
+            # 一直有写入插进来：这次不套用，下次刷新再试 (缓存已由写入方修补，仍然一致)
+            self.last_action = "busy"
+            return self.df
+
+    # --- 本地写入后的缓存修补 (行列号与 gspread 一致，第 1 行为表头) ---
+    def _patched(self):
+        self._generation += 1
+        self.stats["patch"] += 1
+        self.last_action = "patch"
+
+    def apply_append(self, rows):
+        with self.lock:
+            if self._dirty:
+                # 已作废的缓存不修补，但正在进行的刷新可能读到的是写入之前的数据，让它重读
+                self._generation += 1
+                return
+            rows = [["" if v is None else str(v) for v in r] for r in rows]
+            if not self.header and rows:
+                header = rows.pop(0)
+                while header and header[-1] == "": header.pop()
+                self.header, self.col_a = header, [header[0] if header else ""]
+                self.df = pd.DataFrame(columns=header)
+            if rows:
+                width = len(self.header)
+                self._append_frame([numericise_all(_pad_row(r, width)) for r in rows])
+                self.col_a += [r[0] if r else "" for r in rows]
+                self.row_count += len(rows)
+            self._patched()
+
+    def apply_cells(self, cells):
+        with self.lock:
+            if self._dirty:
+                # 已作废的缓存不修补，但正在进行的刷新可能读到的是写入之前的数据，让它重读
+                self._generation += 1
+                return
+            for row, col, value in cells:
+                pos = row - 2
+                if not (0 <= pos < self.row_count) or not (1 <= col <= len(self.header)):
+                    self._dirty = True
+                    self._generation += 1
+                    return
+                new_value = numericise_all(["" if value is None else str(value)])[0]
+                col_name = self.header[col - 1]
+                if self.df[col_name].dtype != object: self.df[col_name] = self.df[col_name].astype(object)
+                self.df.iat[pos, col - 1] = new_value
+                if col == 1: self.col_a[row - 1] = "" if value is None else str(value)
+            self._patched()
+
+    def apply_delete(self, start, end=None):
+        with self.lock:
+            if self._dirty:
+                # 已作废的缓存不修补，但正在进行的刷新可能读到的是写入之前的数据，让它重读
+                self._generation += 1
+                return
+            end = start if end is None else end
+            positions = [p for p in range(start - 2, end - 1) if 0 <= p < self.row_count]
+            if not positions: return
+            self.df = self.df.drop(self.df.index[positions]).reset_index(drop=True)
+            del self.col_a[positions[0] + 1:positions[-1] + 2]
+            self.row_count -= len(positions)
+            self._patched()
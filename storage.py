@@ -0,0 +1,277 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from gspread.utils import a1_range_to_grid_range, numericise_all, rowcol_to_a1
+
+# ==========================================
+# 存储后端：统一成 gspread 工作表的调用方式
+# ==========================================
+# 可选值: gsheets (默认) / sqlite / memory
+STORAGE_BACKEND = os.environ.get("GAP_STORAGE_BACKEND", "gsheets")
+SQLITE_PATH = os.environ.get("GAP_SQLITE_PATH", "gap_data.sqlite")
+
+
+def _cell(v):
+    if hasattr(v, "item"): v = v.item()
+    return "" if v is None else v
+
+
+def _slice_range(values, rng):
+    # 按 A1 范围裁剪二维列表 (支持 "1:1"、"A:A"、"A2:BR10" 等写法)
+    grid = a1_range_to_grid_range(rng)
+    r0, r1 = grid.get("startRowIndex", 0), grid.get("endRowIndex")
+    c0, c1 = grid.get("startColumnIndex", 0), grid.get("endColumnIndex")
+    return [row[c0:c1] for row in values[r0:r1]]
+
+
+def _as_api_values(rows, pad_values=False):
+    # 模拟 Sheets API 返回：全部为字符串，去掉行尾空单元格
+    out = []
+    for row in rows:
+        row = ["" if v is None else str(v) for v in row]
+        while row and row[-1] == "": row.pop()
+        out.append(row)
+    while out and not out[-1]: out.pop()
+    if pad_values and out:
+        width = max(len(r) for r in out)
+        out = [r + [""] * (width - len(r)) for r in out]
+    return out
+
+
+def _cell_ranges(cells):
+    # 同一行内列号连续的单元格合并成一个 A1 范围，减少批量请求的体积
+    ranges = []
+    for row, col, value in sorted(cells, key=lambda c: (c[0], c[1])):
+        if ranges and ranges[-1]["row"] == row and ranges[-1]["end"] == col - 1:
+            ranges[-1]["end"] = col
+            ranges[-1]["values"].append(_cell(value))
+        else:
+            ranges.append({"row": row, "start": col, "end": col, "values": [_cell(value)]})
+    return [{"range": f"{rowcol_to_a1(r['row'], r['start'])}:{rowcol_to_a1(r['row'], r['end'])}", "values": [r["values"]]} for r in ranges]
+
+
+def update_cells_one_by_one(sheet, cells):
+    # 逐格写入，返回与 batch_update_cells 相同格式的结果；sheet 可以是带配额/计数包装的工作表，每格各占一次配额
+    started = time.perf_counter()
+    failed = []
+    for row, col, value in cells:
+        try: sheet.update_cell(row, col, value)
+        except Exception: failed.append((row, col, value))
+    return {"api_calls": len(cells), "seconds": time.perf_counter() - started, "failed": failed}
+
+
+def _row_runs(rows):
+    # 把行号合并成连续区间 [(起始行, 结束行), ...]，按行号从大到小排列，删除时前面的行号不会错位
+    runs = []
+    for row in sorted(set(int(r) for r in rows)):
+        if runs and runs[-1][1] == row - 1: runs[-1][1] = row
+        else: runs.append([row, row])
+    return [tuple(r) for r in reversed(runs)]
+
+
+class StorageBackend(ABC):
+    """程序用到的工作表接口。行列号与 gspread 一致，从 1 开始，第 1 行为表头。
+
+    子类必须实现 all_values / append_rows / update_cell / delete_rows (缺少时创建实例就会报错)，其余方法有通用实现。
+    """
+
+    label = "未知存储"
+
+    @abstractmethod
+    def all_values(self):
+        pass
+
+    def row_values(self, row):
+        rows = _as_api_values(self.all_values()[row - 1:row])
+        return rows[0] if rows else []
+
+    def get(self, range_name=None, pad_values=False, **kwargs):
+        values = self.all_values()
+        if range_name is not None: values = _slice_range(values, range_name)
+        return _as_api_values(values, pad_values=pad_values) or [[]]
+
+    def batch_get(self, ranges, **kwargs):
+        values = self.all_values()
+        return [_as_api_values(_slice_range(values, r)) for r in ranges]
+
+    def get_all_records(self):
+        values = self.get(pad_values=True)
+        if values == [[]]: return []
+        header = values[0]
+        return [dict(zip(header, numericise_all(r))) for r in values[1:]]
+
+    def append_row(self, values, **kwargs):
+        self.append_rows([values])
+
+    @abstractmethod
+    def append_rows(self, rows, **kwargs):
+        pass
+
+    @abstractmethod
+    def update_cell(self, row, col, value):
+        pass
+
+    def batch_update_cells(self, cells):
+        # cells: [(行号, 列号, 新值), ...]；返回 API 调用次数、耗时和失败的单元格
+        return update_cells_one_by_one(self, cells)
+
+    @abstractmethod
+    def delete_rows(self, start_index, end_index=None):
+        pass
+
+    def delete_row_set(self, rows):
+        # 删除任意一组行号；本地实现逐段删除
+        started = time.perf_counter()
+        runs = _row_runs(rows)
+        for start, end in runs: self.delete_rows(start, end)
+        return {"api_calls": len(runs), "seconds": time.perf_counter() - started, "runs": runs}
+
+
+class GoogleSheetBackend(StorageBackend):
+    """线上实现：直接转发给 gspread 工作表。"""
+
+    label = "Google Sheets"
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+
+    def __getattr__(self, name):
+        return getattr(self.worksheet, name)
+
+    def all_values(self):
+        return self.worksheet.get_all_values()
+
+    def row_values(self, row):
+        return self.worksheet.row_values(row)
+
+    def get(self, range_name=None, pad_values=False, **kwargs):
+        return self.worksheet.get(range_name, pad_values=pad_values, **kwargs)
+
+    def batch_get(self, ranges, **kwargs):
+        return self.worksheet.batch_get(ranges, **kwargs)
+
+    def get_all_records(self):
+        return self.worksheet.get_all_records()
+
+    def append_row(self, values, **kwargs):
+        return self.worksheet.append_row(values, **kwargs)
+
+    def append_rows(self, rows, **kwargs):
+        return self.worksheet.append_rows(rows, **kwargs)
+
+    def update_cell(self, row, col, value):
+        return self.worksheet.update_cell(row, col, value)
+
+    def batch_update_cells(self, cells):
+        if not cells: return {"api_calls": 0, "seconds": 0.0, "failed": []}
+        started = time.perf_counter()
+        # 一次 values:batchUpdate 请求写完全部修改，与 update_cell 一样按用户输入解析；
+        # 失败 (包括 429 限流) 直接抛出，由外层的配额包装退避重试，逐格回退由 MirroredSheet 经包装后的工作表完成
+        self.worksheet.batch_update(_cell_ranges(cells), value_input_option="USER_ENTERED")
+        return {"api_calls": 1, "seconds": time.perf_counter() - started, "failed": []}
+
+    def delete_rows(self, start_index, end_index=None):
+        return self.worksheet.delete_rows(start_index, end_index)
+
+    def delete_row_set(self, rows):
+        runs = _row_runs(rows)
+        if not runs: return {"api_calls": 0, "seconds": 0.0, "runs": []}
+        started = time.perf_counter()
+        # 所有区间放进同一个 spreadsheets:batchUpdate，服务端要么全部删除要么全部不删
+        requests = [
+            {"deleteDimension": {"range": {"sheetId": self.worksheet.id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end}}}
+            for start, end in runs
+        ]
+        self.worksheet.client.batch_update(self.worksheet.spreadsheet_id, {"requests": requests})
+        return {"api_calls": 1, "seconds": time.perf_counter() - started, "runs": runs}
+
+
+class MemoryWorksheet(StorageBackend):
+    """进程内假工作表，用于离线压测和性能分析。"""
+
+    label = "内存工作表 (离线)"
+
+    def __init__(self, values=None):
+        self.values = [list(r) for r in (values or [])]
+        self._lock = threading.Lock()
+
+    def all_values(self):
+        # 返回副本：调用方在锁外遍历时不会碰到正在被其他线程修改的列表
+        with self._lock: return [list(r) for r in self.values]
+
+    def append_rows(self, rows, **kwargs):
+        with self._lock:
+            self.values.extend([_cell(v) for v in r] for r in rows)
+
+    def update_cell(self, row, col, value):
+        with self._lock:
+            while len(self.values) < row: self.values.append([])
+            target = self.values[row - 1]
+            target.extend([""] * (col - len(target)))
+            target[col - 1] = _cell(value)
+
+    def delete_rows(self, start_index, end_index=None):
+        with self._lock:
+            del self.values[start_index - 1:(end_index or start_index)]
+
+
+class SQLiteWorksheet(StorageBackend):
+    """本地 SQLite 实现：每行以 JSON 数组存储，行号按插入顺序计算。"""
+
+    label = "本地 SQLite"
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS sheet_rows (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _row_ids(self, conn, start_index, end_index):
+        return [r[0] for r in conn.execute(
+            "SELECT id FROM sheet_rows ORDER BY id LIMIT ? OFFSET ?", (end_index - start_index + 1, start_index - 1))]
+
+    def all_values(self):
+        with self._connect() as conn:
+            return [json.loads(r[0]) for r in conn.execute("SELECT data FROM sheet_rows ORDER BY id")]
+
+    def row_values(self, row):
+        with self._connect() as conn:
+            hit = conn.execute("SELECT data FROM sheet_rows ORDER BY id LIMIT 1 OFFSET ?", (row - 1,)).fetchone()
+        rows = _as_api_values([json.loads(hit[0])]) if hit else []
+        return rows[0] if rows else []
+
+    def append_rows(self, rows, **kwargs):
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT INTO sheet_rows (data) VALUES (?)",
+                             [(json.dumps([_cell(v) for v in r], ensure_ascii=False),) for r in rows])
+
+    def update_cell(self, row, col, value):
+        with self._lock, self._connect() as conn:
+            ids = self._row_ids(conn, row, row)
+            if not ids: return
+            data = json.loads(conn.execute("SELECT data FROM sheet_rows WHERE id = ?", (ids[0],)).fetchone()[0])
+            data.extend([""] * (col - len(data)))
+            data[col - 1] = _cell(value)
+            conn.execute("UPDATE sheet_rows SET data = ? WHERE id = ?", (json.dumps(data, ensure_ascii=False), ids[0]))
+
+    def delete_rows(self, start_index, end_index=None):
+        with self._lock, self._connect() as conn:
+            ids = self._row_ids(conn, start_index, end_index or start_index)
+            conn.executemany("DELETE FROM sheet_rows WHERE id = ?", [(i,) for i in ids])
+
+
+def open_backend(kind=STORAGE_BACKEND, worksheet=None):
+    if kind == "gsheets":
+        return GoogleSheetBackend(worksheet) if worksheet is not None else None
+    if kind == "sqlite":
+        return SQLiteWorksheet()
+    if kind == "memory":
+        return MemoryWorksheet()
+    raise ValueError(f"未知的存储后端: {kind}")
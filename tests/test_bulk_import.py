@@ -0,0 +1,30 @@
+import pandas as pd
+
+from bulk_import import validate
+from catalog import Catalog
+
+CAT = Catalog({
+    "format": 1, "angles": [30, 45],
+    "disc_libraries": {"L1": {"D2": {"gaps": 2, "configs": ["C1"]}}},
+    "series": [{"name": "S", "groups": [{"discs": "L1", "fans": {"F1": "1001"}}]}],
+})
+
+
+def _frame(humidity, **extra):
+    n = len(humidity)
+    base = {"扇叶型号": ["F1"] * n, "盘型号": ["D2"] * n, "详细配置/料号": ["C1"] * n, "角度": ["30"] * n,
+            "湿度(%)": humidity, "数据_1": [str(1 + i) for i in range(n)], "数据_2": ["0.5"] * n}
+    return pd.DataFrame({**base, **extra})
+
+
+def test_fractional_humidity_is_rejected_not_truncated():
+    batch = validate(_frame(["55", "55.7", "60.0", ""]), CAT, lambda key: 0, limit=10)
+    assert batch.problems.values.tolist() == [[3, "湿度(%) 必须是整数"]]
+    assert [row[14] for row in batch.rows] == [55, 60, None]
+
+
+def test_valid_row_is_built_with_statistics():
+    batch = validate(_frame(["55"], **{"温度(°C)": ["23.5"]}), CAT, lambda key: 0)
+    row = batch.rows[0]
+    assert batch.problems.empty and row[3:8] == ["F1", "1001", "D2", "C1", 30.0]
+    assert row[13:19] == [23.5, 55, 2, 1.0, 0.5, 0.75]
@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+import catalog
+import catalog_baseline as base
+from catalog import CATALOG_PATH, Catalog, calculate_gap_count
+
+
+def _baseline_discs(series, fan):
+    # 迁移前录入页按系列 / 型号选盘库的 if/elif 逻辑
+    if series == "W系列": return base.DISC_CONFIG_W_YELLOW if fan in base.W_SERIES_YELLOW_KEYS else base.DISC_CONFIG_W_OTHER
+    if series == "P系列":
+        if fan in base.P_SERIES_Z_USE: return base.DISC_CONFIG_Z
+        if fan in base.P_SERIES_W_USE: return base.DISC_CONFIG_W_OTHER
+        return base.DISC_CONFIG_P
+    return {"Z系列": base.DISC_CONFIG_Z, "G系列": base.DISC_CONFIG_G, "EMAX系列": base.DISC_CONFIG_Z}[series]
+
+
+BASELINE_SERIES = {
+    "Z系列": base.Z_SERIES_FANS, "W系列": base.W_SERIES_FANS, "G系列": base.G_SERIES_FANS, "EMAX系列": base.EMAX_SERIES_FANS,
+    "P系列": {**base.P_SERIES_Z_USE, **base.P_SERIES_W_USE, **base.P_SERIES_ORIGINAL},
+}
+
+
+@pytest.fixture(scope="module")
+def cat():
+    return Catalog.load(CATALOG_PATH)
+
+
+def test_series_fans_and_part_numbers_match_baseline(cat):
+    assert cat.series == list(BASELINE_SERIES)
+    for series, fans in BASELINE_SERIES.items():
+        assert cat.series_fans[series] == sorted(fans)
+        for fan, part in fans.items():
+            assert cat.fan_part[fan] == part and cat.fan_series[fan] == series
+    assert cat.models_for_part("16180100081") == ["6ZL/PPG Fan blade", "6ZR/PPG Fan blade"]
+
+
+def test_disc_libraries_match_baseline(cat):
+    for series, fans in BASELINE_SERIES.items():
+        for fan in fans:
+            assert cat.discs_for_fan(fan) == _baseline_discs(series, fan), fan
+    assert cat.angles == base.ANGLES_LIST
+
+
+def test_gap_counts_and_hub_flags_match_baseline_rules(cat):
+    for discs in cat.disc_libraries.values():
+        for disc, configs in discs.items():
+            assert cat.gap_count(disc) == calculate_gap_count(disc), disc
+            for config in configs: assert cat.has_hub(config) == ("hub" in config.lower()), config
+    assert cat.gap_count("Z20盘") == 40 and cat.has_hub("X + Hub plate") and not cat.has_hub("Retaining plate X2")
+
+
+def test_broken_file_keeps_previous_catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "_current", None)
+    monkeypatch.setattr(catalog, "_last_error", None)
+    path = tmp_path / "catalog.json"
+    with open(CATALOG_PATH, encoding="utf-8") as f: data = json.load(f)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    first = catalog.current(str(path))
+    assert catalog.last_error() is None
+
+    path.write_text('{"format": 1, "series": [', encoding="utf-8")
+    os.utime(path, (first.mtime + 10, first.mtime + 10))
+    assert catalog.current(str(path)) is first and "JSON" in catalog.last_error()
+
+    data["revision"] = "next"
+    data["angles"] = [-1]
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, (first.mtime + 20, first.mtime + 20))
+    assert catalog.current(str(path)) is first and "angles" in catalog.last_error()
+
+    data["angles"] = [30]
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, (first.mtime + 30, first.mtime + 30))
+    fresh = catalog.current(str(path))
+    assert fresh is not first and fresh.revision == "next" and catalog.last_error() is None
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from cube import GapCube
+
+
+def make_frame():
+    return pd.DataFrame({
+        "盘型号": ["Z5盘", "Z5盘", "Z5盘", "Z6盘", "Z6盘", "Z6盘"],
+        "扇叶型号": ["A", "A", "B", "A", "B", "B"],
+        "角度": [20.0, 20.0, 30.0, 20.0, 30.0, 30.0],
+        "温度(°C)": [20.0, 21.0, 25.0, 25.0, 30.0, 31.0],
+        "数据量": [10, 10, 10, 12, 12, 12],
+        "平均值": [0.1, 0.3, 0.2, 0.5, 0.4, 0.9],
+    })
+
+
+def test_marginal_matches_groupby():
+    df = make_frame()
+    out = GapCube(df).marginal(["盘型号"]).set_index("盘型号")
+    ref = df.groupby("盘型号")["平均值"]
+    np.testing.assert_allclose(out.loc[ref.mean().index, "平均值"], ref.mean())
+    np.testing.assert_allclose(out.loc[ref.std(ddof=0).index, "标准差"], ref.std(ddof=0))
+    assert out["记录数"].to_dict() == {"Z5盘": 3, "Z6盘": 3}
+
+
+def test_quantiles_match_numpy():
+    df = make_frame()
+    out = GapCube(df).summary(["扇叶型号"]).set_index("扇叶型号")
+    for fan, values in df.groupby("扇叶型号")["平均值"]:
+        np.testing.assert_allclose(out.loc[fan, ["q25", "q50", "q75"]].to_numpy(dtype=float), np.quantile(values, [0.25, 0.5, 0.75]))
+
+
+def test_box_with_blank_dimension():
+    # 角度为空但平均值不为空的记录不属于任何组，不能让箱线图统计报错
+    df = make_frame()
+    df.loc[len(df)] = ["Z5盘", "A", np.nan, 22.0, 10, 0.25]
+    stats, outliers = GapCube(df).box("角度")
+    assert sorted(stats["角度"]) == [20.0, 30.0]
+    assert stats["记录数"].sum() == 6
+    assert set(outliers["label"]) <= set(df.index[:6])
+
+
+def test_all_blank_dimension():
+    df = make_frame().assign(角度=np.nan)
+    stats, outliers = GapCube(df).box("角度")
+    assert stats.empty and outliers.empty
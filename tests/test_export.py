@@ -0,0 +1,57 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from export import EXPORT_FORMATS, export_bytes
+from measurements import RaggedMeasurements, data_col_name
+from schema import normalize_frame
+
+COLS = ["工单号", "盘型号", "角度", "平均值"]
+FORMAT = {EXPORT_FORMATS[name][0]: name for name in EXPORT_FORMATS}
+
+
+def _records():
+    raw = pd.DataFrame({
+        "工单号": ["WO1", "WO2", "WO3"], "盘型号": ["D2", "D4", "D3"], "角度": ["30", "45", "60"], "平均值": ["0.2", "0.4", "0.3"],
+        data_col_name(1): ["0.1", "0.3", "0.2"], data_col_name(2): ["0.3", "0.4", "0.3"],
+        data_col_name(3): ["", "0.5", "0.4"], data_col_name(4): ["", "0.4", ""],
+    })
+    typed = normalize_frame(raw)
+    return typed.drop(columns=[data_col_name(p) for p in range(1, 5)]), RaggedMeasurements.from_wide(typed)
+
+
+def _read(ext, data):
+    if ext == "csv":
+        assert data.startswith(b"\xef\xbb\xbf")
+        return pd.read_csv(io.BytesIO(data), encoding="utf-8-sig")
+    if ext == "xlsx": return pd.read_excel(io.BytesIO(data))
+    return pd.read_parquet(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("ext", ["csv", "xlsx", "parquet"])
+def test_full_export_expands_ragged_measurements(ext):
+    df, measurements = _records()
+    out = _read(ext, export_bytes(df, measurements, COLS, FORMAT[ext], chunk_rows=2))
+    assert list(out.columns) == COLS + [data_col_name(p) for p in range(1, 5)]
+    assert out["工单号"].tolist() == ["WO1", "WO2", "WO3"] and out["角度"].tolist() == [30.0, 45.0, 60.0]
+    np.testing.assert_allclose(out[data_col_name(3)].to_numpy(dtype=float), [np.nan, 0.5, 0.4])
+    np.testing.assert_allclose(out[data_col_name(4)].to_numpy(dtype=float), [np.nan, 0.4, np.nan])
+
+
+@pytest.mark.parametrize("ext", ["csv", "xlsx", "parquet"])
+def test_filtered_export_keeps_view_order_and_width(ext):
+    df, measurements = _records()
+    view = df.iloc[[2, 0]]
+    out = _read(ext, export_bytes(view, measurements, COLS, FORMAT[ext]))
+    assert out["工单号"].tolist() == ["WO3", "WO1"]
+    assert list(out.columns)[len(COLS):] == [data_col_name(p) for p in range(1, 4)]
+    np.testing.assert_allclose(out[data_col_name(3)].to_numpy(dtype=float), [0.4, np.nan])
+
+
+@pytest.mark.parametrize("ext", ["csv", "xlsx", "parquet"])
+def test_empty_export_keeps_header(ext):
+    df, measurements = _records()
+    out = _read(ext, export_bytes(df.iloc[:0], measurements, COLS, FORMAT[ext]))
+    assert out.empty and list(out.columns) == COLS
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from gap_model import LOW_GAP_THRESHOLD, GapModel, risk_combinations
+
+
+def _frame(n, seed):
+    rng = np.random.default_rng(seed)
+    disc = rng.choice(["D1", "D2", "D3"], n)
+    fan = rng.choice(["F1", "F2"], n)
+    angle = rng.choice([30.0, 45.0, 60.0], n)
+    effect = pd.Series(disc).map({"D1": 0.0, "D2": 0.1, "D3": -0.05}) + pd.Series(fan).map({"F1": 0.0, "F2": 0.03})
+    y = 0.2 + effect.to_numpy() + 0.002 * angle + rng.normal(0, 0.01, n)
+    return pd.DataFrame({"盘型号": disc, "扇叶型号": fan, "角度": angle, "平均值": y})
+
+
+def _reference(df):
+    # 直接用最小二乘拟合独热设计矩阵，预测值唯一 (系数不唯一)
+    X = pd.get_dummies(df[["盘型号", "扇叶型号"]]).astype(float)
+    X.insert(0, "角度", df["角度"]); X.insert(0, "常数", 1.0)
+    beta, *_ = np.linalg.lstsq(X.to_numpy(), df["平均值"].to_numpy(), rcond=None)
+    fitted = X.to_numpy() @ beta
+    y = df["平均值"].to_numpy()
+    return fitted, 1 - ((y - fitted) ** 2).sum() / ((y - y.mean()) ** 2).sum()
+
+
+def _fitted(model, df):
+    return np.array([model.predict(d, f, a) for d, f, a in zip(df["盘型号"], df["扇叶型号"], df["角度"])])
+
+
+def test_incremental_fit_matches_least_squares():
+    df = _frame(200, 0)
+    model = GapModel()
+    for start in range(0, len(df), 40): model.added(df.iloc[start:start + 40])
+    fitted, r2 = _reference(df)
+    np.testing.assert_allclose(_fitted(model, df), fitted, atol=1e-8)
+    assert abs(model.solve()["r2"] - r2) < 1e-8 and model.n_rows == 200
+
+
+def test_removed_rows_leave_the_fit_of_the_rest():
+    df = _frame(120, 1)
+    model = GapModel.from_frame(df)
+    model.removed(df.iloc[:40])
+    rest = df.iloc[40:]
+    np.testing.assert_allclose(_fitted(model, rest), _reference(rest)[0], atol=1e-8)
+    grid = model.predict_grid(["D1", "D2"], ["F2"], [30.0, 60.0])
+    assert grid["预测间隙"].tolist() == [model.predict(d, "F2", a) for d in ["D1", "D2"] for a in [30.0, 60.0]]
+
+
+def test_too_few_rows_gives_no_model():
+    assert GapModel.from_frame(_frame(5, 2)).solve() is None
+
+
+def test_prediction_grid_uses_solved_coefficients():
+    model = GapModel.from_frame(_frame(150, 3))
+    sol = model.solve()
+    grid = model.predict_grid(["D1", "D3", "新盘"], ["F1", "F2"], [30.0, 60.0])
+    assert len(grid) == 12 and grid[["盘型号", "扇叶型号", "角度"]].iloc[5].tolist() == ["D3", "F1", 60.0]
+    coef = sol["coef"]
+    expected = [sol["intercept"] + coef.get(("盘型号", d), 0.0) + coef.get(("扇叶型号", f), 0.0) + sol["angle"] * a
+                for d in ["D1", "D3", "新盘"] for f in ["F1", "F2"] for a in [30.0, 60.0]]
+    np.testing.assert_allclose(grid["预测间隙"], expected, rtol=1e-12)
+
+
+def test_risk_combinations_filter_by_threshold():
+    grid = pd.DataFrame({"盘型号": list("ABCD"), "扇叶型号": "F", "角度": 30.0, "预测间隙": [0.2, LOW_GAP_THRESHOLD, -0.01, 0.03]})
+    risk = risk_combinations(grid)
+    assert risk["盘型号"].tolist() == ["C", "D", "B"]
+    assert risk["状态"].tolist() == ["⚠️ 干涉", "🔴 间隙过小", "🔴 间隙过小"]
+
+
+def test_fingerprint_differs_between_models_with_equal_moments():
+    df = _frame(60, 4)
+    swapped = df.assign(扇叶型号=df["扇叶型号"].map({"F1": "F2", "F2": "F1"}))
+    a, b = GapModel.from_frame(df), GapModel.from_frame(swapped)
+    assert a.n_rows == b.n_rows and a.fingerprint != b.fingerprint
+    before = a.fingerprint
+    a.reset(df.iloc[:0])
+    assert a.fingerprint != before and a.solve() is None
@@ -0,0 +1,66 @@
+import sys
+import threading
+
+import pandas as pd
+
+from indexes import ComboIndex, KeywordIndex
+
+
+def frame(n, angle=20.0):
+    return pd.DataFrame({
+        "扇叶型号": ["1ZL/PAG"] * n, "盘型号": ["Z5盘"] * n,
+        "详细配置/料号": ["Retaining plate/5"] * n, "角度": [angle] * n,
+        "工单号": [f"WO{i}" for i in range(n)],
+    })
+
+
+def test_combo_counts_follow_observer_events():
+    index = ComboIndex()
+    index.reset(frame(2))
+    assert index.count("1ZL/PAG", "Z5盘", "Retaining plate/5", "20") == 2
+    index.added(frame(1))
+    assert list(index.at_limit()["已录入次数"]) == [3]
+    index.removed(frame(3))
+    assert index.count("1ZL/PAG", "Z5盘", "Retaining plate/5", 20) == 0 and index.at_limit().empty
+
+
+def test_at_limit_while_observer_mutates():
+    index = ComboIndex()
+    # 计数表足够大，遍历一次要跨过多次线程切换
+    index.reset(pd.concat([frame(3, a / 10) for a in range(3000)], ignore_index=True))
+    stop = threading.Event()
+    errors = []
+
+    def mutate():
+        angle = 1000.0
+        while not stop.is_set():
+            angle += 1
+            index.added(frame(3, angle))
+            index.removed(frame(3, angle))
+
+    thread = threading.Thread(target=mutate)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread.start()
+    try:
+        for _ in range(300):
+            try: index.at_limit()
+            except RuntimeError as e: errors.append(e)
+    finally:
+        stop.set(); thread.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_keyword_search_matches_substrings_in_any_column():
+    df = frame(3)
+    df.loc[1, "工单号"] = "WO333525"
+    df["测量时间"] = ["2026-10-01", "2026-10-02", "2026-10-03"]
+    df["录入时间_dt"] = pd.to_datetime(["2026-09-30"] * 3)
+    index = KeywordIndex(df)
+    assert list(index.search("333525")) == [1]
+    assert list(index.search("3525")) == [1]
+    assert list(index.search("z5 wo333")) == [1]
+    assert list(index.search("10-03")) == [2]
+    assert list(index.search("plate/5 PAG")) == [0, 1, 2]
+    assert list(index.search("09-30")) == [] and list(index.search("  ")) == []
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from measurements import RaggedMeasurements, data_col_name, prepare_records
+
+
+def _wide(rows, width=5):
+    cols = [data_col_name(p) for p in range(1, width + 1)]
+    return pd.DataFrame([r + [np.nan] * (width - len(r)) for r in rows], columns=cols)
+
+
+def test_ragged_round_trip_keeps_gaps_and_padding():
+    df = _wide([[0.1, 0.2, 0.3], [0.4, np.nan, 0.6, 0.7], [], [0.8]])
+    df["盘型号"] = ["D3", "D4", "D2", "D2"]
+    df.index = [10, 11, 12, 13]
+    ragged = RaggedMeasurements.from_wide(df, gap_count=lambda d: int(d[1:]))
+    assert ragged.lengths.tolist() == [3, 4, 2, 2]
+    np.testing.assert_array_equal(ragged.record(11), np.float32([0.4, np.nan, 0.6, 0.7]))
+    back = ragged.to_wide()
+    pd.testing.assert_frame_equal(back, df.drop(columns="盘型号").astype(np.float32))
+    np.testing.assert_array_equal(ragged.to_wide(labels=[13, 10], width=2).to_numpy(), np.float32([[0.8, np.nan], [0.1, 0.2]]))
+    assert ragged.filled_width([12, 13]) == 1
+
+
+def test_position_profile_matches_pandas():
+    rng = np.random.default_rng(1)
+    rows = [list(rng.uniform(0, 1, n)) for n in rng.integers(1, 6, 40)]
+    df = _wide(rows)
+    prof = RaggedMeasurements.from_wide(df).position_profile()
+    ref = df.astype(np.float32).astype(np.float64)
+    np.testing.assert_array_equal(prof["记录数"], ref.count().to_numpy())
+    np.testing.assert_allclose(prof["均值"], ref.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(prof["标准差"], ref.std(ddof=0).to_numpy(), atol=1e-9)
+    np.testing.assert_allclose(prof["最大值"], ref.max().to_numpy())
+
+
+def test_non_contiguous_data_columns_keep_their_positions():
+    raw = pd.DataFrame({"盘型号": ["D5", "D3"], "数据_1": ["0.1", "0.2"], "数据_3": ["0.3", "0.4"], "数据_5": ["0.5", ""]})
+    typed, ragged = prepare_records(raw)
+    assert list(typed.columns) == ["盘型号"] and ragged.source_columns == ["数据_1", "数据_3", "数据_5"]
+    wide = ragged.to_wide()
+    assert list(wide.columns) == [data_col_name(p) for p in range(1, 6)]
+    np.testing.assert_array_equal(wide.to_numpy(), np.float32([[0.1, np.nan, 0.3, np.nan, 0.5], [0.2, np.nan, 0.4, np.nan, np.nan]]))
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pandas as pd
+
+from mirror import LocalMirror
+
+COLS = ["录入时间", "工单号", "平均值"]
+
+
+def _frame(*rows):
+    return pd.DataFrame([list(r) for r in rows], columns=COLS)
+
+
+def _rowids(path):
+    with sqlite3.connect(path) as conn: return [r[0] for r in conn.execute("SELECT rowid FROM records ORDER BY rowid")]
+
+
+class Recorder:
+    def __init__(self): self.events = []
+    def reset(self, df): self.events.append(("reset", len(df)))
+    def added(self, df): self.events.append(("added", df["工单号"].tolist()))
+    def removed(self, df): self.events.append(("removed", df["工单号"].tolist()))
+
+
+def test_replace_persists_and_reopens(tmp_path):
+    path = str(tmp_path / "m.sqlite")
+    mirror = LocalMirror(path)
+    mirror.replace(_frame(["2026-10-01", "WO1", 0.1], ["2026-10-02", "WO2", 0.2]))
+    reopened = LocalMirror(path)
+    pd.testing.assert_frame_equal(reopened.df, mirror.df)
+    assert reopened.synced_at == mirror.synced_at and reopened.version == 1
+
+
+def test_replace_rewrites_only_changed_rows(tmp_path):
+    path = str(tmp_path / "m.sqlite")
+    mirror = LocalMirror(path)
+    mirror.replace(_frame(["a", "WO1", 0.1], ["b", "WO2", 0.2], ["c", "WO3", 0.3]))
+    before = _rowids(path)
+    mirror.replace(_frame(["a", "WO1", 0.1], ["b", "WO2b", 0.2]))
+    assert _rowids(path) == before[:2]
+    mirror.replace(_frame(["a", "WO1", 0.1], ["b", "WO2b", 0.2], ["d", "WO4", 0.4]))
+    assert _rowids(path)[:2] == before[:2]
+    assert LocalMirror(path).df["工单号"].tolist() == ["WO1", "WO2b", "WO4"]
+    # 列结构变化时整表重建
+    mirror.replace(pd.DataFrame([["a", "WO1"]], columns=COLS[:2]))
+    assert LocalMirror(path).df.values.tolist() == [["a", "WO1"]]
+
+
+def test_append_edit_delete_are_patched_and_persisted(tmp_path):
+    path = str(tmp_path / "m.sqlite")
+    mirror = LocalMirror(path)
+    mirror.replace(_frame(["a", "WO1", 0.1], ["b", "WO2", 0.2], ["c", "WO3", 0.3]))
+    recorder = mirror.add_observer(Recorder())
+    mirror.append_row(["d", "WO4", 0.4])
+    snapshot = mirror.df
+    mirror.update_cells([(3, 2, "WO2b"), (5, 3, 0.45), (99, 1, "ignored")])
+    assert snapshot["工单号"].tolist() == ["WO1", "WO2", "WO3", "WO4"]
+    mirror.delete_rows(2)
+    mirror.delete_rows(3, 4)
+    expected = [["b", "WO2b", 0.2]]
+    assert mirror.df.values.tolist() == expected
+    assert LocalMirror(path).df.values.tolist() == expected
+    assert recorder.events == [
+        ("reset", 3), ("added", ["WO4"]), ("removed", ["WO2", "WO4"]), ("added", ["WO2b", "WO4"]),
+        ("removed", ["WO1"]), ("removed", ["WO3", "WO4"]),
+    ]
+
+
+def test_snapshot_keeps_frame_and_version_together(tmp_path):
+    mirror = LocalMirror(str(tmp_path / "m.sqlite"))
+    mirror.replace(_frame(["a", "WO1", 0.1]))
+    df, version = mirror.snapshot()
+    mirror.update_cell(2, 2, "WO1b")
+    mirror.append_row(["b", "WO2", 0.2])
+    # 之后的写入换的是新表和新版本号，已取得的快照保持不变
+    assert df["工单号"].tolist() == ["WO1"] and version < mirror.version
+    new_df, new_version = mirror.snapshot()
+    assert new_df is mirror.df and new_version == mirror.version
+    assert new_df["工单号"].tolist() == ["WO1b", "WO2"]
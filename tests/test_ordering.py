@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from ordering import category_order, natural_key, natural_sort_key, rank_codes, sort_by_orders
+
+
+def test_natural_key_mixed_alphanumerics():
+    assert natural_key("W2") < natural_key("W10")
+    assert natural_key("Z5盘") < natural_key("Z12盘")
+    assert sorted(["W10", "W2", "W1", "V3"], key=natural_key) == ["V3", "W1", "W2", "W10"]
+
+
+def test_category_order_plain_and_categorical():
+    s = pd.Series(["Z12盘", "Z5盘", None, "Z5盘", "Z6盘"])
+    assert category_order(s) == ["Z5盘", "Z6盘", "Z12盘"]
+    cat = pd.Series(pd.Categorical(["W10", "W2"], categories=["W10", "W2", "W30"]))
+    assert category_order(cat) == ["W2", "W10"]
+
+
+def test_rank_codes_duplicates_and_unknown_values():
+    order = ["W2", "W10"]
+    ranks = rank_codes(pd.Series(["W10", "W2", "W10", np.nan, "X1"]), order)
+    # 重复值同名次，NaN 和不在顺序表里的值排最后
+    assert ranks.tolist() == [1, 0, 1, 2, 2]
+
+
+def test_natural_sort_key_with_nan_and_duplicates():
+    df = pd.DataFrame({"扇叶型号": ["W10", None, "W2", "W10", "W1"], "n": range(5)})
+    out = df.sort_values("扇叶型号", key=natural_sort_key, kind="stable")
+    assert out["n"].tolist() == [4, 2, 0, 3, 1]
+
+
+def test_natural_sort_key_leaves_numeric_columns():
+    s = pd.Series([30.0, 5.0, np.nan])
+    assert natural_sort_key(s) is s
+
+
+def test_treemap_angles_sort_numerically():
+    df = pd.DataFrame({
+        "盘型号": ["Z12盘", "Z5盘", "Z5盘", "Z5盘"],
+        "扇叶型号": ["W2", "W10", "W2", "W2"],
+        "角度": [5.0, 20.0, 100.0, 25.5],
+    })
+    out = sort_by_orders(df, {"盘型号": category_order(df["盘型号"]), "扇叶型号": category_order(df["扇叶型号"])}, numeric=["角度"])
+    # 角度按数值而非字符串排 ("100" 不会排到 "25.5" 前面)
+    assert out[["盘型号", "扇叶型号", "角度"]].values.tolist() == [
+        ["Z5盘", "W2", 25.5], ["Z5盘", "W2", 100.0], ["Z5盘", "W10", 20.0], ["Z12盘", "W2", 5.0],
+    ]
+    assert list(out.columns) == list(df.columns)
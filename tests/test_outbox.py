@@ -0,0 +1,40 @@
+from outbox import Outbox, OutboxFlusher, row_key
+from storage import MemoryWorksheet
+
+HEADERS = ["录入时间", "工单号", "平均值"]
+
+
+class FlakySheet(MemoryWorksheet):
+    """第一次追加写入成功但抛出异常，模拟响应丢失。"""
+
+    def __init__(self):
+        super().__init__()
+        self.lose_response = True
+
+    def append_rows(self, rows, **kwargs):
+        super().append_rows(rows, **kwargs)
+        if rows != [HEADERS] and self.lose_response:
+            self.lose_response = False
+            raise ConnectionError("响应丢失")
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    box = Outbox(str(tmp_path / "ob.sqlite"))
+    row = ["2026-10-17 08:00:00", "WO1", 0.1]
+    assert box.enqueue(row) == (row_key(row), True)
+    assert box.enqueue(["2026-10-17 08:00:00", "WO1", 0.1000000001])[1] is False
+    assert box.enqueue_many([row, ["2026-10-17 08:00:00", "WO2", 0.2], ["2026-10-17 08:00:00", "WO2", 0.2]]) == 1
+    assert box.pending_count() == 2
+
+
+def test_retry_after_lost_response_does_not_duplicate(tmp_path):
+    box = Outbox(str(tmp_path / "ob.sqlite"))
+    sheet = FlakySheet()
+    existing = lambda: {row_key(r) for r in sheet.all_values()[1:]}
+    flusher = OutboxFlusher(box, sheet, HEADERS, existing_keys=existing)
+    box.enqueue(["2026-10-17 08:00:00", "WO1", "0.1"])
+    assert flusher.flush_once() == 0 and box.last_error() == "响应丢失"
+    with box._connect() as conn: conn.execute("UPDATE outbox SET next_try = 0")
+    box.enqueue(["2026-10-17 08:00:01", "WO2", "0.2"])
+    assert flusher.flush_once() == 1
+    assert [r[1] for r in sheet.all_values()] == ["工单号", "WO1", "WO2"] and box.pending_count() == 0
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from page_entry import record_fingerprints, resolve_sheet_row
+
+COLS = ["录入时间", "工单号", "角度"]
+
+
+def cloud(rows):
+    df = pd.DataFrame(rows, columns=COLS)
+    df["_original_row_index"] = df.index + 2
+    return df
+
+
+def snapshot_of(df, pos):
+    return record_fingerprints(df.iloc[pos:pos + 1], COLS)[0], int(df["_original_row_index"].iloc[pos]), str(df["录入时间"].iloc[pos])
+
+
+def test_unchanged_row_keeps_its_sheet_row():
+    df = cloud([["2026-10-01 08:00:00", "WO1", 20.0], ["2026-10-01 09:00:00", "WO2", 30.0]])
+    assert resolve_sheet_row(df, COLS, *snapshot_of(df, 1)) == 3
+
+
+def test_row_shifted_by_delete_is_found_again():
+    before = cloud([["2026-10-01 08:00:00", "WO1", 20.0], ["2026-10-01 09:00:00", "WO2", 30.0]])
+    after = cloud([["2026-10-01 09:00:00", "WO2", 30.0]])
+    assert resolve_sheet_row(after, COLS, *snapshot_of(before, 1)) == 2
+
+
+def test_edited_or_deleted_row_is_stale():
+    before = cloud([["2026-10-01 08:00:00", "WO1", 20.0], ["2026-10-01 09:00:00", "WO2", 30.0]])
+    edited = cloud([["2026-10-01 08:00:00", "WO1", 20.0], ["2026-10-01 09:00:00", "WO2b", 30.0]])
+    deleted = cloud([["2026-10-01 08:00:00", "WO1", 20.0]])
+    assert resolve_sheet_row(edited, COLS, *snapshot_of(before, 1)) is None
+    assert resolve_sheet_row(deleted, COLS, *snapshot_of(before, 1)) is None
+
+
+def test_ambiguous_duplicates_are_stale():
+    row = ["2026-10-01 08:00:00", "WO1", 20.0]
+    before = cloud([["2026-10-01 06:00:00", "WO0", 20.0], ["2026-10-01 07:00:00", "WO9", 20.0], row])
+    after = cloud([row, row])
+    assert resolve_sheet_row(after, COLS, *snapshot_of(before, 2)) is None
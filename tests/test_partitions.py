@@ -0,0 +1,124 @@
+import datetime
+
+import gspread
+import pytest
+
+import partitions
+
+from mirror import LocalMirror, MirroredSheet
+from partitions import ARCHIVE, UNDATED, MemoryWorkbook, PartitionedSheet, open_workbook, partition_bounds, partition_key
+from schema import ALL_HEADERS
+from sheet_sync import DeltaSync
+
+
+def row(entered_at, order_no):
+    values = [""] * len(ALL_HEADERS)
+    values[0], values[2], values[7] = entered_at, order_no, 20
+    return values
+
+
+@pytest.fixture
+def sheet():
+    sheet = PartitionedSheet(MemoryWorkbook(), "month", 0)
+    sheet.append_rows([row("2026-08-01 08:00:00", "A"), row("2026-09-01 08:00:00", "B"), row("2026-08-02 08:00:00", "C")])
+    return sheet
+
+
+def order_nos(values):
+    return [r[2] for r in values[1:]]
+
+
+def test_partition_key_and_bounds():
+    assert partition_key("2026-10-17 10:00:00", "month") == "2026-10"
+    assert partition_key("2026/1/3", "quarter") == "2026-Q1"
+    assert partition_key("", "month") == UNDATED
+    assert partition_bounds("2026-Q4") == (datetime.date(2026, 10, 1), datetime.date(2026, 12, 31))
+    assert partition_bounds(UNDATED) == (None, None)
+
+
+def test_logical_sheet_orders_partitions(sheet):
+    assert sheet.hot == ["2026-08", "2026-09"]
+    assert order_nos(sheet.get()) == ["A", "C", "B"]
+    assert sheet.get("C3:C4") == [["C"], ["B"]]
+    assert sheet.batch_get(["1:1", "A:A"])[1][1:] == [["2026-08-01 08:00:00"], ["2026-08-02 08:00:00"], ["2026-09-01 08:00:00"]]
+
+
+def test_edit_and_delete_map_global_rows(sheet):
+    result = sheet.batch_update_cells([(4, 3, "B2"), (99, 3, "x")])
+    assert result["failed"] == [(99, 3, "x")]
+    result = sheet.delete_row_set([2, 4])
+    assert result["runs"] == [(4, 4), (2, 2)]
+    assert order_nos(sheet.get()) == ["C"]
+
+
+def test_append_reports_non_tail_rows(sheet):
+    assert sheet.append_rows([row("2026-09-02 08:00:00", "D")]) == {"resync": False}
+    assert sheet.append_rows([row("2026-08-03 08:00:00", "E")]) == {"resync": True}
+    assert sheet.append_rows([row("", "U")]) == {"resync": True}
+    assert order_nos(sheet.get()) == ["U", "A", "C", "E", "B", "D"]
+
+
+def test_mirror_resyncs_after_non_tail_append(sheet, tmp_path):
+    sync = DeltaSync(sheet)
+    mirror = LocalMirror(str(tmp_path / "mirror.sqlite"))
+    sync.refresh()
+    mirror.apply_sync(sync)
+    mirrored = MirroredSheet(sheet, mirror, sync)
+    mirrored.append_rows([row("2026-08-03 08:00:00", "E")])
+    assert list(mirror.df["工单号"]) == list(sync.df["工单号"]) == ["A", "C", "E", "B"]
+    mirrored.append_rows([row("2026-09-02 08:00:00", "D")])
+    assert list(mirror.df["工单号"]) == list(sync.df["工单号"]) == ["A", "C", "E", "B", "D"]
+    assert sync.last_action == "patch"
+
+
+def test_reopen_archives_old_partitions(sheet):
+    sheet.append_rows([row("2026-10-01 08:00:00", "E")])
+    reopened = PartitionedSheet(sheet.book, "month", 2)
+    assert reopened.archived == ["2026-08"] and reopened.hot == ["2026-09", "2026-10"]
+    assert order_nos(reopened.get()) == ["B", "E"]
+    assert reopened.partitions_for(datetime.date(2026, 1, 1), datetime.date(2026, 8, 15), ARCHIVE) == ["2026-08"]
+    assert list(reopened.read_partitions(["2026-08"])["工单号"]) == ["A", "C"]
+
+
+def test_manifest_changes_from_another_process_are_picked_up(sheet, monkeypatch):
+    sync = DeltaSync(sheet)
+    sync.refresh()
+    other = PartitionedSheet(sheet.book, "month", 2)
+    other.append_rows([row("2026-10-01 08:00:00", "E")])
+    monkeypatch.setattr(partitions, "MANIFEST_REFRESH", 0)
+    assert order_nos(other.get()) == ["B", "E"] and sheet.hot == ["2026-08", "2026-09"]
+    # 下一次读取顺带读到清单：新分区进入在线层，另一个进程降级的分区退出
+    sync.refresh()
+    assert sheet.hot == ["2026-09", "2026-10"] and sheet.archived == ["2026-08"]
+    assert sync.last_action == "full" and list(sync.df["工单号"]) == ["B", "E"]
+
+
+def test_runtime_demotion_follows_hot_limit(sheet, monkeypatch):
+    sheet.hot_partitions = 2
+    sheet.append_rows([row("2026-10-01 08:00:00", "E")])
+    assert sheet.hot == ["2026-08", "2026-09", "2026-10"]
+    monkeypatch.setattr(partitions, "MANIFEST_REFRESH", 0)
+    assert order_nos(sheet.get()) == ["B", "E"] and sheet.archived == ["2026-08"]
+    assert PartitionedSheet(sheet.book, "month", 0).archived == ["2026-08"]
+
+
+def test_unsupported_configuration():
+    with pytest.raises(ValueError):
+        open_workbook("sqlite")
+    with pytest.raises(ValueError):
+        PartitionedSheet(MemoryWorkbook(), "monthly")
+
+
+def test_open_workbook_from_gspread6_worksheet():
+    # gspread 6 的 Worksheet 没有 spreadsheet 属性，client 是 HTTPClient
+    class FakeHTTPClient:
+        def fetch_sheet_metadata(self, key, params=None):
+            return {"properties": {"title": "Gap_Data"}, "sheets": []}
+
+    class FakeWorksheet:
+        spreadsheet_id = "abc"
+        client = FakeHTTPClient()
+
+    book = open_workbook("gsheets", FakeWorksheet())
+    assert isinstance(book.spreadsheet, gspread.Spreadsheet) and book.spreadsheet.id == "abc"
+    assert open_workbook("gsheets") is None
@@ -0,0 +1,28 @@
+import time
+
+from profiling import RunProfile
+
+
+def test_mark_sections_exclude_nested_phases():
+    run = RunProfile()
+    run.mark("图表")
+    time.sleep(0.02)
+    with run.phase("求解"):
+        with run.phase("子阶段"): time.sleep(0.05)
+    time.sleep(0.02)
+    run.mark("下一个图表")
+    run.finish()
+    times = {name: seconds for name, seconds, _ in run.phases}
+    assert 0.035 < times["图表"] < 0.07
+    assert times["求解"] >= 0.05 and times["子阶段"] >= 0.05
+    top_level = times["图表"] + times["求解"] + times["下一个图表"]
+    assert top_level <= run.total
+
+
+def test_section_started_inside_phase_is_not_shifted():
+    run = RunProfile()
+    with run.phase("外层"):
+        run.mark("分段")
+        time.sleep(0.02)
+    run.finish()
+    assert dict((n, s) for n, s, _ in run.phases)["分段"] >= 0.02
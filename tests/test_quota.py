@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from mirror import LocalMirror, MirroredSheet
+from quota import QuotaSheet, TokenBucket
+from storage import GoogleSheetBackend
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = type("Response", (), {"status_code": status})()
+
+
+class FakeWorksheet:
+    """只记录调用的 gspread 工作表替身；errors 里依次是 batch_update 要抛出的状态码。"""
+
+    def __init__(self, errors=(), bad_cells=()):
+        self.errors = list(errors)
+        self.bad_cells = set(bad_cells)
+        self.calls = []
+
+    def batch_update(self, ranges, **kwargs):
+        self.calls.append("batch_update")
+        if self.errors: raise FakeAPIError(self.errors.pop(0))
+
+    def update_cell(self, row, col, value):
+        self.calls.append("update_cell")
+        if (row, col) in self.bad_cells: raise FakeAPIError(400)
+
+
+def quota_sheet(worksheet, sleeps=None):
+    bucket = TokenBucket(6000)
+    return QuotaSheet(GoogleSheetBackend(worksheet), bucket, bucket, sleep=(sleeps or []).append)
+
+
+def test_pause_drains_bucket():
+    now = [0.0]
+    bucket = TokenBucket(60, burst=1, clock=lambda: now[0])
+    assert bucket.acquire() == 0
+    bucket.pause(2)
+    assert bucket.tokens < 0
+
+
+def test_throttled_batch_is_retried_not_split(tmp_path):
+    worksheet = FakeWorksheet(errors=[429])
+    sheet = MirroredSheet(quota_sheet(worksheet), LocalMirror(str(tmp_path / "m.sqlite")))
+    result = sheet.batch_update_cells([(2, 1, "a"), (2, 2, "b"), (3, 1, "c")])
+    assert worksheet.calls == ["batch_update", "batch_update"]
+    assert result["failed"] == []
+
+
+def test_rejected_batch_falls_back_per_cell_through_wrapper(tmp_path):
+    worksheet = FakeWorksheet(errors=[400], bad_cells=[(3, 1)])
+    sheet = MirroredSheet(quota_sheet(worksheet), LocalMirror(str(tmp_path / "m.sqlite")))
+    result = sheet.batch_update_cells([(2, 1, "a"), (2, 2, "b"), (3, 1, "c")])
+    assert worksheet.calls == ["batch_update"] + ["update_cell"] * 3
+    assert result["failed"] == [(3, 1, "c")] and result["api_calls"] == 4
+
+
+def test_server_error_is_raised_after_retries(tmp_path):
+    worksheet = FakeWorksheet(errors=[500] * 10)
+    sheet = MirroredSheet(quota_sheet(worksheet), LocalMirror(str(tmp_path / "m.sqlite")))
+    with pytest.raises(FakeAPIError):
+        sheet.batch_update_cells([(2, 1, "a"), (2, 2, "b")])
+    # 写请求只在 429 时重试，500 不重试也不逐格回退
+    assert worksheet.calls == ["batch_update"]
+
+
+class SlowReads:
+    """get 会阻塞到 release 被设置；每次调用返回当时的写入次数。"""
+
+    def __init__(self):
+        self.started, self.release = threading.Event(), threading.Event()
+        self.reads = 0
+        self.writes = 0
+
+    def get(self, *args, **kwargs):
+        self.reads += 1
+        seen = self.writes
+        self.started.set()
+        self.release.wait(5)
+        return seen
+
+    def update_cell(self, row, col, value):
+        self.writes += 1
+
+
+def test_reads_are_not_shared_across_a_write():
+    backend = SlowReads()
+    bucket = TokenBucket(6000)
+    sheet = QuotaSheet(backend, bucket, bucket)
+    results = []
+    before = threading.Thread(target=lambda: results.append(sheet.get("A:A")))
+    before.start()
+    backend.started.wait(5)
+    sheet.update_cell(2, 1, "x")
+    after = threading.Thread(target=lambda: results.append(sheet.get("A:A")))
+    after.start()
+    time.sleep(0.05)
+    backend.release.set()
+    before.join(5); after.join(5)
+    assert backend.reads == 2 and sorted(results) == [0, 1]
+
+
+def test_concurrent_identical_reads_are_coalesced():
+    backend = SlowReads()
+    bucket = TokenBucket(6000)
+    sheet = QuotaSheet(backend, bucket, bucket)
+    threads = [threading.Thread(target=sheet.get, args=("A:A",)) for _ in range(3)]
+    threads[0].start()
+    backend.started.wait(5)
+    for t in threads[1:]: t.start()
+    time.sleep(0.05)
+    backend.release.set()
+    for t in threads: t.join(5)
+    assert backend.reads == 1
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from measurements import prepare_records
+from schema import ALL_HEADERS, normalize_frame
+
+
+def _raw():
+    rows = [
+        ["2026-10-01 08:00:00", "", "WO1", "F1", "1001", "D2", "C1", "30", "B1", "P1", "", "有刻字", "否", "23.5", "55", "2", "0.3", "0.1", "0.2", "0.1", "0.3"],
+        ["2026/10/02 09:30", "", "WO2", " F2 ", "1002", "D3", "C2", "45", "B2", "P2", "H1", "无刻字", "是", "", "nan", "3", "0.5", "0.2", "0.35", "0.2", "0.5", "0.35"],
+        ["不是时间", "", "WO3", "", "", "D2", "C1", "x", "", "", "", "", "", "abc", "", "", "", "", "", "", ""],
+    ]
+    width = max(len(r) for r in rows)
+    return pd.DataFrame([r + [""] * (width - len(r)) for r in rows], columns=ALL_HEADERS[:width])
+
+
+def test_normalize_frame_types():
+    typed = normalize_frame(_raw())
+    for col in ["扇叶型号", "扇叶料号", "盘型号", "详细配置/料号", "起始位置", "扇叶是否混模"]:
+        assert isinstance(typed[col].dtype, pd.CategoricalDtype), col
+    assert typed["扇叶型号"].tolist() == ["F1", "F2", ""]
+    for col in ["温度(°C)", "湿度(%)", "数据量", "数据_1", "数据_2", "数据_3"]:
+        assert typed[col].dtype == np.float32, col
+    for col in ["角度", "最大值", "最小值", "平均值"]:
+        assert typed[col].dtype == np.float64, col
+    assert typed["角度"].tolist()[:2] == [30.0, 45.0] and np.isnan(typed["角度"].iat[2])
+    assert np.isnan(typed["湿度(%)"].iat[1]) and np.isnan(typed["温度(°C)"].iat[2])
+    assert typed["工单号"].tolist() == ["WO1", "WO2", "WO3"]
+    assert typed["录入时间_dt"].tolist()[:2] == [pd.Timestamp("2026-10-01 08:00"), pd.Timestamp("2026-10-02 09:30")]
+    assert pd.isna(typed["录入时间_dt"].iat[2])
+
+
+def test_prepare_records_reports_memory():
+    raw = _raw()
+    typed, measurements = prepare_records(raw)
+    raw_bytes, typed_bytes = typed.attrs["memory"]
+    assert raw_bytes == int(raw.memory_usage(deep=True).sum())
+    assert typed_bytes == int(typed.memory_usage(deep=True).sum()) + measurements.nbytes
+    assert not any(c.startswith("数据_") for c in typed.columns)
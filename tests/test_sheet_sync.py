@@ -0,0 +1,93 @@
+import threading
+
+from sheet_sync import DeltaSync
+from storage import MemoryWorksheet
+
+HEADER = ["录入时间", "工单号", "角度"]
+
+
+def make_sheet(n=3):
+    return MemoryWorksheet([HEADER] + [[f"2026-10-0{i + 1}", f"WO{i}", 20] for i in range(n)])
+
+
+def test_first_refresh_is_full():
+    sync = DeltaSync(make_sheet())
+    df = sync.refresh()
+    assert sync.last_action == "full" and list(df["工单号"]) == ["WO0", "WO1", "WO2"]
+    assert df["角度"].tolist() == [20, 20, 20]
+
+
+def test_appended_rows_are_fetched_as_delta():
+    sheet = make_sheet()
+    sync = DeltaSync(sheet)
+    sync.refresh()
+    sheet.append_rows([["2026-10-05", "WO9", 30]])
+    df = sync.refresh()
+    assert sync.last_action == "delta" and sync.last_appended == 1
+    assert list(df["工单号"]) == ["WO0", "WO1", "WO2", "WO9"]
+    sync.refresh()
+    assert sync.last_action == "noop"
+
+
+def test_edited_column_a_triggers_full_reload():
+    sheet = make_sheet()
+    sync = DeltaSync(sheet)
+    sync.refresh()
+    sheet.update_cell(3, 1, "2026-09-30")
+    sheet.append_rows([["2026-10-05", "WO9", 30]])
+    df = sync.refresh()
+    assert sync.last_action == "full" and df["录入时间"].iloc[1] == "2026-09-30"
+
+
+def test_deleted_rows_trigger_full_reload():
+    sheet = make_sheet()
+    sync = DeltaSync(sheet)
+    sync.refresh()
+    sheet.delete_rows(2)
+    df = sync.refresh()
+    assert sync.last_action == "full" and list(df["工单号"]) == ["WO1", "WO2"]
+
+
+def test_local_patches_match_sheet():
+    sheet = make_sheet()
+    sync = DeltaSync(sheet)
+    sync.refresh()
+    sync.apply_append([["2026-10-05", "WO9", 30]])
+    sync.apply_cells([(2, 2, "WO0b")])
+    sync.apply_delete(3)
+    assert list(sync.df["工单号"]) == ["WO0b", "WO2", "WO9"] and sync.row_count == 3
+
+
+class SlowSheet(MemoryWorksheet):
+    """读取时回调 during_read，模拟刷新读表格期间发生的前台写入。"""
+
+    during_read = None
+
+    def get(self, *args, **kwargs):
+        if self.during_read: self.during_read()
+        return super().get(*args, **kwargs)
+
+
+def test_refresh_does_not_hold_lock_while_reading():
+    sheet = SlowSheet([HEADER, ["2026-10-01", "WO0", 20]])
+    sync = DeltaSync(sheet)
+    sync.refresh()
+    sheet.append_rows([["2026-10-02", "WO1", 20]])
+    acquired = []
+
+    def writer():
+        # 另一个线程 (前台写入) 在刷新读表格时能拿到锁，写表格并修补缓存
+        def write():
+            acquired.append(sync.lock.acquire(timeout=1))
+            sheet.append_rows([["2026-10-03", "WO2", 20]])
+            sync.apply_append([["2026-10-03", "WO2", 20]])
+            sync.lock.release()
+        thread = threading.Thread(target=write)
+        thread.start(); thread.join()
+        sheet.during_read = None
+
+    sheet.during_read = writer
+    df = sync.refresh()
+    assert acquired == [True]
+    # 刷新读到的是写入之前的结果，作废后重读，不会把 WO2 追加两次
+    assert list(df["工单号"]) == ["WO0", "WO1", "WO2"] and sync.row_count == 3
@@ -0,0 +1,38 @@
+import pytest
+
+from storage import MemoryWorksheet, SQLiteWorksheet, StorageBackend, _cell_ranges, _row_runs
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoDelete(StorageBackend):
+        def all_values(self): return []
+        def append_rows(self, rows, **kwargs): pass
+        def update_cell(self, row, col, value): pass
+
+    with pytest.raises(TypeError):
+        NoDelete()
+
+
+def test_memory_all_values_is_a_copy():
+    sheet = MemoryWorksheet([["a", "b"], ["1", "2"]])
+    values = sheet.all_values()
+    values[1][0] = "x"
+    sheet.append_rows([["3", "4"]])
+    assert sheet.all_values() == [["a", "b"], ["1", "2"], ["3", "4"]] and len(values) == 2
+
+
+@pytest.mark.parametrize("make", [lambda tmp: MemoryWorksheet(), lambda tmp: SQLiteWorksheet(str(tmp / "s.sqlite"))])
+def test_backends_share_gspread_semantics(make, tmp_path):
+    sheet = make(tmp_path)
+    sheet.append_rows([["录入时间", "工单号"], ["2026-10-01", "WO1"], ["2026-10-02", "WO2"], ["2026-10-03", "WO3"]])
+    assert sheet.row_values(1) == ["录入时间", "工单号"]
+    assert sheet.batch_get(["1:1", "A:A"])[1] == [["录入时间"], ["2026-10-01"], ["2026-10-02"], ["2026-10-03"]]
+    assert sheet.batch_update_cells([(3, 2, "WO2b")])["failed"] == []
+    assert sheet.delete_row_set([2, 4])["runs"] == [(4, 4), (2, 2)]
+    assert sheet.get() == [["录入时间", "工单号"], ["2026-10-02", "WO2b"]]
+
+
+def test_row_runs_and_cell_ranges():
+    assert _row_runs([5, 2, 3, 9, 4]) == [(9, 9), (2, 5)]
+    ranges = _cell_ranges([(2, 3, "c"), (2, 2, "b"), (4, 1, 1.5)])
+    assert ranges == [{"range": "B2:C2", "values": [["b", "c"]]}, {"range": "A4:A4", "values": [[1.5]]}]